@@ -4,20 +4,17 @@ Version avec design moderne et amélioré
 """
 
 import streamlit as st
-import matplotlib.pyplot as plt
-from io import BytesIO
+import altair as alt
 from PIL import Image
 
 # Import des modules personnalisés
-from pricing import calculer_prix_total
+from pricing import calculer_prix_total, couts_scission, CanapePricing
+import catalogue_prix
 from pdf_generator import generer_pdf_devis
+from recherche_config import rechercher_configurations, balayer_dimension
 
 # Import des fonctions de génération de schémas depuis canapematplot
-from canapematplot import (
-    render_LNF, render_LF_variant, render_U2f_variant,
-    render_U, render_U1F_v1, render_U1F_v2, render_U1F_v3, render_U1F_v4,
-    render_Simple1
-)
+from canapematplot import build_display_list, display_list_to_bytes
 
 # Configuration de la page
 st.set_page_config(
@@ -208,79 +205,121 @@ def load_css():
 # Charger le CSS
 load_css()
 
+# Tarifs : prend en compte une mise à jour de catalogue_prix.json sans redémarrer
+try:
+    catalogue_prix.recharger_si_modifie()
+except (OSError, ValueError) as e:
+    st.warning(f"⚠️ Catalogue de prix non rechargé (version précédente conservée) : {e}")
+
+def schema_canape_display_list(type_canape, tx, ty, tz, profondeur, 
+                                 acc_left, acc_right, acc_bas,
+                                 dossier_left, dossier_bas, dossier_right,
+                                 meridienne_side, meridienne_len, coussins="auto",
+                                 split_costs=None):
+    """
+    DisplayList du schéma du canapé (fonctions de canapematplot.py). La
+    géométrie n'est calculée qu'une fois : la liste se rejoue en PNG pour
+    l'aperçu, se dessine en vectoriel dans le devis PDF et porte la
+    disposition réelle pour le chiffrage (dl.layout).
+    split_costs : coûts des supports (couts_scission) pour la scission optimisée.
+    """
+    if "Simple" in type_canape:
+        dl = build_display_list(
+            "Simple1",
+            split_costs=split_costs,
+            tx=tx, profondeur=profondeur, dossier=dossier_bas,
+            acc_left=acc_left, acc_right=acc_right,
+            meridienne_side=meridienne_side, meridienne_len=meridienne_len,
+            coussins=coussins, window_title="Canapé Simple"
+        )
+        
+    elif "L - Sans Angle" in type_canape:
+        dl = build_display_list(
+            "LNF",
+            split_costs=split_costs,
+            tx=tx, ty=ty, profondeur=profondeur,
+            dossier_left=dossier_left, dossier_bas=dossier_bas,
+            acc_left=acc_left, acc_bas=acc_bas,
+            meridienne_side=meridienne_side, meridienne_len=meridienne_len,
+            coussins=coussins, variant="auto",
+            window_title="Canapé L - Sans Angle"
+        )
+        
+    elif "L - Avec Angle" in type_canape:
+        dl = build_display_list(
+            "LF",
+            split_costs=split_costs,
+            tx=tx, ty=ty, profondeur=profondeur,
+            dossier_left=dossier_left, dossier_bas=dossier_bas,
+            acc_left=acc_left, acc_bas=acc_bas,
+            meridienne_side=meridienne_side, meridienne_len=meridienne_len,
+            coussins=coussins, window_title="Canapé L - Avec Angle"
+        )
+        
+    elif "U - Sans Angle" in type_canape:
+        dl = build_display_list(
+            "U",
+            split_costs=split_costs,
+            tx=tx, ty_left=ty, tz_right=tz, profondeur=profondeur,
+            dossier_left=dossier_left, dossier_bas=dossier_bas,
+            dossier_right=dossier_right, acc_left=acc_left,
+            acc_bas=acc_bas, acc_right=acc_right,
+            coussins=coussins, variant="auto",
+            window_title="Canapé U - Sans Angle"
+        )
+        
+    elif "U - 1 Angle" in type_canape:
+        dl = build_display_list(
+            "U1F_v1",
+            split_costs=split_costs,
+            tx=tx, ty=ty, tz=tz, profondeur=profondeur,
+            dossier_left=dossier_left, dossier_bas=dossier_bas,
+            dossier_right=dossier_right, acc_left=acc_left,
+            acc_right=acc_right, meridienne_side=meridienne_side,
+            meridienne_len=meridienne_len, coussins=coussins,
+            window_title="Canapé U - 1 Angle"
+        )
+        
+    elif "U - 2 Angles" in type_canape:
+        dl = build_display_list(
+            "U2F",
+            split_costs=split_costs,
+            tx=tx, ty_left=ty, tz_right=tz, profondeur=profondeur,
+            dossier_left=dossier_left, dossier_bas=dossier_bas,
+            dossier_right=dossier_right, acc_left=acc_left,
+            acc_bas=acc_bas, acc_right=acc_right,
+            meridienne_side=meridienne_side, meridienne_len=meridienne_len,
+            coussins=coussins, window_title="Canapé U - 2 Angles"
+        )
+    
+    else:
+        raise ValueError(f"Type de canapé inconnu : {type_canape}")
+
+    return dl
+
+
 def generer_schema_canape(type_canape, tx, ty, tz, profondeur, 
                           acc_left, acc_right, acc_bas,
                           dossier_left, dossier_bas, dossier_right,
-                          meridienne_side, meridienne_len, coussins="auto"):
+                          meridienne_side, meridienne_len, coussins="auto",
+                          split_costs=None):
     """
     Génère le schéma du canapé en utilisant les fonctions de canapematplot.py
-    et retourne une figure matplotlib
+    et retourne (image PNG en bytes, disposition réelle pour le chiffrage).
+    La géométrie n'est calculée qu'une fois : la même DisplayList sert au
+    dessin (sans pyplot ni plt.show()) et au prix.
+    split_costs : coûts des supports (couts_scission) pour la scission optimisée.
     """
-    fig = plt.figure(figsize=(12, 8))
-    
     try:
-        if "Simple" in type_canape:
-            render_Simple1(
-                tx=tx, profondeur=profondeur, dossier=dossier_bas,
-                acc_left=acc_left, acc_right=acc_right,
-                meridienne_side=meridienne_side, meridienne_len=meridienne_len,
-                coussins=coussins, window_title="Canapé Simple"
-            )
-            
-        elif "L - Sans Angle" in type_canape:
-            render_LNF(
-                tx=tx, ty=ty, profondeur=profondeur,
-                dossier_left=dossier_left, dossier_bas=dossier_bas,
-                acc_left=acc_left, acc_bas=acc_bas,
-                meridienne_side=meridienne_side, meridienne_len=meridienne_len,
-                coussins=coussins, variant="auto",
-                window_title="Canapé L - Sans Angle"
-            )
-            
-        elif "L - Avec Angle" in type_canape:
-            render_LF_variant(
-                tx=tx, ty=ty, profondeur=profondeur,
-                dossier_left=dossier_left, dossier_bas=dossier_bas,
-                acc_left=acc_left, acc_bas=acc_bas,
-                meridienne_side=meridienne_side, meridienne_len=meridienne_len,
-                coussins=coussins, window_title="Canapé L - Avec Angle"
-            )
-            
-        elif "U - Sans Angle" in type_canape:
-            render_U(
-                tx=tx, ty_left=ty, tz_right=tz, profondeur=profondeur,
-                dossier_left=dossier_left, dossier_bas=dossier_bas,
-                dossier_right=dossier_right, acc_left=acc_left,
-                acc_bas=acc_bas, acc_right=acc_right,
-                coussins=coussins, variant="auto",
-                window_title="Canapé U - Sans Angle"
-            )
-            
-        elif "U - 1 Angle" in type_canape:
-            render_U1F_v1(
-                tx=tx, ty=ty, tz=tz, profondeur=profondeur,
-                dossier_left=dossier_left, dossier_bas=dossier_bas,
-                dossier_right=dossier_right, acc_left=acc_left,
-                acc_right=acc_right, meridienne_side=meridienne_side,
-                meridienne_len=meridienne_len, coussins=coussins,
-                window_title="Canapé U - 1 Angle"
-            )
-            
-        elif "U - 2 Angles" in type_canape:
-            render_U2f_variant(
-                tx=tx, ty_left=ty, tz_right=tz, profondeur=profondeur,
-                dossier_left=dossier_left, dossier_bas=dossier_bas,
-                dossier_right=dossier_right, acc_left=acc_left,
-                acc_bas=acc_bas, acc_right=acc_right,
-                meridienne_side=meridienne_side, meridienne_len=meridienne_len,
-                coussins=coussins, window_title="Canapé U - 2 Angles"
-            )
-        
-        fig = plt.gcf()
-        return fig
+        dl = schema_canape_display_list(
+            type_canape, tx, ty, tz, profondeur, acc_left, acc_right, acc_bas,
+            dossier_left, dossier_bas, dossier_right, meridienne_side, meridienne_len,
+            coussins=coussins, split_costs=split_costs
+        )
+        png, _meta = display_list_to_bytes(dl)
+        return png, dl.layout
         
     except Exception as e:
-        plt.close()
         raise Exception(f"Erreur lors de la génération du schéma : {str(e)}")
 
 # ============================================
@@ -385,6 +424,8 @@ with col1:
     nb_coussins_deco = st.number_input("Coussins déco", min_value=0, max_value=10, value=0)
     nb_traversins_supp = st.number_input("Traversins", min_value=0, max_value=5, value=0)
     has_surmatelas = st.checkbox("Surmatelas")
+    scission_optimisee = st.checkbox("Scission des banquettes au moindre coût", value=True,
+                                     help="Place les coupes selon le coût des supports")
     
     # CLIENT
     st.markdown("#### 👤 9. Informations Client")
@@ -398,22 +439,39 @@ with col2:
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("### 👁️ Aperçu du Canapé")
     
+    # Prix estimé en direct : seules les sections touchées par le dernier widget sont recalculées
+    moteur_prix = st.session_state.setdefault("moteur_prix", CanapePricing())
+    try:
+        estimation = moteur_prix.calculer_devis_complet(dict(
+            type_canape=type_canape, tx=tx, ty=ty, tz=tz,
+            profondeur=profondeur, type_coussins=type_coussins,
+            type_mousse=type_mousse, epaisseur=epaisseur,
+            acc_left=acc_left, acc_right=acc_right, acc_bas=acc_bas,
+            dossier_left=dossier_left, dossier_bas=dossier_bas,
+            dossier_right=dossier_right, nb_coussins_deco=nb_coussins_deco,
+            nb_traversins_supp=nb_traversins_supp,
+            has_surmatelas=has_surmatelas, has_meridienne=has_meridienne
+        ))
+        st.metric("💶 Prix estimé TTC", f"{estimation['total_ttc']}€")
+    except Exception as e:
+        st.caption(f"Estimation indisponible : {e}")
+    
     # Bouton de génération avec icône
     if st.button("🎨 Générer l'Aperçu", type="primary", use_container_width=True):
         with st.spinner("✨ Génération du schéma en cours..."):
             try:
-                # Générer le schéma
-                fig = generer_schema_canape(
+                # Générer le schéma (et la disposition réelle)
+                png, layout = generer_schema_canape(
                     type_canape=type_canape, tx=tx, ty=ty, tz=tz,
                     profondeur=profondeur, acc_left=acc_left,
                     acc_right=acc_right, acc_bas=acc_bas,
                     dossier_left=dossier_left, dossier_bas=dossier_bas,
                     dossier_right=dossier_right, meridienne_side=meridienne_side,
-                    meridienne_len=meridienne_len, coussins=type_coussins
+                    meridienne_len=meridienne_len, coussins=type_coussins,
+                    split_costs=couts_scission() if scission_optimisee else None
                 )
                 
-                st.pyplot(fig)
-                plt.close()
+                st.image(png, use_container_width=True)
                 
                 st.success("✅ Schéma généré avec succès !")
                 
@@ -426,7 +484,8 @@ with col2:
                     dossier_left=dossier_left, dossier_bas=dossier_bas,
                     dossier_right=dossier_right, nb_coussins_deco=nb_coussins_deco,
                     nb_traversins_supp=nb_traversins_supp,
-                    has_surmatelas=has_surmatelas, has_meridienne=has_meridienne
+                    has_surmatelas=has_surmatelas, has_meridienne=has_meridienne,
+                    layout=layout
                 )
                 
                 # Affichage des prix avec design amélioré
@@ -461,21 +520,17 @@ with col2:
         else:
             with st.spinner("📝 Création du PDF en cours..."):
                 try:
-                    # Régénérer le schéma pour le PDF
-                    fig = generer_schema_canape(
+                    # Schéma du PDF : display list dessinée en vectoriel (sans rendu PNG)
+                    dl = schema_canape_display_list(
                         type_canape=type_canape, tx=tx, ty=ty, tz=tz,
                         profondeur=profondeur, acc_left=acc_left,
                         acc_right=acc_right, acc_bas=acc_bas,
                         dossier_left=dossier_left, dossier_bas=dossier_bas,
                         dossier_right=dossier_right, meridienne_side=meridienne_side,
-                        meridienne_len=meridienne_len, coussins=type_coussins
+                        meridienne_len=meridienne_len, coussins=type_coussins,
+                        split_costs=couts_scission() if scission_optimisee else None
                     )
-                    
-                    # Sauvegarder dans un buffer
-                    img_buffer = BytesIO()
-                    fig.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150)
-                    img_buffer.seek(0)
-                    plt.close(fig)
+                    layout = dl.layout
                     
                     # Configuration
                     config = {
@@ -486,7 +541,10 @@ with col2:
                             'dossier_left': dossier_left, 'dossier_bas': dossier_bas,
                             'dossier_right': dossier_right, 'meridienne_side': meridienne_side,
                             'meridienne_len': meridienne_len, 'type_coussins': type_coussins,
-                            'type_mousse': type_mousse, 'epaisseur': epaisseur
+                            'type_mousse': type_mousse, 'epaisseur': epaisseur,
+                            'nb_coussins_deco': nb_coussins_deco,
+                            'nb_traversins_supp': nb_traversins_supp,
+                            'has_surmatelas': has_surmatelas
                         },
                         'client': {'nom': nom_client, 'email': email_client}
                     }
@@ -500,11 +558,12 @@ with col2:
                         dossier_left=dossier_left, dossier_bas=dossier_bas,
                         dossier_right=dossier_right, nb_coussins_deco=nb_coussins_deco,
                         nb_traversins_supp=nb_traversins_supp,
-                        has_surmatelas=has_surmatelas, has_meridienne=has_meridienne
+                        has_surmatelas=has_surmatelas, has_meridienne=has_meridienne,
+                        layout=layout
                     )
                     
                     # Génération PDF
-                    pdf_buffer = generer_pdf_devis(config, prix_details, schema_image=img_buffer)
+                    pdf_buffer = generer_pdf_devis(config, prix_details, schema_image=dl)
                     
                     st.download_button(
                         label="⬇️ Télécharger le Devis PDF",
@@ -518,6 +577,98 @@ with col2:
                 except Exception as e:
                     st.error(f"❌ Erreur : {str(e)}")
     
+    # Recherche de configurations pour un budget (dimensions actuelles)
+    st.markdown("---")
+    with st.expander("🔎 Trouver une configuration pour un budget"):
+        col_rech1, col_rech2 = st.columns(2)
+        with col_rech1:
+            budget_ttc = st.number_input("Budget TTC (€, 0 = sans limite)", min_value=0, value=0, step=100)
+        with col_rech2:
+            taux_marge_min = st.number_input("Marge minimale (%)", min_value=0, max_value=100, value=0)
+        if st.button("🔎 Rechercher", use_container_width=True):
+            try:
+                resultats = rechercher_configurations(
+                    type_canape=type_canape, tx=tx, ty=ty, tz=tz, profondeur=profondeur,
+                    acc_left=acc_left, acc_right=acc_right, acc_bas=acc_bas,
+                    dossier_left=dossier_left, dossier_bas=dossier_bas,
+                    dossier_right=dossier_right,
+                    meridienne_len=meridienne_len if has_meridienne else 0,
+                    budget_ttc=budget_ttc or None, taux_marge_min=taux_marge_min or None,
+                    nb_coussins_deco=nb_coussins_deco, nb_traversins_supp=nb_traversins_supp,
+                    has_surmatelas=has_surmatelas,
+                    split_costs=couts_scission() if scission_optimisee else None
+                )
+                if not resultats:
+                    st.warning("⚠️ Aucune configuration ne respecte ces contraintes")
+                else:
+                    st.dataframe([{
+                        "Total TTC (€)": c["total_ttc"],
+                        "Marge HT (€)": c["marge_ht"],
+                        "Chute coussins (cm)": c["chute"],
+                        "Mousse": c["type_mousse"],
+                        "Épaisseur": c["epaisseur"],
+                        "Coussins": c["resume_coussins"],
+                        "Variante": c["variant"] or "-",
+                        "Méridienne": c["meridienne_side"] or "-",
+                    } for c in resultats], use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Erreur : {str(e)}")
+    
+    # Courbe de prix le long d'une dimension (les autres entrées fixées)
+    with st.expander("📈 Prix selon une dimension"):
+        dimensions_courbe = {"Largeur (Tx)": ("tx", tx, 100, 600)}
+        if ty is not None:
+            dimensions_courbe["Hauteur gauche (Ty)"] = ("ty", ty, 100, 600)
+        if tz is not None:
+            dimensions_courbe["Hauteur droite (Tz)"] = ("tz", tz, 100, 600)
+        dimensions_courbe["Profondeur"] = ("profondeur", profondeur, 50, 120)
+        dimensions_courbe["Épaisseur"] = ("epaisseur", epaisseur, 15, 35)
+        libelle_dim = st.selectbox("Dimension", list(dimensions_courbe))
+        cle_dim, valeur_dim, min_dim, max_dim = dimensions_courbe[libelle_dim]
+        bornes = st.slider("Plage (cm)", min_value=min_dim, max_value=max_dim,
+                           value=(max(min_dim, valeur_dim - 50), min(max_dim, valeur_dim + 50)))
+        if st.checkbox("Afficher la courbe de prix"):
+            try:
+                pas = max(1, (bornes[1] - bornes[0]) // 60)
+                points = balayer_dimension(
+                    cle_dim, range(bornes[0], bornes[1] + 1, pas),
+                    type_canape=type_canape, tx=tx, ty=ty, tz=tz, profondeur=profondeur,
+                    type_coussins=type_coussins, type_mousse=type_mousse, epaisseur=epaisseur,
+                    acc_left=acc_left, acc_right=acc_right, acc_bas=acc_bas,
+                    dossier_left=dossier_left, dossier_bas=dossier_bas,
+                    dossier_right=dossier_right, meridienne_side=meridienne_side,
+                    meridienne_len=meridienne_len if has_meridienne else 0,
+                    nb_coussins_deco=nb_coussins_deco, nb_traversins_supp=nb_traversins_supp,
+                    has_surmatelas=has_surmatelas,
+                    split_costs=couts_scission() if scission_optimisee else None
+                )
+                donnees = [{
+                    libelle_dim: p["valeur"],
+                    "Total TTC (€)": p["total_ttc"],
+                    "Marge HT (€)": p["marge_ht"],
+                    "Banquettes": p["nb_banquettes"],
+                    "Coussins": p["resume_coussins"],
+                    "Palier": " ; ".join(p["paliers"]),
+                } for p in points if p["total_ttc"] is not None]
+                if not donnees:
+                    st.warning("⚠️ Aucune disposition possible sur cette plage")
+                else:
+                    base_courbe = alt.Chart(alt.Data(values=donnees)).encode(
+                        x=alt.X(f"{libelle_dim}:Q", title=libelle_dim))
+                    prix_courbe = base_courbe.mark_line(interpolate="step-after").encode(
+                        y=alt.Y("Total TTC (€):Q", scale=alt.Scale(zero=False)),
+                        tooltip=[f"{libelle_dim}:Q", "Total TTC (€):Q", "Marge HT (€):Q",
+                                 "Banquettes:Q", "Coussins:N"])
+                    paliers_courbe = base_courbe.transform_filter("datum.Palier != ''").mark_point(
+                        filled=True, size=60, color="#ef4444").encode(
+                        y="Total TTC (€):Q",
+                        tooltip=[f"{libelle_dim}:Q", "Total TTC (€):Q", "Palier:N"])
+                    actuel = alt.Chart(alt.Data(values=[{libelle_dim: valeur_dim}])).mark_rule(
+                        strokeDash=[4, 4], color="#64748b").encode(x=f"{libelle_dim}:Q")
+                    st.altair_chart(prix_courbe + paliers_courbe + actuel, use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Erreur : {str(e)}")
+    
     st.markdown("</div>", unsafe_allow_html=True)
 
 # FOOTER
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Banc de mesure du chiffrage (pricing.py)
+
+Mesure débit (appels/s) et latences p50 / p99 de chaque chemin de calcul sur
+des configurations représentatives :
+  - calculer_prix_total en estimation : Simple, L, U × chaque mode de
+    coussins × accessoires avec / sans ;
+  - calculer_prix_grille (grille précalculée projetée en mémoire) ;
+  - calculer_prix_total sur disposition réelle (layout calculé une fois,
+    seul le chiffrage est mesuré) ;
+  - CanapePricing : changement d'un accessoire, de l'épaisseur (section
+    banquettes), d'un dossier ;
+  - calculer_prix_batch : lots de 1 000 et 100 000 lignes (lignes/s).
+
+Les résultats sont écrits en JSON (versions Python / NumPy, version de tarif,
+commit git s'il y en a un) pour comparer deux exécutions :
+
+    python bench_pricing.py --sortie avant.json
+    ... modification des tarifs ou du code ...
+    python bench_pricing.py --sortie apres.json --comparer avant.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import catalogue_prix
+from pricing import calculer_prix_total, calculer_prix_grille, calculer_prix_batch, CanapePricing
+
+REPETITIONS = 2000
+MODES_COUSSINS = ("auto", "65", "80", "90", "valise", "p", "g")  # choix de l'app
+
+# Configurations représentatives (paramètres de calculer_prix_total hors coussins / accessoires)
+CONFIGURATIONS = {
+    "Simple": dict(type_canape="Simple (S)", tx=280, ty=None, tz=None, profondeur=70,
+                   acc_left=True, acc_right=True, acc_bas=False,
+                   dossier_left=False, dossier_bas=True, dossier_right=False),
+    "L": dict(type_canape="L - Sans Angle", tx=350, ty=250, tz=None, profondeur=70,
+              acc_left=True, acc_right=False, acc_bas=True,
+              dossier_left=True, dossier_bas=True, dossier_right=False),
+    "U": dict(type_canape="U - 2 Angles (U2F)", tx=450, ty=300, tz=280, profondeur=70,
+              acc_left=True, acc_right=True, acc_bas=False,
+              dossier_left=True, dossier_bas=True, dossier_right=True),
+}
+ACCESSOIRES = {
+    "sans accessoires": dict(nb_coussins_deco=0, nb_traversins_supp=0, has_surmatelas=False),
+    "avec accessoires": dict(nb_coussins_deco=3, nb_traversins_supp=2, has_surmatelas=True),
+}
+
+
+# ============================================================================
+# MESURE
+# ============================================================================
+
+def _mesurer(appel, repetitions, unites=1):
+    """Latences (ns) de repetitions appels, GC désactivé comme timeit ; dict de statistiques"""
+    for _ in range(min(50, repetitions)):  # échauffement (caches, imports paresseux)
+        appel()
+    durees = np.empty(repetitions)
+    horloge = time.perf_counter_ns
+    gc_actif = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(repetitions):
+            debut = horloge()
+            appel()
+            durees[i] = horloge() - debut
+    finally:
+        if gc_actif:
+            gc.enable()
+    total_s = durees.sum() / 1e9
+    return {
+        "n": repetitions,
+        "appels_par_s": round(repetitions / total_s, 1),
+        "unites_par_s": round(repetitions * unites / total_s, 1),
+        "moyenne_us": round(float(durees.mean()) / 1e3, 2),
+        "p50_us": round(float(np.percentile(durees, 50)) / 1e3, 2),
+        "p99_us": round(float(np.percentile(durees, 99)) / 1e3, 2),
+    }
+
+
+def _parametres(forme, type_coussins, accessoires, **autres):
+    return dict(CONFIGURATIONS[forme], type_coussins=type_coussins, type_mousse="HR35",
+                epaisseur=25, has_meridienne=False, **ACCESSOIRES[accessoires], **autres)
+
+
+# ============================================================================
+# SCÉNARIOS
+# ============================================================================
+
+def _scenarios(repetitions):
+    """
+    (chemin, nom, préparation, répétitions, unités par appel) de chaque mesure ;
+    préparation() rend l'appel mesuré (dispositions, moteur, colonnes du lot) et
+    n'est exécutée que pour les scénarios retenus par le filtre.
+    """
+    for forme in CONFIGURATIONS:
+        for mode in MODES_COUSSINS:
+            for accessoires in ACCESSOIRES:
+                p = _parametres(forme, mode, accessoires)
+                yield ("calculer_prix_total", f"{forme} / coussins {mode} / {accessoires}",
+                       lambda p=p: lambda: calculer_prix_total(**p), repetitions, 1)
+
+    for forme in CONFIGURATIONS:
+        for accessoires in ACCESSOIRES:
+            p = _parametres(forme, "auto", accessoires)
+            yield ("calculer_prix_grille", f"{forme} / coussins auto / {accessoires}",
+                   lambda p=p: lambda: calculer_prix_grille(**p), repetitions, 1)
+
+    def disposition_reelle(forme):
+        import canapematplot as cm  # seulement pour préparer les dispositions (hors mesure)
+        p = _parametres(forme, "auto", "sans accessoires")
+        p["layout"] = cm.compute_layout(dict(p, coussins="auto"))
+        return lambda: calculer_prix_total(**p)
+
+    for forme in CONFIGURATIONS:
+        yield ("calculer_prix_total (layout)", f"{forme} / disposition réelle",
+               lambda f=forme: disposition_reelle(f), repetitions, 1)
+
+    def modification(forme, cle, valeurs):
+        moteur = CanapePricing()
+        moteur.calculer_devis_complet(_parametres(forme, "auto", "sans accessoires"))
+        etat = iter(valeurs * (repetitions + 100))
+        return lambda: moteur.calculer_devis_complet({cle: next(etat)})
+
+    for forme in CONFIGURATIONS:
+        for nom, cle, valeurs in (("accessoire", "nb_traversins_supp", (0, 1)),
+                                  ("épaisseur", "epaisseur", (20, 25)),
+                                  ("dossier", "dossier_bas", (False, True))):
+            yield ("CanapePricing", f"{forme} / modification {nom}",
+                   lambda f=forme, c=cle, v=valeurs: modification(f, c, v), repetitions, 1)
+
+    def lot(taille):
+        rng = np.random.default_rng(0)  # même graine par lot : indépendant du filtre
+        formes = rng.choice(list(CONFIGURATIONS), taille)
+        colonnes = {
+            "type_canape": [CONFIGURATIONS[f]["type_canape"] for f in formes],
+            "tx": rng.integers(150, 600, taille), "ty": rng.integers(150, 450, taille).astype(float),
+            "tz": rng.integers(150, 450, taille).astype(float), "profondeur": rng.integers(50, 120, taille),
+            "type_coussins": rng.choice(MODES_COUSSINS, taille),
+            "type_mousse": rng.choice(["D25", "D30", "HR35", "HR45"], taille),
+            "epaisseur": rng.choice([15, 20, 25, 30, 35], taille),
+            "acc_left": True, "acc_right": True, "acc_bas": False,
+            "dossier_left": True, "dossier_bas": True, "dossier_right": False,
+            "nb_coussins_deco": rng.integers(0, 3, taille),
+        }
+        return lambda: calculer_prix_batch(**colonnes)
+
+    for taille in (1000, 100000):
+        yield ("calculer_prix_batch", f"{taille} lignes",
+               lambda t=taille: lot(t), max(5, repetitions * 10 // taille), taille)
+
+
+# ============================================================================
+# EXÉCUTION / COMPARAISON
+# ============================================================================
+
+def _commit_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def executer(repetitions=REPETITIONS, filtre=None):
+    """Exécute les scénarios (filtre : sous-chaîne du chemin ou du nom) ; dict sérialisable en JSON"""
+    resultats = []
+    for chemin, nom, preparation, n, unites in _scenarios(repetitions):
+        if filtre and filtre not in chemin and filtre not in nom:
+            continue
+        resultats.append(dict(chemin=chemin, nom=nom, **_mesurer(preparation(), n, unites)))
+    return {
+        "horodatage": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_git(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plateforme": platform.platform(),
+        "version_tarif": catalogue_prix.en_vigueur()["version"],
+        "repetitions": repetitions,
+        "resultats": resultats,
+    }
+
+
+def comparer(avant, apres):
+    """Lignes (chemin, nom, p50 avant, p50 après, rapport) des mesures présentes dans les deux"""
+    index = {(r["chemin"], r["nom"]): r for r in avant["resultats"]}
+    lignes = []
+    for r in apres["resultats"]:
+        a = index.get((r["chemin"], r["nom"]))
+        if a is not None:
+            lignes.append((r["chemin"], r["nom"], a["p50_us"], r["p50_us"],
+                           r["p50_us"] / a["p50_us"] if a["p50_us"] else float("nan")))
+    return lignes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit et latences du chiffrage (pricing.py)")
+    parser.add_argument("--sortie", default="bench_pricing.json", help="fichier JSON des résultats")
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS, help="appels mesurés par scénario")
+    parser.add_argument("--filtre", help="ne mesurer que les scénarios dont le chemin ou le nom contient ce texte")
+    parser.add_argument("--comparer", metavar="JSON", help="résultats d'une exécution précédente")
+    args = parser.parse_args(argv)
+
+    mesures = executer(args.repetitions, args.filtre)
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(mesures, f, ensure_ascii=False, indent=2)
+
+    for r in mesures["resultats"]:
+        debit = (f"{r['unites_par_s']:>12,.0f} lignes/s" if r["chemin"] == "calculer_prix_batch"
+                 else f"{r['appels_par_s']:>12,.0f} appels/s")
+        print(f"{r['chemin']:<29} {r['nom']:<44} {debit}  p50 {r['p50_us']:>9.1f} µs  p99 {r['p99_us']:>9.1f} µs")
+    print(f"Résultats : {args.sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            avant = json.load(f)
+        print(f"\nComparaison avec {args.comparer} (p50, après / avant) :")
+        for chemin, nom, p50_avant, p50_apres, rapport in comparer(avant, mesures):
+            print(f"{chemin:<29} {nom:<44} {p50_avant:>9.1f} → {p50_apres:>9.1f} µs  ×{rapport:.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -98,24 +98,88 @@ def _compute_dossiers_count(polys):
 import math
 import unicodedata
 
-import matplotlib.pyplot as plt
-from matplotlib.patches import Polygon
+import contextvars
+import functools
 import types
+from io import BytesIO
+from xml.sax.saxutils import escape as _xml_escape
+
+import cushion_tables
+# matplotlib est importé à la demande (_Screen) : le backend SVG n'en dépend pas.
 
 # =========================
 # Adapteur "turtle" -> Matplotlib
 # =========================
 
-_current_screen = None
+# Regroupe les traits et remplissages en deux collections (1 LineCollection +
+# 1 PathCollection) au lieu d'un artiste Matplotlib par segment : un canapé U
+# avec coussins valise passe de plusieurs milliers d'artistes à quelques-uns.
+BATCH_ARTISTS = True
+
+# Quart de cercle en Bézier cubique : distance des points de contrôle = K * r
+_BEZIER_QUARTER_K = 0.5522847498307936
+
+def _rounded_rect_path(x0, y0, x1, y1, r):
+    """Path fermé d'un rectangle à coins arrondis (4 segments + 4 quarts de cercle Bézier)."""
+    from matplotlib.path import Path
+    k = _BEZIER_QUARTER_K * r
+    verts = [
+        (x0 + r, y0), (x1 - r, y0),
+        (x1 - r + k, y0), (x1, y0 + r - k), (x1, y0 + r),
+        (x1, y1 - r),
+        (x1, y1 - r + k), (x1 - r + k, y1), (x1 - r, y1),
+        (x0 + r, y1),
+        (x0 + r - k, y1), (x0, y1 - r + k), (x0, y1 - r),
+        (x0, y0 + r),
+        (x0, y0 + r - k), (x0 + r - k, y0), (x0 + r, y0),
+        (x0 + r, y0),
+    ]
+    C = Path.CURVE4
+    codes = [Path.MOVETO, Path.LINETO, C, C, C, Path.LINETO, C, C, C,
+             Path.LINETO, C, C, C, Path.LINETO, C, C, C, Path.CLOSEPOLY]
+    return Path(verts, codes)
+
+# État de l'adaptateur turtle, propre à chaque rendu (ContextVar : un contexte par
+# thread / tâche). Plusieurs rendus peuvent tourner en parallèle sans verrou.
+# Écran courant (turtle.Screen() / turtle.done())
+_current_screen = contextvars.ContextVar("canape_current_screen", default=None)
+# Mode sans affichage (render_to_bytes) : liste recevant les écrans terminés
+# par turtle.done() au lieu d'appeler plt.show().
+_headless_capture = contextvars.ContextVar("canape_headless_capture", default=None)
+# Backend des écrans créés par turtle.Screen() : "mpl", "svg" ou "dl" (capture de la display list)
+_screen_backend = contextvars.ContextVar("canape_screen_backend", default="mpl")
+# Rapports console des render_* (désactivés par compute_layout)
+_reports_enabled = contextvars.ContextVar("canape_reports_enabled", default=True)
+# Coûts des supports pour la scission optimisée (None : coupe au milieu)
+_split_costs = contextvars.ContextVar("canape_split_costs", default=None)
+
+def _report(*args, **kwargs):
+    """print() des rapports de rendu, silencieux quand _reports_enabled est faux."""
+    if _reports_enabled.get():
+        print(*args, **kwargs)
 
 class _Screen:
-    def __init__(self):
-        global _current_screen
-        self.fig, self.ax = plt.subplots()
+    def __init__(self, batch=None, headless=None):
+        self.headless = (_headless_capture.get() is not None) if headless is None else bool(headless)
+        if self.headless:
+            # Figure Agg autonome : jamais enregistrée dans pyplot (pas de fuite)
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            self.fig = Figure()
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot()
+        else:
+            import matplotlib.pyplot as plt
+            self.fig, self.ax = plt.subplots()
         self.ax.set_aspect('equal', adjustable='box')
         self.width = None
         self.height = None
-        _current_screen = self
+        self.window_title = None
+        self.batch = BATCH_ARTISTS if batch is None else bool(batch)
+        # Tampons du mode batch (ordre d'insertion conservé = ordre de peinture)
+        self._segments, self._seg_colors, self._seg_widths = [], [], []
+        self._paths, self._path_faces, self._path_edges, self._path_widths = [], [], [], []
+        _current_screen.set(self)
 
     def setup(self, width, height):
         """Approxime turtle.Screen().setup(width,height)."""
@@ -133,6 +197,7 @@ class _Screen:
         self.ax.axis('off')
 
     def title(self, text):
+        self.window_title = str(text)
         try:
             self.fig.suptitle(text)
         except Exception:
@@ -143,14 +208,200 @@ class _Screen:
         # Avec Matplotlib on ne s'en sert pas : méthode factice pour compatibilité.
         pass
 
+    # --- Primitives appelées par _Turtle ---
+    def add_segment(self, x0, y0, x1, y1, color, width):
+        if not self.batch:
+            self.ax.plot([x0, x1], [y0, y1], linewidth=width, color=color)
+            return
+        self._segments.append(((x0, y0), (x1, y1)))
+        self._seg_colors.append(color)
+        self._seg_widths.append(width)
+
+    def add_fill(self, path, facecolor, edgecolor, width):
+        from matplotlib.path import Path
+        self.add_path(Path(list(path) + [path[0]], closed=True),
+                      facecolor, edgecolor, width)
+
+    def add_rounded_rect(self, x0, y0, x1, y1, r, facecolor, edgecolor, width):
+        self.add_path(_rounded_rect_path(x0, y0, x1, y1, r),
+                      facecolor, edgecolor, width)
+
+    def add_path(self, path, facecolor, edgecolor, width):
+        """Forme fermée quelconque (``matplotlib.path.Path``, courbes comprises)."""
+        if not self.batch:
+            from matplotlib.patches import PathPatch
+            self.ax.add_patch(PathPatch(path, facecolor=facecolor,
+                                        edgecolor=edgecolor, linewidth=width))
+            return
+        self._paths.append(path)
+        self._path_faces.append(facecolor)
+        self._path_edges.append(edgecolor)
+        self._path_widths.append(width)
+
+    def add_text(self, x, y, text, **kwargs):
+        self.ax.text(x, y, text, **kwargs)
+
+    def flush(self):
+        """Vide les tampons du mode batch dans l'axe (une collection par type)."""
+        from matplotlib.collections import LineCollection, PathCollection
+        if self._paths:
+            # zorder=1 comme un Patch : les remplissages restent sous les traits.
+            # PathCollection (et non PolyCollection) pour garder les arcs Bézier.
+            self.ax.add_collection(PathCollection(
+                self._paths, facecolors=self._path_faces,
+                edgecolors=self._path_edges, linewidths=self._path_widths,
+                zorder=1), autolim=False)
+        if self._segments:
+            # zorder=2, extrémités/jointures comme les Line2D de ax.plot
+            self.ax.add_collection(LineCollection(
+                self._segments, colors=self._seg_colors,
+                linewidths=self._seg_widths, capstyle="projecting",
+                joinstyle="round", zorder=2), autolim=False)
+        self._segments, self._seg_colors, self._seg_widths = [], [], []
+        self._paths, self._path_faces, self._path_edges, self._path_widths = [], [], [], []
+        self.ax.set_aspect("equal", adjustable="box")
+
+    def show(self):
+        import matplotlib.pyplot as plt
+        plt.show()
+
+
+def _svg_num(v):
+    """Nombre compact pour le SVG (2 décimales, sans zéros inutiles)."""
+    s = f"{v:.2f}".rstrip("0").rstrip(".")
+    return "0" if s in ("-0", "") else s
+
+def _svg_color(c):
+    if c is None or c == "":
+        return "none"
+    if isinstance(c, (tuple, list)):
+        r, g, b = (int(round(float(v) * 255)) if float(v) <= 1.0 else int(v) for v in c[:3])
+        return f"#{r:02x}{g:02x}{b:02x}"
+    return _xml_escape(str(c), {'"': "&quot;"})
+
+# 1 pt Matplotlib = 100/72 px (figure à 100 dpi, cf. _Screen.setup)
+_PT_TO_PX = 100.0 / 72.0
+
+class _SvgScreen:
+    """
+    Écran turtle qui écrit directement du SVG (aucun import matplotlib).
+
+    Même interface que _Screen (setup/title/tracer + primitives add_*).
+    Repère turtle centré sur (0,0), y vers le haut : y est inversé à l'écriture.
+    Ordre de peinture identique au mode batch Matplotlib : remplissages,
+    puis traits, puis textes. Le document est disponible dans ``self.svg``
+    après flush().
+    """
+    def __init__(self):
+        self.headless = True
+        self.width = float(WIN_W)
+        self.height = float(WIN_H)
+        self.window_title = None
+        self.svg = None
+        self._fills = []
+        self._polylines = []   # [couleur, épaisseur, [(x, y), ...]]
+        self._texts = []
+        _current_screen.set(self)
+
+    def setup(self, width, height):
+        self.width, self.height = float(width), float(height)
+
+    def title(self, text):
+        self.window_title = str(text)
+
+    def tracer(self, flag):
+        pass
+
+    # --- Primitives appelées par _Turtle ---
+    def add_segment(self, x0, y0, x1, y1, color, width):
+        # Segments consécutifs de même style fusionnés en une polyline
+        if self._polylines:
+            last = self._polylines[-1]
+            if last[0] == color and last[1] == width and last[2][-1] == (x0, y0):
+                last[2].append((x1, y1))
+                return
+        self._polylines.append([color, width, [(x0, y0), (x1, y1)]])
+
+    def add_fill(self, path, facecolor, edgecolor, width):
+        # <polygon> se ferme tout seul : on retire les doublons et le point de retour
+        verts = [p for i, p in enumerate(path) if i == 0 or p != path[i - 1]]
+        while len(verts) > 1 and verts[-1] == verts[0]:
+            verts.pop()
+        pts = " ".join(f"{_svg_num(x)},{_svg_num(-y)}" for x, y in verts)
+        self._fills.append(
+            f'<polygon points="{pts}" fill="{_svg_color(facecolor)}" '
+            f'stroke="{_svg_color(edgecolor)}" stroke-width="{_svg_num(width * _PT_TO_PX)}"/>')
+
+    def add_rounded_rect(self, x0, y0, x1, y1, r, facecolor, edgecolor, width):
+        self._fills.append(
+            f'<rect x="{_svg_num(x0)}" y="{_svg_num(-y1)}" width="{_svg_num(x1 - x0)}" '
+            f'height="{_svg_num(y1 - y0)}" rx="{_svg_num(r)}" fill="{_svg_color(facecolor)}" '
+            f'stroke="{_svg_color(edgecolor)}" stroke-width="{_svg_num(width * _PT_TO_PX)}"/>')
+
+    def add_text(self, x, y, text, ha="left", va="center", fontfamily=None,
+                 fontsize=10, fontweight=None, fontstyle=None, **_kwargs):
+        anchor = {"left": "start", "center": "middle", "right": "end"}.get(ha, "start")
+        size = float(fontsize) * _PT_TO_PX
+        attrs = [f'x="{_svg_num(x)}"', f'y="{_svg_num(-y)}"', f'text-anchor="{anchor}"',
+                 f'font-size="{_svg_num(size)}"']
+        if fontfamily:
+            attrs.append(f'font-family="{_xml_escape(str(fontfamily))}, sans-serif"')
+        if fontweight and fontweight != "normal":
+            attrs.append(f'font-weight="{fontweight}"')
+        if fontstyle and fontstyle != "normal":
+            attrs.append(f'font-style="{fontstyle}"')
+        lines = str(text).split("\n")
+        if len(lines) == 1:
+            self._texts.append(f'<text {" ".join(attrs)} dominant-baseline="central">'
+                               f'{_xml_escape(lines[0])}</text>')
+            return
+        # Multi-ligne : interligne 1.2 comme Matplotlib, bloc centré sur y
+        step = 1.2 * size
+        y_first = -y - step * (len(lines) - 1) / 2.0
+        spans = "".join(
+            f'<tspan x="{_svg_num(x)}" y="{_svg_num(y_first + i * step)}">{_xml_escape(line)}</tspan>'
+            for i, line in enumerate(lines))
+        self._texts.append(f'<text {" ".join(attrs)} dominant-baseline="central">{spans}</text>')
+
+    def flush(self):
+        w, h = self.width, self.height
+        out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{_svg_num(w)}" height="{_svg_num(h)}" '
+               f'viewBox="{_svg_num(-w / 2)} {_svg_num(-h / 2)} {_svg_num(w)} {_svg_num(h)}">',
+               f'<rect x="{_svg_num(-w / 2)}" y="{_svg_num(-h / 2)}" width="{_svg_num(w)}" '
+               f'height="{_svg_num(h)}" fill="white"/>']
+        if self.window_title:
+            out.append(f'<text x="0" y="{_svg_num(-h / 2 + 0.02 * h)}" text-anchor="middle" '
+                       f'dominant-baseline="hanging" font-size="{_svg_num(12 * _PT_TO_PX)}" '
+                       f'font-family="sans-serif">{_xml_escape(self.window_title)}</text>')
+        out.append('<g stroke-linejoin="round">')
+        out.extend(self._fills)
+        out.append('</g><g fill="none" stroke-linecap="square" stroke-linejoin="round">')
+        for color, width, pts in self._polylines:
+            coords = " ".join(f"{_svg_num(x)},{_svg_num(-y)}" for x, y in pts)
+            out.append(f'<polyline points="{coords}" stroke="{_svg_color(color)}" '
+                       f'stroke-width="{_svg_num(width * _PT_TO_PX)}"/>')
+        out.append('</g><g fill="black">')
+        out.extend(self._texts)
+        out.append('</g></svg>')
+        self.svg = "\n".join(out)
+        self._fills, self._polylines, self._texts = [], [], []
+
+    def show(self):
+        pass
+
+
+def _make_screen(**kwargs):
+    """turtle.Screen() : écran Matplotlib ou SVG selon le backend courant."""
+    if _screen_backend.get() == "svg":
+        return _SvgScreen()
+    return _Screen(**kwargs)
+
 
 class _Turtle:
-    def __init__(self, visible=True):
-        global _current_screen
-        if _current_screen is None:
-            _current_screen = _Screen()
-        self.screen = _current_screen
-        self.ax = self.screen.ax
+    def __init__(self, visible=True, screen=None):
+        if screen is None:
+            screen = _current_screen.get() or _make_screen()
+        self.screen = screen
         self.x = 0.0
         self.y = 0.0
         # 0° vers la droite, positif = anti-horaire (comme turtle)
@@ -194,9 +445,8 @@ class _Turtle:
         x = float(x)
         y = float(y)
         if self.pen_down:
-            self.ax.plot([self.x, x], [self.y, y],
-                         linewidth=self.linewidth,
-                         color=self.pencolor_value)
+            self.screen.add_segment(self.x, self.y, x, y,
+                                    self.pencolor_value, self.linewidth)
         if self.is_filling:
             if not self.fill_path:
                 self.fill_path.append((self.x, self.y))
@@ -222,11 +472,8 @@ class _Turtle:
 
     def end_fill(self):
         if self.is_filling and len(self.fill_path) >= 3:
-            poly = Polygon(self.fill_path, closed=True,
-                           facecolor=self.fillcolor_value,
-                           edgecolor=self.pencolor_value,
-                           linewidth=self.linewidth)
-            self.ax.add_patch(poly)
+            self.screen.add_fill(self.fill_path, self.fillcolor_value,
+                                 self.pencolor_value, self.linewidth)
         self.is_filling = False
         self.fill_path = []
 
@@ -265,6 +512,23 @@ class _Turtle:
         # nouvelle orientation de la tortue à la fin de l'arc
         self.heading = start_heading + extent
 
+    # --- Rectangle arrondi natif (un seul Path avec arcs Bézier) ---
+    def rounded_rect(self, x0, y0, x1, y1, radius, fill=None):
+        """Rectangle à coins arrondis en pixels, tracé avec le stylo courant.
+
+        Équivalent de la séquence forward/circle de turtle, mais émis comme une
+        seule forme (4 arcs Bézier) au lieu de ~80 segments + un polygone.
+        """
+        x0, x1 = sorted((float(x0), float(x1)))
+        y0, y1 = sorted((float(y0), float(y1)))
+        r = max(0.0, min(float(radius), (x1 - x0) / 2.0, (y1 - y0) / 2.0))
+        self.screen.add_rounded_rect(x0, y0, x1, y1, r,
+                                     fill if fill is not None else "none",
+                                     self.pencolor_value, self.linewidth)
+        self.up()
+        self.x, self.y = x0 + r, y0
+        self.heading = 0.0
+
     # --- Texte ---
     def write(self, text, align="left", font=None):
         ha = {"left": "left", "center": "center", "right": "right"}.get(align, "left")
@@ -281,7 +545,7 @@ class _Turtle:
                     kwargs["fontweight"] = style
                 else:
                     kwargs["fontstyle"] = style
-        self.ax.text(self.x, self.y, str(text), **kwargs)
+        self.screen.add_text(self.x, self.y, str(text), **kwargs)
 
     # --- Autres méthodes ---
     def speed(self, _):
@@ -294,15 +558,23 @@ class _Turtle:
 
 
 def _done():
-    """Équivalent de turtle.done() : affiche la figure Matplotlib."""
-    global _current_screen
-    if _current_screen is not None:
-        _current_screen.ax.set_aspect("equal", adjustable="box")
-        plt.show()
-    _current_screen = None
+    """Équivalent de turtle.done() : affiche la figure Matplotlib.
 
+    En mode sans affichage, la figure est remise à render_to_bytes au lieu
+    d'être montrée.
+    """
+    screen = _current_screen.get()
+    if screen is not None:
+        screen.flush()
+        capture = _headless_capture.get()
+        if capture is not None:
+            capture.append(screen)
+        else:
+            screen.show()
+    _current_screen.set(None)
 
-turtle = types.SimpleNamespace(Screen=_Screen, Turtle=_Turtle, done=_done)
+
+turtle = types.SimpleNamespace(Screen=_make_screen, Turtle=_Turtle, done=_done)
 
 # =========================
 # Réglages / constantes
@@ -318,12 +590,15 @@ LINE_WIDTH         = 2
 # - dossiers = gris (un ton plus clair)
 # - assises/banquettes = gris très clair (presque blanc)
 # - coussins = taupe
-# NB : Ces valeurs seront éventuellement écrasées à chaque render_* via _resolve_and_apply_colors()
+# NB : Valeurs par défaut uniquement ; la palette d'un render_* est résolue par
+# _resolve_palette() et portée par sa DisplayList (les globales ne changent jamais).
 COLOR_ASSISE       = "#f6f6f6"  # gris très clair / presque blanc
 COLOR_ACC          = "#8f8f8f"  # gris
 COLOR_DOSSIER      = "#b8b8b8"  # gris plus clair que accoudoirs
 COLOR_CUSHION      = "#8B7E74"  # taupe
 COLOR_CONTOUR      = "black"
+_DEFAULT_PALETTE   = {"ACC": COLOR_ACC, "DOSSIER": COLOR_DOSSIER,
+                      "ASSISE": COLOR_ASSISE, "CUSHION": COLOR_CUSHION}
 
 # (Conservés mais non utilisés car quadrillage/repères supprimés)
 GRID_MINOR_STEP    = 10
@@ -553,15 +828,14 @@ def _parse_couleurs_argument(couleurs):
             res[kn] = v
     return res
 
-def _resolve_and_apply_colors(couleurs):
+def _resolve_palette(couleurs):
     """
-    Résout la palette utilisateur puis applique aux variables globales:
-      COLOR_ASSISE, COLOR_ACC, COLOR_DOSSIER, COLOR_CUSHION
-    Retourne une liste d'items pour la légende: [(libellé, hex, nom)]
+    Résout la palette utilisateur pour un rendu, sans toucher aux globales.
+    Retourne (palette, items) :
+      palette : {"ACC", "DOSSIER", "ASSISE", "CUSHION"} -> hex, portée par la DisplayList
+      items   : liste d'items pour la légende: [(libellé, hex, nom)]
     Règle : si dossiers non spécifié mais accoudoirs oui => dossiers = accoudoirs éclaircis.
     """
-    global COLOR_ASSISE, COLOR_ACC, COLOR_DOSSIER, COLOR_CUSHION
-
     # base par défaut (demande client)
     default = {
         "accoudoirs": "gris",
@@ -571,6 +845,14 @@ def _resolve_and_apply_colors(couleurs):
     }
     user = _parse_couleurs_argument(couleurs)
     spec = {**default, **user}
+    # Copies : la palette part avec la DisplayList, le cache garde l'original
+    palette, items = _palette_from_spec(tuple(sorted(spec.items())))
+    return dict(palette), list(items)
+
+@functools.lru_cache(maxsize=256)
+def _palette_from_spec(spec_items):
+    """(palette, items) de _resolve_palette pour une spec complète (items triés, hachables)."""
+    spec = dict(spec_items)
 
     # accoudoirs
     acc_hex, acc_name = _parse_color_value(spec["accoudoirs"])
@@ -586,20 +868,26 @@ def _resolve_and_apply_colors(couleurs):
     # coussins
     cush_hex, cush_name = _parse_color_value(spec["coussins"])
 
-    # applique globals
-    COLOR_ACC     = acc_hex
-    COLOR_DOSSIER = dos_hex
-    COLOR_ASSISE  = ass_hex
-    COLOR_CUSHION = cush_hex
+    palette = {"ACC": acc_hex, "DOSSIER": dos_hex, "ASSISE": ass_hex, "CUSHION": cush_hex}
 
     # Items de légende (texte + nom de couleur si dispo)
     items = [
-        ("Dossier",   COLOR_DOSSIER, dos_name),
-        ("Accoudoir", COLOR_ACC,     acc_name),
-        ("Coussins",  COLOR_CUSHION, cush_name),
-        ("Assise",    COLOR_ASSISE,  ass_name),
+        ("Dossier",   dos_hex,  dos_name),
+        ("Accoudoir", acc_hex,  acc_name),
+        ("Coussins",  cush_hex, cush_name),
+        ("Assise",    ass_hex,  ass_name),
     ]
-    return items
+    return palette, items
+
+def _color(t, role):
+    """
+    Couleur d'un rôle ("ACC", "DOSSIER", "ASSISE", "CUSHION") pour le rendu en cours :
+    palette portée par la DisplayList, à défaut les couleurs par défaut du module.
+    """
+    palette = getattr(t, "palette", None)
+    if palette and role in palette:
+        return palette[role]
+    return _DEFAULT_PALETTE[role]
 
 # =========================
 # Transform cm → px (isométrique & centré)
@@ -615,6 +903,15 @@ class WorldToScreen:
         self.bottom_px = -used_h / 2.0
     def pt(self, x_cm, y_cm):
         return (self.left_px + x_cm*self.scale, self.bottom_px + y_cm*self.scale)
+    def inv(self, x_px, y_px):
+        """Inverse de pt() : pixels écran -> cm."""
+        return ((x_px - self.left_px) / self.scale, (y_px - self.bottom_px) / self.scale)
+    @classmethod
+    def from_state(cls, scale, left_px, bottom_px):
+        """Reconstruit une transformation à partir de ses paramètres (désérialisation)."""
+        tr = cls.__new__(cls)
+        tr.scale, tr.left_px, tr.bottom_px = float(scale), float(left_px), float(bottom_px)
+        return tr
 
 # =========================
 # Outils dessin
@@ -634,10 +931,13 @@ def _is_axis_aligned_rect(pts):
     return len(xs) == 2 and len(ys) == 2
 
 def draw_rounded_rect_cm(t, tr, x0, y0, x1, y1, r_cm=CUSHION_ROUND_R_CM,
-                         fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH):
+                         fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH, role=None):
     # normalise
     if x0 > x1: x0, x1 = x1, x0
     if y0 > y1: y0, y1 = y1, y0
+    if isinstance(t, DisplayList):
+        t.add_rounded_rect(x0, y0, x1, y1, r_cm, fill, outline, width, role=role)
+        return
     rx = max(0.0, min(r_cm, (x1-x0)/2.0, (y1-y0)/2.0))
     wpx = (x1 - x0) * tr.scale
     hpx = (y1 - y0) * tr.scale
@@ -646,6 +946,12 @@ def draw_rounded_rect_cm(t, tr, x0, y0, x1, y1, r_cm=CUSHION_ROUND_R_CM,
 
     t.pensize(width)
     t.pencolor(outline)
+    if hasattr(t, "rounded_rect"):
+        # Chemin natif : une seule forme au lieu de ~80 segments
+        px0, py0 = tr.pt(x0, y0)
+        px1, py1 = tr.pt(x1, y1)
+        t.rounded_rect(px0, py0, px1, py1, rpx, fill=fill or None)
+        return
     pen_up_to(t, sx, sy)
     if fill:
         t.fillcolor(fill)
@@ -659,17 +965,28 @@ def draw_rounded_rect_cm(t, tr, x0, y0, x1, y1, r_cm=CUSHION_ROUND_R_CM,
     if fill:
         t.end_fill()
 
-def draw_polygon_cm(t, tr, pts, fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH):
+def draw_polygon_cm(t, tr, pts, fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH, role=None):
+    """
+    role : "cushion" pour un coussin (arrondi auto s'il est rectangulaire
+    axis‑aligné, relu par _attach_layout). La couleur seule ne suffit pas :
+    la palette peut donner aux coussins la couleur de l'assise.
+    """
     if not pts: return
     # Arrondi auto pour coussins rectangulaires axis‑alignés
-    if fill == COLOR_CUSHION and _is_axis_aligned_rect(pts):
+    if role == "cushion" and _is_axis_aligned_rect(pts):
         xs = [x for x, _ in pts[:-1]] if pts[0] == pts[-1] else [x for x, _ in pts]
         ys = [y for _, y in pts[:-1]] if pts[0] == pts[-1] else [y for _, y in pts]
         x0, x1 = min(xs), max(xs); y0, y1 = min(ys), max(ys)
         draw_rounded_rect_cm(t, tr, x0, y0, x1, y1, r_cm=CUSHION_ROUND_R_CM,
-                             fill=fill, outline=outline, width=width)
+                             fill=fill, outline=outline, width=width, role=role)
         return
-    # Fallback polygonal
+    if isinstance(t, DisplayList):
+        t.add_polygon(pts, fill, outline, width, role=role)
+        return
+    _trace_polygon_cm(t, tr, pts, fill, outline, width)
+
+def _trace_polygon_cm(t, tr, pts, fill, outline, width):
+    """Tracé polygonal à la tortue (sans l'arrondi automatique des coussins)."""
     t.pensize(width); t.pencolor(outline)
     x0, y0 = tr.pt(*pts[0]); pen_up_to(t, x0, y0)
     if fill: t.fillcolor(fill); t.begin_fill()
@@ -692,6 +1009,9 @@ def _unit(vx, vy):
     return (vx/n, vy/n) if n else (0, 0)
 
 def draw_double_arrow_px(t, p1, p2, text=None, text_perp_offset_px=0, text_tang_shift_px=0):
+    if isinstance(t, DisplayList):
+        t.add_arrow(t.tr.inv(*p1), t.tr.inv(*p2), text, text_perp_offset_px, text_tang_shift_px)
+        return
     t.pensize(1.5); t.pencolor("black")
     pen_up_to(t, *p1); t.down(); t.goto(*p2); t.up()
     vx, vy = (p2[0]-p1[0], p2[1]-p1[1]); ux, uy = _unit(vx, vy); px, py = -uy, ux
@@ -708,9 +1028,15 @@ def draw_double_arrow_px(t, p1, p2, text=None, text_perp_offset_px=0, text_tang_
         pen_up_to(t, tx, ty); t.write(text, align="center", font=FONT_DIM)
 
 def draw_double_arrow_vertical_cm(t, tr, x_cm, y0_cm, y1_cm, label):
+    if isinstance(t, DisplayList):
+        t.add_arrow((x_cm, y0_cm), (x_cm, y1_cm), label, +12, 0)
+        return
     draw_double_arrow_px(t, tr.pt(x_cm, y0_cm), tr.pt(x_cm, y1_cm), text=label, text_perp_offset_px=+12)
 
 def draw_double_arrow_horizontal_cm(t, tr, y_cm, x0_cm, x1_cm, label):
+    if isinstance(t, DisplayList):
+        t.add_arrow((x0_cm, y_cm), (x1_cm, y_cm), label, -12, 20)
+        return
     draw_double_arrow_px(t, tr.pt(x0_cm, y_cm), tr.pt(x1_cm, y_cm), text=label,
                          text_perp_offset_px=-12, text_tang_shift_px=20)
 
@@ -718,11 +1044,19 @@ def centroid(poly):
     return (sum(x for x,y in poly)/len(poly), sum(y for x,y in poly)/len(poly))
 
 def label_poly(t, tr, poly, text, font=FONT_LABEL):
-    cx, cy = centroid(poly); pen_up_to(t, *tr.pt(cx, cy))
+    cx, cy = centroid(poly)
+    if isinstance(t, DisplayList):
+        t.add_text(cx, cy, text, "center", font)
+        return
+    pen_up_to(t, *tr.pt(cx, cy))
     t.write(text, align="center", font=font)
 
 def label_poly_offset_cm(t, tr, poly, text, dx_cm=0.0, dy_cm=0.0, font=FONT_LABEL):
-    cx, cy = centroid(poly); x, y = tr.pt(cx + dx_cm, cy + dy_cm)
+    cx, cy = centroid(poly)
+    if isinstance(t, DisplayList):
+        t.add_text(cx + dx_cm, cy + dy_cm, text, "center", font)
+        return
+    x, y = tr.pt(cx + dx_cm, cy + dy_cm)
     pen_up_to(t, x, y); t.write(text, align="center", font=font)
 
 def banquette_dims(poly):
@@ -794,6 +1128,179 @@ def _assert_banquettes_max_250(polys):
         if L > MAX_BANQUETTE:
             raise ValueError(f"Banquette de {L}×{P} cm > {MAX_BANQUETTE} cm — scission supplémentaire nécessaire.")
 
+# =====================================================================
+# ================  Scission optimisée (coût des supports)  ===========
+# =====================================================================
+# Option : quand _split_costs porte les coûts de revient des supports
+# (cf. pricing.couts_scission), chaque banquette déjà scindée est recoupée
+# aux positions entières — et au nombre de morceaux — qui minimisent
+#   supports banquette (palier <= 200 cm) + supplément tissu par morceau
+#   + dossiers posés sur la même coupe (0,5 si <= 110 cm, palier <= 200 cm),
+# toujours <= MAX_BANQUETTE. Les coussins ne dépendent pas des coupes.
+# Sans coûts : coupe au milieu (_split_mid_int), comportement d'origine.
+
+def _rect_box(poly):
+    """(x0, y0, x1, y1) d'un rectangle aligné sur les axes (fermé ou non), sinon None."""
+    pts = list(poly)
+    if len(pts) == 5 and tuple(pts[0]) == tuple(pts[-1]):
+        pts = pts[:-1]
+    if len(pts) != 4:
+        return None
+    xs = sorted({p[0] for p in pts}); ys = sorted({p[1] for p in pts})
+    if len(xs) != 2 or len(ys) != 2:
+        return None
+    return xs[0], ys[0], xs[1], ys[1]
+
+def _rect_chains(boxes):
+    """Suites d'au moins 2 rectangles jointifs de même section : [(axe, [indices])]."""
+    chains = []
+    for axis in (0, 1):
+        groups = {}
+        for i, b in enumerate(boxes):
+            if b is not None:
+                groups.setdefault((b[1 - axis], b[3 - axis]), []).append(i)
+        for idx in groups.values():
+            idx.sort(key=lambda i: boxes[i][axis])
+            run = idx[:1]
+            for i in idx[1:]:
+                if boxes[i][axis] == boxes[run[-1]][axis + 2]:
+                    run.append(i)
+                    continue
+                if len(run) > 1:
+                    chains.append((axis, run))
+                run = [i]
+            if len(run) > 1:
+                chains.append((axis, run))
+    return chains
+
+@functools.lru_cache(maxsize=4096)
+def _best_split_cuts(s0, s1, width, dossier, costs, current):
+    """
+    Coupes (coordonnées le long de la branche) de coût minimal pour l'assise
+    [s0, s1], ou None si les coupes actuelles (tuple) sont déjà optimales.
+    dossier : (d0, d1) de la bande de dossier coupée avec l'assise, ou None.
+    costs : items triés du dict de coûts (hachable, pour le cache).
+    """
+    import numpy as np
+    costs = dict(costs)
+    L = s1 - s0
+    pos = np.append(s0 + np.arange(int(math.ceil(L))), s1).astype(float)
+    last = len(pos) - 1
+    q = np.arange(len(pos))[:, None]; p = np.arange(len(pos))[None, :]
+    seg = pos[None, :] - pos[:, None]
+    ok = (p > q) & (seg <= MAX_BANQUETTE)
+    cost = np.where(np.maximum(seg, width) <= 200, costs["banquette"], costs["banquette_long"]) \
+        + costs.get("supplement", 0.0)
+    if dossier is not None:
+        d0, d1 = dossier
+        lo = np.where(q == 0, d0, pos[:, None]); hi = np.where(p == last, d1, pos[None, :])
+        dl = hi - lo
+        ok &= dl > 1e-9
+        cost = cost + np.where(dl <= 110, 0.5, 1.0) * np.where(dl <= 200, costs["dossier"], costs["dossier_long"])
+    cost = np.where(ok, cost, np.inf)
+
+    def cuts_cost(cuts):
+        idx = [0] + [int(np.searchsorted(pos, c)) for c in cuts] + [last]
+        if any(pos[i] != c for i, c in zip(idx[1:-1], cuts)):
+            return np.inf
+        return float(sum(cost[a, b] for a, b in zip(idx, idx[1:])))
+
+    k_min = max(2, int(math.ceil(L / MAX_BANQUETTE)))
+    best = None
+    for k in (k_min, k_min + 1):
+        # léger terme d'équilibre : à coût égal, morceaux les plus réguliers
+        c_k = cost + 1e-6 * (seg - L / k) ** 2
+        D = c_k[0].copy(); back = []
+        for _ in range(k - 1):
+            tot = D[:, None] + c_k
+            arg = np.argmin(tot, axis=0)
+            back.append(arg); D = tot[arg, np.arange(len(pos))]
+        if not np.isfinite(D[last]):
+            continue
+        idx = [last]
+        for arg in reversed(back):
+            idx.append(int(arg[idx[-1]]))
+        cuts = [float(pos[i]) for i in reversed(idx[1:])]
+        total = cuts_cost(cuts)
+        if best is None or total < best[0] - 1e-9:
+            best = (total, cuts)
+    if best is None:
+        return None
+    if cuts_cost(current) <= best[0] + 1e-9:
+        return None
+    return tuple(int(c) if float(c).is_integer() else c for c in best[1])
+
+def _optimize_splits(polys, costs):
+    """Recoupe sur place les banquettes scindées de polys (et leurs dossiers)."""
+    bans = polys.get("banquettes", [])
+    dos = polys.get("dossiers", [])
+    ban_boxes = [_rect_box(p) for p in bans]
+    dos_boxes = [_rect_box(p) for p in dos]
+    dos_chains = _rect_chains(dos_boxes)
+    new_bans, new_dos = {}, {}
+    for axis, run in _rect_chains(ban_boxes):
+        boxes = [ban_boxes[i] for i in run]
+        s0, s1 = boxes[0][axis], boxes[-1][axis + 2]
+        current = [b[axis + 2] for b in boxes[:-1]]
+        # dossier adossé à l'assise (sections jointives), coupé aux mêmes positions ;
+        # un dossier adossé qui traverse une coupe sans y être coupé : on ne touche à rien
+        p0, p1 = boxes[0][1 - axis], boxes[0][3 - axis]
+        beside = lambda b: b is not None and (abs(b[3 - axis] - p0) < 1e-6 or abs(b[1 - axis] - p1) < 1e-6)
+        d_run = None
+        for a, r in dos_chains:
+            bounds = [dos_boxes[i][axis + 2] for i in r[:-1]]
+            if a == axis and beside(dos_boxes[r[0]]) and current[0] in bounds:
+                j = bounds.index(current[0])
+                if bounds[j:j + len(current)] == current:
+                    d_run = r[j:j + len(current) + 1]
+                    break
+        if d_run is None and any(beside(b) and any(b[axis] < c < b[axis + 2] for c in current)
+                                 for b in dos_boxes):
+            continue
+        dossier = None
+        if d_run is not None:
+            dossier = (dos_boxes[d_run[0]][axis], dos_boxes[d_run[-1]][axis + 2])
+        width = p1 - p0
+        cuts = _best_split_cuts(s0, s1, width, dossier, tuple(sorted(costs.items())), tuple(current))
+        if cuts is None:
+            continue
+
+        def pieces(start, end, perp):
+            edges = [start, *cuts, end]
+            out = []
+            for a, b in zip(edges, edges[1:]):
+                out.append(_rectU(a, perp[0], b, perp[1]) if axis == 0 else _rectU(perp[0], a, perp[1], b))
+            return out
+        new_bans[run[0]] = (run, pieces(s0, s1, (p0, p1)))
+        if d_run is not None:
+            db = dos_boxes[d_run[0]]
+            new_dos[d_run[0]] = (d_run, pieces(dossier[0], dossier[1], (db[1 - axis], db[3 - axis])))
+
+    for key, replacements in (("banquettes", new_bans), ("dossiers", new_dos)):
+        if not replacements:
+            continue
+        dropped = {i for run, _ in replacements.values() for i in run}
+        out = []
+        for i, poly in enumerate(polys[key]):
+            if i in replacements:
+                out += replacements[i][1]
+            elif i not in dropped:
+                out.append(poly)
+        polys[key] = out
+    return polys
+
+def _cost_aware_splits(build_fn):
+    """Décorateur des build_polys_* : applique _optimize_splits quand _split_costs est défini."""
+    @functools.wraps(build_fn)
+    def wrapper(*args, **kwargs):
+        result = build_fn(*args, **kwargs)
+        costs = _split_costs.get()
+        if costs is not None:
+            # build_polys_U_v* retournent (polys, drawn)
+            _optimize_splits(result[0] if isinstance(result, tuple) else result, costs)
+        return result
+    return wrapper
+
 # =====================================================================
 # ================  Outils légende & titres (lisibilité)  =============
 # =====================================================================
@@ -830,6 +1337,9 @@ def draw_title_center(t, tr, tx_cm, ty_cm, text):
     y  = top - TITLE_MARGIN_PX
     lines = _wrap_text(text, max_len=34)
     for i, line in enumerate(lines):
+        if isinstance(t, DisplayList):
+            t.add_text(*tr.inv(cx, y - i*18), line, "center", FONT_TITLE)
+            continue
         pen_up_to(t, cx, y - i*18)
         t.write(line, align="center", font=FONT_TITLE)
 
@@ -838,17 +1348,20 @@ def draw_legend(t, tr, tx_cm, ty_cm, items=None, pos="top-right"):
     Légende avec items = [(label, hex, name), ...]
       - pos: "top-right" (par défaut) ou "top-center" (pour U afin d'éviter recouvrement)
     """
-    left = tr.left_px; bottom = tr.bottom_px
-    right = left + tx_cm*tr.scale; top = bottom + ty_cm*tr.scale
-
     # Items / couleurs
     if not items:
         items = [
-            ("Dossier",   COLOR_DOSSIER, None),
-            ("Accoudoir", COLOR_ACC,     None),
-            ("Coussins",  COLOR_CUSHION, None),
-            ("Assise",    COLOR_ASSISE,  None),
+            ("Dossier",   _color(t, "DOSSIER"), None),
+            ("Accoudoir", _color(t, "ACC"),     None),
+            ("Coussins",  _color(t, "CUSHION"), None),
+            ("Assise",    _color(t, "ASSISE"),  None),
         ]
+    if isinstance(t, DisplayList):
+        t.add_legend(tx_cm, ty_cm, items, pos)
+        return
+    left = tr.left_px; bottom = tr.bottom_px
+    right = left + tx_cm*tr.scale; top = bottom + ty_cm*tr.scale
+
     # Taille & position + placement "safe" (jamais sur le schéma)
     box = LEGEND_BOX_PX
     gap = LEGEND_GAP_PX
@@ -938,6 +1451,229 @@ def draw_legend(t, tr, tx_cm, ty_cm, items=None, pos="top-right"):
         t.write(lbl, align="left", font=FONT_LEGEND)
         cur_y -= (box + gap)
 
+# =====================================================================
+# ================  Display list (géométrie → dessin)  ================
+# =====================================================================
+
+class DisplayList:
+    """
+    Liste ordonnée de primitives typées produite par les render_*.
+
+    Les outils de dessin (draw_polygon_cm, draw_rounded_rect_cm, label_poly,
+    flèches, draw_legend, ...) reçoivent une DisplayList à la place de la tortue
+    et y enregistrent leurs primitives, en cm et avec les couleurs déjà résolues.
+    La liste se rejoue ensuite vers n'importe quel écran (Matplotlib, SVG) sans
+    refaire le calcul de géométrie, et se sérialise (to_dict / from_dict).
+
+    Primitives (dict, clé "kind") :
+      polygon      : pts, fill, outline, width (+ role "cushion")
+      rounded_rect : x0, y0, x1, y1, r, fill, outline, width (+ role "cushion" / "traversin")
+      text         : x, y, text, align, font
+      arrow        : p1, p2, text, perp_px, tang_px
+      legend       : tx, ty, pos, items = [[label, couleur, nom], ...]
+    """
+    def __init__(self, tr, width=WIN_W, height=WIN_H, title=None, palette=None):
+        self.tr = tr
+        self.width = width
+        self.height = height
+        self.title = title
+        # Palette du rendu (cf. _resolve_palette / _color)
+        self.palette = dict(palette) if palette else dict(_DEFAULT_PALETTE)
+        self.renderer = None
+        self.items = []
+        # Résultat structuré du rendu (cf. _attach_layout / compute_layout)
+        self.layout = None
+
+    # Compatibilité tortue : les render_* appellent encore ces méthodes
+    def speed(self, _):
+        pass
+
+    def hideturtle(self):
+        pass
+
+    # --- Enregistrement ---
+    def add_polygon(self, pts, fill, outline, width, role=None):
+        item = {"kind": "polygon", "pts": [(float(x), float(y)) for x, y in pts],
+                "fill": fill, "outline": outline, "width": width}
+        if role:
+            item["role"] = role
+        self.items.append(item)
+
+    def add_rounded_rect(self, x0, y0, x1, y1, r, fill, outline, width, role=None):
+        item = {"kind": "rounded_rect", "x0": x0, "y0": y0, "x1": x1, "y1": y1,
+                "r": r, "fill": fill, "outline": outline, "width": width}
+        if role:
+            item["role"] = role
+        self.items.append(item)
+
+    def add_text(self, x, y, text, align, font):
+        self.items.append({"kind": "text", "x": x, "y": y, "text": str(text),
+                           "align": align, "font": list(font)})
+
+    def add_arrow(self, p1, p2, text, perp_px, tang_px):
+        self.items.append({"kind": "arrow", "p1": tuple(p1), "p2": tuple(p2), "text": text,
+                           "perp_px": perp_px, "tang_px": tang_px})
+
+    def add_legend(self, tx, ty, items, pos):
+        self.items.append({"kind": "legend", "tx": tx, "ty": ty, "pos": pos,
+                           "items": [list(it) for it in items]})
+
+    # --- Relecture ---
+    def replay(self, t):
+        """Rejoue les primitives sur une tortue (écran Matplotlib ou SVG)."""
+        tr = self.tr
+        for it in self.items:
+            kind = it["kind"]
+            if kind == "polygon":
+                _trace_polygon_cm(t, tr, it["pts"], it["fill"], it["outline"], it["width"])
+            elif kind == "rounded_rect":
+                draw_rounded_rect_cm(t, tr, it["x0"], it["y0"], it["x1"], it["y1"], r_cm=it["r"],
+                                     fill=it["fill"], outline=it["outline"], width=it["width"])
+            elif kind == "text":
+                pen_up_to(t, *tr.pt(it["x"], it["y"]))
+                t.write(it["text"], align=it["align"], font=tuple(it["font"]))
+            elif kind == "arrow":
+                draw_double_arrow_px(t, tr.pt(*it["p1"]), tr.pt(*it["p2"]), text=it["text"],
+                                     text_perp_offset_px=it["perp_px"],
+                                     text_tang_shift_px=it["tang_px"])
+            elif kind == "legend":
+                draw_legend(t, tr, it["tx"], it["ty"],
+                            items=[tuple(x) for x in it["items"]], pos=it["pos"])
+            else:
+                raise ValueError(f"Primitive inconnue : {kind!r}")
+
+    # --- Sérialisation (JSON) ---
+    def to_dict(self):
+        def _plain(v):
+            if isinstance(v, (tuple, list)):
+                return [_plain(x) for x in v]
+            return v
+        return {
+            "renderer": self.renderer,
+            "title": self.title,
+            "palette": dict(self.palette),
+            "width": self.width,
+            "height": self.height,
+            "transform": {"scale": self.tr.scale, "left_px": self.tr.left_px,
+                          "bottom_px": self.tr.bottom_px},
+            "items": [{k: _plain(v) for k, v in it.items()} for it in self.items],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        tf = data["transform"]
+        dl = cls(WorldToScreen.from_state(tf["scale"], tf["left_px"], tf["bottom_px"]),
+                 width=data.get("width", WIN_W), height=data.get("height", WIN_H),
+                 title=data.get("title"), palette=data.get("palette"))
+        dl.renderer = data.get("renderer")
+        dl.items = [dict(it) for it in data.get("items", [])]
+        return dl
+
+def _emit_display_list(dl):
+    """
+    Fin d'un render_* : rejoue la display list sur un écran turtle puis
+    turtle.done() (affichage ou capture sans affichage). En mode capture "dl",
+    la liste est simplement remise à l'appelant.
+    """
+    capture = _headless_capture.get()
+    if capture is not None and _screen_backend.get() == "dl":
+        capture.append(dl)
+        return
+    screen = turtle.Screen(); screen.setup(dl.width, dl.height)
+    if dl.title:
+        screen.title(dl.title)
+    t = turtle.Turtle(visible=False, screen=screen); t.speed(0); screen.tracer(False)
+    dl.replay(t)
+    screen.tracer(True); t.hideturtle()
+    turtle.done()
+
+def _union_length(intervals):
+    """Longueur de la réunion d'intervalles (a, b)."""
+    total = 0.0
+    cur = None
+    for a, b in sorted(intervals):
+        if cur is not None and a <= cur[1]:
+            cur[1] = max(cur[1], b)
+        else:
+            if cur is not None:
+                total += cur[1] - cur[0]
+            cur = [a, b]
+    return total + (cur[1] - cur[0] if cur is not None else 0.0)
+
+def _cushion_waste(rects, seats):
+    """
+    Chute (cm) par bande de coussins : longueur d'assise (banquettes + angles)
+    traversée par la bande moins la longueur couverte par les coussins, toutes
+    branches confondues (un coussin de retour couvre le coin de la bande bas).
+    rects / seats : boîtes (x0, y0, x1, y1) normalisées.
+    """
+    bands = set()
+    for x0, y0, x1, y1 in rects:
+        bands.add((0, (y0 + y1) / 2.0) if (x1 - x0) >= (y1 - y0) else (1, (x0 + x1) / 2.0))
+    waste = 0.0
+    for axis, mid in bands:
+        lo, hi = (0, 2) if axis == 0 else (1, 3)
+        cross = lambda box: box[1 - axis] < mid < box[3 - axis]
+        seat = _union_length([(b[lo], b[hi]) for b in seats if cross(b)])
+        covered = _union_length([(r[lo], r[hi]) for r in rects if cross(r)])
+        waste += max(0.0, seat - covered)
+    return waste
+
+def _attach_layout(t, kind, variant, tx, ty, tz, profondeur, polys, n_traversins,
+                   cushions_total, cushions_line, add_split, nb_angles):
+    """
+    Joint à la DisplayList le résultat structuré du rendu (lu par compute_layout).
+    Les coussins par branche sont relus dans les primitives enregistrées :
+    horizontal -> "bas", vertical -> "gauche"/"droite" selon le côté de tx/2.
+    """
+    branches = {}
+    rects = []
+    for it in t.items:
+        # rôle explicite : les couleurs coussins / assise peuvent être identiques
+        if it["kind"] != "rounded_rect" or it.get("role") != "cushion":
+            continue
+        w = abs(it["x1"] - it["x0"]); h = abs(it["y1"] - it["y0"])
+        rects.append((min(it["x0"], it["x1"]), min(it["y0"], it["y1"]),
+                      max(it["x0"], it["x1"]), max(it["y0"], it["y1"])))
+        if w >= h:
+            side, size = "bas", w
+        else:
+            side = "gauche" if (it["x0"] + it["x1"]) / 2.0 < tx / 2.0 else "droite"
+            size = h
+        b = branches.setdefault(side, {"nombre": 0, "tailles": {}})
+        b["nombre"] += 1
+        size = int(round(size))
+        b["tailles"][size] = b["tailles"].get(size, 0) + 1
+    angles = polys.get("angles", polys.get("angle", []))
+    seats = [(min(x for x, _ in p), min(y for _, y in p), max(x for x, _ in p), max(y for _, y in p))
+             for p in list(polys["banquettes"]) + list(angles) if p]
+
+    t.layout = {
+        "type": kind,
+        "variant": variant,
+        "dimensions": {"tx": tx, "ty": ty, "tz": tz, "profondeur": profondeur},
+        "banquettes": [
+            {"longueur": L, "profondeur": P, "poly": list(poly)}
+            for poly in polys["banquettes"] for L, P in [banquette_dims(poly)]
+        ],
+        "dossiers": [list(p) for p in polys["dossiers"] if _poly_has_area(p)],
+        "accoudoirs": [list(p) for p in polys["accoudoirs"]],
+        "angles": [list(p) for p in angles],
+        "nb_angles": nb_angles,
+        # Comptage pondéré : <=110cm → 0.5, >110cm → 1 (cf. _compute_dossiers_count)
+        "nb_dossiers": _compute_dossiers_count(polys),
+        "dossiers_scission": add_split,
+        "nb_accoudoirs": len(polys["accoudoirs"]),
+        "traversins": n_traversins,
+        "coussins": {
+            "total": cushions_total,
+            "resume": cushions_line,
+            "par_branche": branches,
+            # Assise non couverte (cm), cf. _cushion_waste
+            "chute": round(_cushion_waste(rects, seats), 1),
+        },
+    }
+
 # =====================================================================
 # ================  COUSSINS — utilitaires limites méridienne =========
 # =====================================================================
@@ -1018,8 +1754,77 @@ def _waste_and_count_1d(length, size):
     waste = length - n*size
     return n, waste
 
+# ----- Valise : solveur commun multi-branches -----
+VALISE_SPREAD = 5   # Δ global max entre les tailles des branches
+_VALISE_BANDS = {}
+
+def _valise_band(rng, n_branches, same, spread=VALISE_SPREAD):
+    """
+    Tailles candidates (N, n_branches) : seulement la bande max-min ≤ spread,
+    construite comme « taille mini + décalages 0..spread » (un décalage nul au moins).
+    """
+    key = (tuple(rng), n_branches, bool(same), spread)
+    band = _VALISE_BANDS.get(key)
+    if band is None:
+        import numpy as np
+        r0, r1 = rng
+        base = np.arange(r0, r1 + 1)
+        if same or n_branches == 1:
+            band = np.repeat(base[:, None], n_branches, axis=1)
+        else:
+            grids = np.meshgrid(*[np.arange(spread + 1)] * n_branches, indexing="ij")
+            offs = np.stack(grids, axis=-1).reshape(-1, n_branches)
+            offs = offs[offs.min(axis=1) == 0]
+            band = (base[:, None, None] + offs[None, :, :]).reshape(-1, n_branches)
+            band = band[band.max(axis=1) <= r1]
+        _VALISE_BANDS[key] = band
+    return band
+
+def _solve_valise(lengths, rng, same, by_count=False):
+    """
+    Solveur valise commun (L, U, U1F, U2f, simple).
+
+    lengths : une entrée par combinaison de décalages (dans l'ordre de
+    préférence), donnant la longueur utile de chaque branche.
+    Tous les candidats de la bande sont évalués d'un bloc (floor-div sur les
+    longueurs), puis départagés par (waste, -cover, -tailles..., décalage) ;
+    by_count remplace cover par le nombre de coussins (cas simple).
+
+    Retourne (tailles, décalage retenu, [(waste, cover)] par décalage) ou None.
+    """
+    import numpy as np
+    S = _valise_band(rng, len(lengths[0]), same)
+    if not len(S):
+        return None
+    L = np.asarray(lengths)
+    n = L[:, None, :] // S[None, :, :]
+    used = n * S
+    w = L[:, None, :] - used
+    c = n if by_count else used
+    # addition branche par branche : même ordre que wb + wg + wd
+    waste, cover = w[..., 0], c[..., 0]
+    for j in range(1, S.shape[1]):
+        waste = waste + w[..., j]
+        cover = cover + c[..., j]
+
+    mask = waste == waste.min()
+    cover_m = np.where(mask, cover, cover.min())
+    mask &= cover_m == cover_m.max()
+    shifts, cands = np.nonzero(mask)
+    k = min(range(len(cands)), key=lambda i: (tuple(-S[cands[i]]), shifts[i]))
+    best = cands[k]
+    per_shift = [(waste[s, best].item(), cover[s, best].item()) for s in range(len(L))]
+    return tuple(int(v) for v in S[best]), int(shifts[k]), per_shift
+
 # ----- Traversins : dessin -----
 def _draw_traversin_block(t, tr, x0, y0, x1, y1):
+    if isinstance(t, DisplayList):
+        # rôle explicite : un traversin peut avoir la couleur des coussins
+        t.add_rounded_rect(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1),
+                           CUSHION_ROUND_R_CM, COLOR_TRAVERSIN, COLOR_CONTOUR, 1,
+                           role="traversin")
+        t.add_text((x0+x1)/2.0, (y0+y1)/2.0, "70x30", "center", FONT_CUSHION)
+        return
     draw_rounded_rect_cm(t, tr, x0, y0, x1, y1,
                          r_cm=CUSHION_ROUND_R_CM,
                          fill=COLOR_TRAVERSIN, outline=COLOR_CONTOUR, width=1)
@@ -1176,17 +1981,16 @@ def _apply_traversin_limits_L_like(pts, x_end_key, y_end_key, traversins):
         if "g" in traversins: y_end -= TRAVERSIN_THK
     return x_end, y_end
 
-def _eval_L_like_counts(pts, size_bas, size_g, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
+def _L_like_geom(pts, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
     F0x, F0y = pts["F0"]
     x_end, y_end = _apply_traversin_limits_L_like(pts, x_end_key, y_end_key, traversins)
-
     xs = F0x + (CUSHION_DEPTH if shift_bas else 0)
-    xe = x_end
     y0 = F0y + (0 if shift_bas else CUSHION_DEPTH)
-    ye = y_end
+    geom = {"xs": xs, "xe": x_end, "y0": y0, "ye": y_end}
+    return (max(0, x_end - xs), max(0, y_end - y0)), geom
 
-    len_b = max(0, xe - xs)
-    len_g = max(0, ye - y0)
+def _eval_L_like_counts(pts, size_bas, size_g, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
+    (len_b, len_g), geom = _L_like_geom(pts, shift_bas, x_end_key, y_end_key, traversins)
 
     nb_b, wb = _waste_and_count_1d(len_b, size_bas)
     nb_g, wg = _waste_and_count_1d(len_g, size_g)
@@ -1196,25 +2000,19 @@ def _eval_L_like_counts(pts, size_bas, size_g, shift_bas, x_end_key="Bx", y_end_
         "counts": {"bas": nb_b, "gauche": nb_g},
         "waste": waste_tot,
         "cover": cover,
-        "geom": {"xs": xs, "xe": xe, "y0": y0, "ye": ye}
+        "geom": geom
     }
 
 def _optimize_valise_L_like(pts, rng, same, x_end_key="Bx", y_end_key="By", traversins=None):
-    best = None
-    r0, r1 = rng
-    for size_g in range(r0, r1+1):
-        cand_b = [size_g] if same else range(r0, r1+1)
-        for size_b in cand_b:
-            if abs(size_b - size_g) > 5:
-                continue
-            eval_A = _eval_L_like_counts(pts, size_b, size_g, shift_bas=False, x_end_key=x_end_key, y_end_key=y_end_key, traversins=traversins)
-            eval_B = _eval_L_like_counts(pts, size_b, size_g, shift_bas=True,  x_end_key=x_end_key, y_end_key=y_end_key, traversins=traversins)
-            e = min([eval_A, eval_B], key=lambda E: (E["waste"], -E["cover"], -size_b, -size_g))
-            score = (e["waste"], -e["cover"], -size_b, -size_g)
-            if (best is None) or (score < best["score"]):
-                best = {"score": score, "sizes": {"bas": size_b, "gauche": size_g}, "eval": e,
-                        "shift_bas": (e is eval_B)}
-    return best
+    lengths = [_L_like_geom(pts, sh, x_end_key, y_end_key, traversins)[0] for sh in (False, True)]
+    sol = _solve_valise(lengths, rng, same)
+    if sol is None:
+        return None
+    (size_b, size_g), shift, _ = sol
+    e = _eval_L_like_counts(pts, size_b, size_g, shift_bas=bool(shift), x_end_key=x_end_key, y_end_key=y_end_key, traversins=traversins)
+    return {"score": (e["waste"], -e["cover"], -size_b, -size_g),
+            "sizes": {"bas": size_b, "gauche": size_g}, "eval": e,
+            "shift_bas": bool(shift)}
 
 def _draw_L_like_with_sizes(t, tr, pts, sizes, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
     F0x, F0y = pts["F0"]
@@ -1227,7 +2025,7 @@ def _draw_L_like_with_sizes(t, tr, pts, sizes, shift_bas, x_end_key="Bx", y_end_
     sb = sizes["bas"]
     while x + sb <= xe + 1e-6:
         poly = [(x,yb), (x+sb,yb), (x+sb,yb+CUSHION_DEPTH), (x,yb+CUSHION_DEPTH), (x,yb)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
+        draw_polygon_cm(t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion")
         label_poly(t, tr, poly, f"{sb}", font=FONT_CUSHION)
         x += sb; nb += 1
 
@@ -1238,14 +2036,16 @@ def _draw_L_like_with_sizes(t, tr, pts, sizes, shift_bas, x_end_key="Bx", y_end_
     sg = sizes["gauche"]
     while y + sg <= yg1 + 1e-6:
         poly = [(xg,y), (xg+CUSHION_DEPTH,y), (xg+CUSHION_DEPTH,y+sg), (xg,y+sg), (xg,y)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
+        draw_polygon_cm(t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion")
         label_poly(t, tr, poly, f"{sg}", font=FONT_CUSHION)
         y += sg; ng += 1
 
     return nb + ng, sb, sg
 
 # ----- U2f : évaluation / dessin -----
-def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+_SHIFTS_LR = ((False, False), (False, True), (True, False), (True, True))
+
+def _U2f_geom(pts, shiftL, shiftR, traversins=None):
     F0x, F0y = pts["F0"]
     F02x = pts["F02"][0]
     y_end_L = pts.get("By_", pts["By"])[1]
@@ -1259,9 +2059,11 @@ def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
     yL0 = F0y + (0 if shiftL else CUSHION_DEPTH)
     yR0 = F0y + (0 if shiftR else CUSHION_DEPTH)
 
-    len_b = max(0, xe - xs)
-    len_g = max(0, y_end_L - yL0)
-    len_d = max(0, y_end_R - yR0)
+    lengths = (max(0, xe - xs), max(0, y_end_L - yL0), max(0, y_end_R - yR0))
+    return lengths, {"xs": xs, "xe": xe, "yL0": yL0, "yR0": yR0}
+
+def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+    (len_b, len_g, len_d), geom = _U2f_geom(pts, shiftL, shiftR, traversins)
 
     nb, wb = _waste_and_count_1d(len_b, sb)
     ng, wg = _waste_and_count_1d(len_g, sg)
@@ -1270,34 +2072,21 @@ def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
     cover = nb*sb + ng*sg + nd*sd
     return {"counts": {"bas": nb, "gauche": ng, "droite": nd},
             "waste": waste, "cover": cover,
-            "geom": {"xs": xs, "xe": xe, "yL0": yL0, "yR0": yR0}}
+            "geom": geom}
 
 def _optimize_valise_U2f(pts, rng, same, traversins=None):
-    best=None; r0,r1=rng
-    for sg in range(r0, r1+1):
-        cand_b = [sg] if same else range(r0, r1+1)
-        for sb in cand_b:
-            cand_d = [sg] if same else range(r0, r1+1)
-            for sd in cand_d:
-                if max(sb, sg, sd) - min(sb, sg, sd) > 5:
-                    continue
-                E = []
-                for sl in (False, True):
-                    for sr in (False, True):
-                        E.append(_eval_U2f_counts(pts, sb, sg, sd, sl, sr, traversins=traversins))
-                e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
-                score = (e["waste"], -e["cover"], -sb, -sg, -sd)
-                if (best is None) or (score < best["score"]):
-                    best = {"score": score, "sizes": {"bas": sb, "gauche": sg, "droite": sd}, "eval": e}
-    if best:
-        chosen = best["eval"]
-        for sl in (False, True):
-            for sr in (False, True):
-                chk = _eval_U2f_counts(pts, best["sizes"]["bas"], best["sizes"]["gauche"], best["sizes"]["droite"], sl, sr, traversins=traversins)
-                if abs(chk["waste"] - chosen["waste"])<1e-9 and chk["cover"]==chosen["cover"]:
-                    best["shiftL"], best["shiftR"] = sl, sr
-                    return best
-    return best
+    lengths = [_U2f_geom(pts, sl, sr, traversins)[0] for sl, sr in _SHIFTS_LR]
+    sol = _solve_valise(lengths, rng, same)
+    if sol is None:
+        return None
+    (sb, sg, sd), shift, per_shift = sol
+    e = _eval_U2f_counts(pts, sb, sg, sd, *_SHIFTS_LR[shift], traversins=traversins)
+    # décalages dessinés : le premier à égalité (tolérance sur waste)
+    sl, sr = next(_SHIFTS_LR[i] for i, (w, c) in enumerate(per_shift)
+                  if abs(w - e["waste"]) < 1e-9 and c == e["cover"])
+    return {"score": (e["waste"], -e["cover"], -sb, -sg, -sd),
+            "sizes": {"bas": sb, "gauche": sg, "droite": sd}, "eval": e,
+            "shiftL": sl, "shiftR": sr}
 
 def _draw_U2f_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=None):
     F0x, F0y = pts["F0"]
@@ -1314,7 +2103,7 @@ def _draw_U2f_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=None):
     yb = F0y; sb = sizes["bas"]; nb=0; x=xs
     while x + sb <= xe + 1e-6:
         poly=[(x,yb),(x+sb,yb),(x+sb,yb+CUSHION_DEPTH),(x,yb+CUSHION_DEPTH),(x,yb)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{sb}",font=FONT_CUSHION)
         x+=sb; nb+=1
 
@@ -1323,7 +2112,7 @@ def _draw_U2f_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=None):
     xg = F0x; sg = sizes["gauche"]; ng=0; y=yL0
     while y + sg <= y_end_L + 1e-6:
         poly=[(xg,y),(xg+CUSHION_DEPTH,y),(xg+CUSHION_DEPTH,y+sg),(xg,y+sg),(xg,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{sg}",font=FONT_CUSHION)
         y+=sg; ng+=1
 
@@ -1332,7 +2121,7 @@ def _draw_U2f_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=None):
     xr = F02x; sd = sizes["droite"]; nd=0; y=yR0
     while y + sd <= y_end_R + 1e-6:
         poly=[(xr-CUSHION_DEPTH,y),(xr,y),(xr,y+sd),(xr-CUSHION_DEPTH,y+sd),(xr-CUSHION_DEPTH,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{sd}",font=FONT_CUSHION)
         y+=sd; nd+=1
 
@@ -1372,27 +2161,27 @@ def _draw_cushions_U2f_optimized(t, tr, pts, size, traversins=None):
     y, x = F0y, xs
     while x + size <= xe + 1e-6:
         poly = [(x,y),(x+size,y),(x+size,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
         x += size; count += 1
     # Gauche
     x, y = F0x, yL0
     while y + size <= y_end_L + 1e-6:
         poly = [(x,y),(x+CUSHION_DEPTH,y),(x+CUSHION_DEPTH,y+size),(x,y+size),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
         y += size; count += 1
     # Droite
     x, y = F02x, yR0
     while y + size <= y_end_R + 1e-6:
         poly = [(x-CUSHION_DEPTH,y),(x,y),(x,y+size),(x-CUSHION_DEPTH,y+size),(x-CUSHION_DEPTH,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
         y += size; count += 1
     return count
 
 # ----- U1F : évaluation / dessin -----
-def _eval_U1F_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+def _U1F_lengths(pts, shiftL, shiftR, traversins=None):
     F0x, F0y = pts["F0"]; F02x = pts["F02"][0]
     y_end_L = pts["By_cush"][1]; y_end_R = pts["By4_cush"][1]
     if traversins:
@@ -1402,38 +2191,31 @@ def _eval_U1F_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
     xe = F02x - (CUSHION_DEPTH if shiftR else 0)
     yL0 = F0y + (0 if shiftL else CUSHION_DEPTH)
     yR0 = F0y + (0 if shiftR else CUSHION_DEPTH)
-    len_b = max(0, xe-xs); len_g=max(0, y_end_L-yL0); len_d=max(0, y_end_R-yR0)
+    return max(0, xe-xs), max(0, y_end_L-yL0), max(0, y_end_R-yR0)
+
+def _eval_U1F_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+    len_b, len_g, len_d = _U1F_lengths(pts, shiftL, shiftR, traversins)
     nb, wb = _waste_and_count_1d(len_b, sb)
     ng, wg = _waste_and_count_1d(len_g, sg)
     nd, wd = _waste_and_count_1d(len_d, sd)
     waste = wb+wg+wd; cover=nb*sb+ng*sg+nd*sd
     return {"counts":{"bas":nb,"gauche":ng,"droite":nd},"waste":waste,"cover":cover}
 
+def _last_left_shift(per_shift, shift):
+    """À égalité, le dernier shiftL puis le premier shiftR (ordre historique U / U1F)."""
+    ties = [i for i, ev in enumerate(per_shift) if ev == per_shift[shift]]
+    return _SHIFTS_LR[max(ties, key=lambda i: (i // 2, -(i % 2)))]
+
 def _optimize_valise_U1F(pts, rng, same, traversins=None):
-    best=None; r0,r1=rng
-    for sg in range(r0,r1+1):
-        for sb in ([sg] if same else range(r0,r1+1)):
-            for sd in ([sg] if same else range(r0,r1+1)):
-                if max(sb,sg,sd)-min(sb,sg,sd) > 5:
-                    continue
-                E=[]
-                for sl in (False,True):
-                    for sr in (False,True):
-                        E.append(_eval_U1F_counts(pts,sb,sg,sd,sl,sr,traversins=traversins))
-                e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
-                score=(e["waste"], -e["cover"], -sb, -sg, -sd)
-                if (best is None) or (score < best["score"]):
-                    best={"score":score, "sizes":{"bas":sb,"gauche":sg,"droite":sd}, "shifts":("?", "?")}
-    # Retrouver shifts exacts
-    if best:
-        tgt = best["score"]
-        for sl in (False,True):
-            for sr in (False,True):
-                chk=_eval_U1F_counts(pts,best["sizes"]["bas"],best["sizes"]["gauche"],best["sizes"]["droite"],sl,sr,traversins=traversins)
-                score=(chk["waste"], -chk["cover"], -best["sizes"]["bas"], -best["sizes"]["gauche"], -best["sizes"]["droite"])
-                if score==tgt:
-                    best["shifts"]=(sl,sr); break
-    return best
+    lengths = [_U1F_lengths(pts, sl, sr, traversins) for sl, sr in _SHIFTS_LR]
+    sol = _solve_valise(lengths, rng, same)
+    if sol is None:
+        return None
+    (sb, sg, sd), shift, per_shift = sol
+    e = _eval_U1F_counts(pts, sb, sg, sd, *_SHIFTS_LR[shift], traversins=traversins)
+    return {"score": (e["waste"], -e["cover"], -sb, -sg, -sd),
+            "sizes": {"bas": sb, "gauche": sg, "droite": sd},
+            "shifts": _last_left_shift(per_shift, shift)}
 
 def _draw_U1F_with_sizes(t,tr,pts,sizes,shiftL,shiftR,traversins=None):
     F0x, F0y = pts["F0"]; F02x=pts["F02"][0]
@@ -1448,7 +2230,7 @@ def _draw_U1F_with_sizes(t,tr,pts,sizes,shiftL,shiftR,traversins=None):
     sb=sizes["bas"]; nb=0; x=xs; y=F0y
     while x + sb <= xe + 1e-6:
         poly=[(x,y),(x+sb,y),(x+sb,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{sb}",font=FONT_CUSHION)
         nb+=1; x+=sb
 
@@ -1457,7 +2239,7 @@ def _draw_U1F_with_sizes(t,tr,pts,sizes,shiftL,shiftR,traversins=None):
     sg=sizes["gauche"]; ng=0; xg=F0x; y_=yL0
     while y_ + sg <= y_end_L + 1e-6:
         poly=[(xg,y_),(xg+CUSHION_DEPTH,y_),(xg+CUSHION_DEPTH,y_+sg),(xg,y_+sg),(xg,y_)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{sg}",font=FONT_CUSHION)
         ng+=1; y_+=sg
 
@@ -1466,7 +2248,7 @@ def _draw_U1F_with_sizes(t,tr,pts,sizes,shiftL,shiftR,traversins=None):
     sd=sizes["droite"]; nd=0; xr=F02x; y_=yR0
     while y_ + sd <= y_end_R + 1e-6:
         poly=[(xr-CUSHION_DEPTH,y_),(xr,y_),(xr,y_+sd),(xr-CUSHION_DEPTH,y_+sd),(xr-CUSHION_DEPTH,y_)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{sd}",font=FONT_CUSHION)
         nd+=1; y_+=sd
 
@@ -1479,12 +2261,7 @@ def _u_variant_x_end(variant, pts):
     else:
         return pts["F02"][0]
 
-def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=None):
-    """
-    Evaluate how many cushions of sizes ``sb``, ``sg`` and ``sd`` will fit on
-    the bottom, left and right branches of a U‑shaped sofa, considering
-    possible méridienne limits.
-    """
+def _U_branch_lengths(variant, pts, drawn, shiftL, shiftR, traversins=None):
     F0x, F0y = pts["F0"]
     x_end = _u_variant_x_end(variant, pts)
     xs = F0x + (CUSHION_DEPTH if shiftL else 0)
@@ -1500,10 +2277,18 @@ def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=N
     yL0 = F0y + (0 if (not drawn.get("D1", False) or shiftL) else CUSHION_DEPTH)
     has_right = drawn.get("D4", False) or drawn.get("D5", False)
     yR0 = F0y + (0 if (not has_right or shiftR) else CUSHION_DEPTH)
+    return max(0, xe - xs), max(0, y_end_L - yL0), max(0, y_end_R - yR0)
 
-    nb, wb = _waste_and_count_1d(max(0, xe - xs), sb)
-    ng, wg = _waste_and_count_1d(max(0, y_end_L - yL0), sg)
-    nd, wd = _waste_and_count_1d(max(0, y_end_R - yR0), sd)
+def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=None):
+    """
+    Evaluate how many cushions of sizes ``sb``, ``sg`` and ``sd`` will fit on
+    the bottom, left and right branches of a U‑shaped sofa, considering
+    possible méridienne limits.
+    """
+    len_b, len_g, len_d = _U_branch_lengths(variant, pts, drawn, shiftL, shiftR, traversins)
+    nb, wb = _waste_and_count_1d(len_b, sb)
+    ng, wg = _waste_and_count_1d(len_g, sg)
+    nd, wd = _waste_and_count_1d(len_d, sd)
     waste = wb + wg + wd
     cover = nb * sb + ng * sg + nd * sd
     return {
@@ -1513,29 +2298,21 @@ def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=N
     }
 
 def _optimize_valise_U(variant, pts, drawn, rng, same, traversins=None):
-    best=None; r0,r1=rng
-    for sg in range(r0,r1+1):
-        for sb in ([sg] if same else range(r0,r1+1)):
-            for sd in ([sg] if same else range(r0,r1+1)):
-                if max(sb,sg,sd)-min(sb,sg,sd) > 5:
-                    continue
-                E=[]
-                for sl in (False,True):
-                    for sr in (False,True):
-                        E.append(_eval_U_counts(variant, pts, drawn, sb, sg, sd, sl, sr, traversins=traversins))
-                e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
-                score=(e["waste"], -e["cover"], -sb, -sg, -sd)
-                if (best is None) or (score < best["score"]):
-                    best={"score":score, "sizes":{"bas":sb,"gauche":sg,"droite":sd}}
-    if best:
-        tgt=best["score"]
-        for sl in (False,True):
-            for sr in (False,True):
-                chk=_eval_U_counts(variant, pts, drawn, best["sizes"]["bas"], best["sizes"]["gauche"], best["sizes"]["droite"], sl, sr, traversins=traversins)
-                score=(chk["waste"], -chk["cover"], -best["sizes"]["bas"], -best["sizes"]["gauche"], -best["sizes"]["droite"])
-                if score==tgt:
-                    best["shiftL"], best["shiftR"] = sl, sr
-                    break
+    lengths = [
+        _U_branch_lengths(variant, pts, drawn, sl, sr, traversins)
+        for sl, sr in _SHIFTS_LR
+    ]
+    sol = _solve_valise(lengths, rng, same)
+    if sol is None:
+        return None
+    (sb, sg, sd), shift, per_shift = sol
+    sl, sr = _SHIFTS_LR[shift]
+    e = _eval_U_counts(variant, pts, drawn, sb, sg, sd, sl, sr, traversins=traversins)
+    best = {
+        "score": (e["waste"], -e["cover"], -sb, -sg, -sd),
+        "sizes": {"bas": sb, "gauche": sg, "droite": sd},
+    }
+    best["shiftL"], best["shiftR"] = _last_left_shift(per_shift, shift)
     return best
 
 def _draw_U_with_sizes(
@@ -1567,7 +2344,7 @@ def _draw_U_with_sizes(
             (x, y),
         ]
         draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
+            t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion"
         )
         label_poly(t, tr, poly, f"{sb}", font=FONT_CUSHION)
         nb += 1
@@ -1595,7 +2372,7 @@ def _draw_U_with_sizes(
             (xg, y_),
         ]
         draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
+            t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion"
         )
         label_poly(t, tr, poly, f"{sg}", font=FONT_CUSHION)
         ng += 1
@@ -1624,7 +2401,7 @@ def _draw_U_with_sizes(
             (x_col - CUSHION_DEPTH, y_),
         ]
         draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
+            t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion"
         )
         label_poly(t, tr, poly, f"{sd}", font=FONT_CUSHION)
         nd += 1
@@ -1643,18 +2420,14 @@ def _optimize_valise_simple(pts, rng, mer_side=None, mer_len=0, traversins=None)
         if "g" in traversins: x0 += TRAVERSIN_THK
         if "d" in traversins: x1 -= TRAVERSIN_THK
 
-    best=None; r0,r1=rng
-    for s in range(r0, r1+1):
-        n0, w0 = _waste_and_count_1d(max(0, x1-x0), s)
-        n1, w1 = _waste_and_count_1d(max(0, x1-(x0+CUSHION_DEPTH)), s)
-        if w1 < w0 or (w1==w0 and n1>n0):
-            n, waste, off = n1, w1, CUSHION_DEPTH
-        else:
-            n, waste, off = n0, w0, 0
-        score=(waste, -n, -s)
-        if (best is None) or (score < best["score"]):
-            best={"score":score, "size":s, "offset":off, "count":n}
-    return best
+    lengths = [(max(0, x1-x0),), (max(0, x1-(x0+CUSHION_DEPTH)),)]
+    sol = _solve_valise(lengths, rng, True, by_count=True)
+    if sol is None:
+        return None
+    (s,), shift, _ = sol
+    off = CUSHION_DEPTH if shift else 0
+    n, waste = _waste_and_count_1d(lengths[shift][0], s)
+    return {"score": (waste, -n, -s), "size": s, "offset": off, "count": n}
 
 def _draw_simple_with_size(t,tr,pts,size,mer_side=None,mer_len=0, traversins=None):
     x0 = pts["B0"][0]; x1 = pts["Bx"][0]
@@ -1672,7 +2445,7 @@ def _draw_simple_with_size(t,tr,pts,size,mer_side=None,mer_len=0, traversins=Non
     x = x0 + off; y = pts["B0"][1]; n=0
     while x + size <= x1 + 1e-6:
         poly=[(x,y),(x+size,y),(x+size,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
         x+=size; n+=1
     return n
@@ -1755,6 +2528,9 @@ def _choose_cushion_size_auto(pts, tx, ty, meridienne_side=None, meridienne_len=
         if "g" in traversins: y_end -= TRAVERSIN_THK
     usable_h = max(0.0, x_end - xF)
     usable_v = max(0.0, y_end - y_start)
+    size = cushion_tables.best_size("lf", usable_h, usable_v)
+    if size:
+        return size
 
     candidates = [65, 80, 90]
     def score(s):
@@ -1794,7 +2570,7 @@ def draw_cousins_and_return_count(t, tr, pts, tx, ty, coussins, meridienne_side,
     x_cur = F0x + (CUSHION_DEPTH if use_shift else 0)
     while x_cur + size <= x_end + 1e-6:
         poly = [(x_cur, y), (x_cur+size, y), (x_cur+size, y+CUSHION_DEPTH), (x_cur, y+CUSHION_DEPTH), (x_cur, y)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
+        draw_polygon_cm(t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion")
         label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
         x_cur += size; count += 1
     # gauche
@@ -1802,12 +2578,13 @@ def draw_cousins_and_return_count(t, tr, pts, tx, ty, coussins, meridienne_side,
     y_cur = F0y + (0 if use_shift else CUSHION_DEPTH)
     while y_cur + size <= y_end + 1e-6:
         poly = [(x, y_cur), (x+CUSHION_DEPTH, y_cur), (x+CUSHION_DEPTH, y_cur+size), (x, y_cur+size), (x, y_cur)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
+        draw_polygon_cm(t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion")
         label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
         y_cur += size; count += 1
 
     return count, size
 
+@_cost_aware_splits
 def build_polys_LF_variant(pts, tx, ty, profondeur=DEPTH_STD,
                            dossier_left=True, dossier_bas=True,
                            acc_left=True, acc_bas=True,
@@ -1896,23 +2673,23 @@ def render_LF_variant(tx, ty, profondeur=DEPTH_STD,
         raise ValueError("Erreur: une méridienne bas ne peut pas coexister avec un accoudoir bas.")
 
     trv = _parse_traversins_spec(traversins, allowed={"g","b"})
-    legend_items = _resolve_and_apply_colors(couleurs)
+    palette, legend_items = _resolve_palette(couleurs)
 
     pts=compute_points_LF_variant(tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     polys=build_polys_LF_variant(pts,tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     _assert_banquettes_max_250(polys)
 
-    screen=turtle.Screen(); screen.setup(WIN_W,WIN_H)
-    screen.title(f"{window_title} — {tx}x{ty} cm — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}")
-    t=turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
     tr=WorldToScreen(tx,ty,WIN_W,WIN_H,PAD_PX,ZOOM)
+    # Display list : les outils de dessin enregistrent, _emit_display_list rejoue
+    t=DisplayList(tr, WIN_W, WIN_H, title=f"{window_title} — {tx}x{ty} cm — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}",
+                  palette=palette)
 
     # (Quadrillage et repères supprimés)
 
-    for poly in polys["dossiers"]:   draw_polygon_cm(t,tr,poly,fill=COLOR_DOSSIER)
-    for poly in polys["banquettes"]: draw_polygon_cm(t,tr,poly,fill=COLOR_ASSISE)
-    for poly in polys["accoudoirs"]: draw_polygon_cm(t,tr,poly,fill=COLOR_ACC)
-    for poly in polys["angle"]:      draw_polygon_cm(t,tr,poly,fill=COLOR_ASSISE)
+    for poly in polys["dossiers"]:   draw_polygon_cm(t,tr,poly,fill=_color(t, "DOSSIER"))
+    for poly in polys["banquettes"]: draw_polygon_cm(t,tr,poly,fill=_color(t, "ASSISE"))
+    for poly in polys["accoudoirs"]: draw_polygon_cm(t,tr,poly,fill=_color(t, "ACC"))
+    for poly in polys["angle"]:      draw_polygon_cm(t,tr,poly,fill=_color(t, "ASSISE"))
 
     # Traversins (visuel) + comptage
     n_traversins = _draw_traversins_L_like(t, tr, pts, profondeur, trv)
@@ -1969,21 +2746,26 @@ def render_LF_variant(tx, ty, profondeur=DEPTH_STD,
     # Légende (couleurs)
     draw_legend(t, tr, tx, ty, items=legend_items, pos="top-right")
 
-    screen.tracer(True); t.hideturtle()
     add_split = int(polys["split_flags"]["left"] and dossier_left) + int(polys["split_flags"]["bottom"] and dossier_bas)
     A = profondeur + 20
-    print("=== Rapport canapé (LF) ===")
-    print(f"Dimensions : {tx}×{ty} cm — profondeur : {profondeur} cm")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    _report("=== Rapport canapé (LF) ===")
+    _report(f"Dimensions : {tx}×{ty} cm — profondeur : {profondeur} cm")
+    _report(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
     dossiers_count = _compute_dossiers_count(polys)
     dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
-    print(f"Banquettes d’angle : 1")
-    print(f"Angles : 1 × {A}×{A} cm")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    _report(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    _report(f"Banquettes d’angle : 1")
+    _report(f"Angles : 1 × {A}×{A} cm")
+    _report(f"Traversins : {n_traversins} × 70x30")
+    _report(f"Coussins : {total_line}")
+    _attach_layout(
+        t, kind="LF", variant=None, tx=tx, ty=ty, tz=None,
+        profondeur=profondeur, polys=polys, n_traversins=n_traversins,
+        cushions_total=cushions_count, cushions_line=total_line,
+        add_split=add_split, nb_angles=1,
+    )
+    _emit_display_list(t)
 
 # =====================================================================
 # ========================  U2f (2 angles fromage)  ====================
@@ -2057,6 +2839,7 @@ def compute_points_U2f(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     pts["_ty_canvas"] = max(ty_left, tz_right)
     return pts
 
+@_cost_aware_splits
 def build_polys_U2f(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                     dossier_left=True, dossier_bas=True, dossier_right=True,
                     acc_left=True, acc_bas=True, acc_right=True):
@@ -2223,7 +3006,7 @@ def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
         raise ValueError("Erreur: une méridienne droite ne peut pas coexister avec un accoudoir droit.")
 
     trv = _parse_traversins_spec(traversins, allowed={"g","d"})
-    legend_items = _resolve_and_apply_colors(couleurs)
+    palette, legend_items = _resolve_palette(couleurs)
 
     pts = compute_points_U2f(tx, ty_left, tz_right, profondeur,
                              dossier_left, dossier_bas, dossier_right,
@@ -2235,17 +3018,17 @@ def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     _assert_banquettes_max_250(polys)
 
     ty_canvas = pts["_ty_canvas"]
-    screen = turtle.Screen(); screen.setup(WIN_W, WIN_H)
-    screen.title(f"{window_title} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}")
-    t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
     tr = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
+    # Display list : les outils de dessin enregistrent, _emit_display_list rejoue
+    t = DisplayList(tr, WIN_W, WIN_H, title=f"{window_title} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}",
+                    palette=palette)
 
     # (Quadrillage et repères supprimés)
 
-    for poly in polys["dossiers"]:   draw_polygon_cm(t, tr, poly, fill=COLOR_DOSSIER)
-    for poly in polys["banquettes"]: draw_polygon_cm(t, tr, poly, fill=COLOR_ASSISE)
-    for poly in polys["accoudoirs"]: draw_polygon_cm(t, tr, poly, fill=COLOR_ACC)
-    for poly in polys["angles"]:     draw_polygon_cm(t, tr, poly, fill=COLOR_ASSISE)
+    for poly in polys["dossiers"]:   draw_polygon_cm(t, tr, poly, fill=_color(t, "DOSSIER"))
+    for poly in polys["banquettes"]: draw_polygon_cm(t, tr, poly, fill=_color(t, "ASSISE"))
+    for poly in polys["accoudoirs"]: draw_polygon_cm(t, tr, poly, fill=_color(t, "ACC"))
+    for poly in polys["angles"]:     draw_polygon_cm(t, tr, poly, fill=_color(t, "ASSISE"))
 
     # Traversins (visuel) + comptage
     n_traversins = _draw_traversins_U_side_F02(t, tr, pts, profondeur, trv)
@@ -2324,24 +3107,29 @@ def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     draw_title_center(t, tr, tx, ty_canvas, "Canapé en U avec deux angles")
     draw_legend(t, tr, tx, ty_canvas, items=legend_items, pos="top-center")
 
-    screen.tracer(True); t.hideturtle()
     add_split = sum(int(v) for v in polys.get("split_flags", {}).values())
-    print("=== Rapport canapé U2f ===")
-    print(f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur} (A={A})")
-    print(f"Méridienne : {meridienne_side or '-'} ({meridienne_len} cm)")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    _report("=== Rapport canapé U2f ===")
+    _report(f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur} (A={A})")
+    _report(f"Méridienne : {meridienne_side or '-'} ({meridienne_len} cm)")
+    _report(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
     dossier_bonus = int(polys["split_flags"].get("left", False) and dossier_left) + \
                    int(polys["split_flags"].get("bottom", False) and dossier_bas) + \
                    int(polys["split_flags"].get("right", False) and dossier_right)
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
     dossiers_count = _compute_dossiers_count(polys)
     dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{dossier_bonus} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
-    print(f"Banquettes d'angle : 2")
-    print(f"Angles : 2 × {A}×{A} cm")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    _report(f"Dossiers : {dossiers_str} (+{dossier_bonus} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    _report(f"Banquettes d'angle : 2")
+    _report(f"Angles : 2 × {A}×{A} cm")
+    _report(f"Traversins : {n_traversins} × 70x30")
+    _report(f"Coussins : {total_line}")
+    _attach_layout(
+        t, kind="U2F", variant=None, tx=tx, ty=ty_left, tz=tz_right,
+        profondeur=profondeur, polys=polys, n_traversins=n_traversins,
+        cushions_total=cushions_count, cushions_line=total_line,
+        add_split=dossier_bonus, nb_angles=2,
+    )
+    _emit_display_list(t)
 
 # =====================================================================
 # ===================  U1F (1 angle fromage) — v1..v4  =================
@@ -2418,21 +3206,21 @@ def _draw_coussins_U1F(t, tr, pts, size, traversins=None):
     y = F0y; x = xs
     while x + size <= xe + 1e-6:
         poly=[(x,y),(x+size,y),(x+size,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
         count+=1; x+=size
     # GAUCHE
     x = F0x; y = yL0
     while y + size <= y_end_L + 1e-6:
         poly=[(x,y),(x+CUSHION_DEPTH,y),(x+CUSHION_DEPTH,y+size),(x,y+size),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
         count+=1; y+=size
     # DROITE
     x = F02x; y = yR0
     while y + size <= y_end_R + 1e-6:
         poly=[(x-CUSHION_DEPTH,y),(x,y),(x,y+size),(x-CUSHION_DEPTH,y+size),(x-CUSHION_DEPTH,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+        draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
         label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
         count+=1; y+=size
     return count
@@ -2485,6 +3273,7 @@ def compute_points_U1F_v1(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     pts["_acc"]={"L":acc_left, "R":acc_right}
     return pts
 
+@_cost_aware_splits
 def build_polys_U1F_v1(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                        dossier_left=True, dossier_bas=True, dossier_right=True,
                        acc_left=True, acc_right=True):
@@ -2636,6 +3425,7 @@ def compute_points_U1F_v2(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     pts["_acc"]={"L":acc_left, "R":acc_right}
     return pts
 
+@_cost_aware_splits
 def build_polys_U1F_v2(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                        dossier_left=True, dossier_bas=True, dossier_right=True,
                        acc_left=True, acc_right=True):
@@ -2791,6 +3581,7 @@ def compute_points_U1F_v3(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     pts["_acc"]={"L":acc_left, "R":acc_right}
     return pts
 
+@_cost_aware_splits
 def build_polys_U1F_v3(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                        dossier_left=True, dossier_bas=True, dossier_right=True,
                        acc_left=True, acc_right=True):
@@ -2959,6 +3750,7 @@ def compute_points_U1F_v4(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     pts["_acc"]={"L":acc_left, "R":acc_right}
     return pts
 
+@_cost_aware_splits
 def build_polys_U1F_v4(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                        dossier_left=True, dossier_bas=True, dossier_right=True,
                        acc_left=True, acc_right=True):
@@ -3051,39 +3843,36 @@ def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
                        dossier_left, dossier_bas, dossier_right,
                        acc_left, acc_right,
                        meridienne_side, meridienne_len,
-                       coussins, traversins, couleurs, window_title):
-    comp = {"v1":compute_points_U1F_v1, "v2":compute_points_U1F_v2,
-            "v3":compute_points_U1F_v3, "v4":compute_points_U1F_v4}[variant]
-    build= {"v1":build_polys_U1F_v1,   "v2":build_polys_U1F_v2,
-            "v3":build_polys_U1F_v3,   "v4":build_polys_U1F_v4}[variant]
-
+                       coussins, traversins, couleurs, window_title,
+                       geometry=None):
     trv = _parse_traversins_spec(traversins, allowed={"g","d"})
-    legend_items = _resolve_and_apply_colors(couleurs)
-
-    pts = comp(tx, ty_left, tz_right, profondeur,
-               dossier_left, dossier_bas, dossier_right,
-               acc_left, acc_right,
-               meridienne_side, meridienne_len)
-    polys = build(pts, tx, ty_left, tz_right, profondeur,
-                  dossier_left, dossier_bas, dossier_right,
-                  acc_left, acc_right)
+    palette, legend_items = _resolve_palette(couleurs)
+
+    # geometry : (pts, polys) déjà calculés par la sélection auto de variante
+    if geometry is None:
+        geometry = _dry_polys_for_U1F_variant(tx, ty_left, tz_right, profondeur,
+                                              dossier_left, dossier_bas, dossier_right,
+                                              acc_left, acc_right,
+                                              meridienne_side, meridienne_len,
+                                              variant)
+    pts, polys = geometry
     _assert_banquettes_max_250(polys)
 
     ty_canvas = max(ty_left, tz_right)
-    screen = turtle.Screen(); screen.setup(WIN_W, WIN_H)
-    screen.title(f"U1F {variant} — {window_title} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}")
-    t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
     tr = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
+    # Display list : les outils de dessin enregistrent, _emit_display_list rejoue
+    t = DisplayList(tr, WIN_W, WIN_H, title=f"U1F {variant} — {window_title} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}",
+                    palette=palette)
 
     # (Quadrillage et repères supprimés)
 
     for p in polys["dossiers"]:
         xs=[pp[0] for pp in p]; ys=[pp[1] for pp in p]
         if (max(xs)-min(xs) > 1e-9) and (max(ys)-min(ys) > 1e-9):
-            draw_polygon_cm(t, tr, p, fill=COLOR_DOSSIER)
-    for p in polys["banquettes"]: draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
-    for p in polys["accoudoirs"]: draw_polygon_cm(t, tr, p, fill=COLOR_ACC)
-    for p in polys["angle"]:      draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
+            draw_polygon_cm(t, tr, p, fill=_color(t, "DOSSIER"))
+    for p in polys["banquettes"]: draw_polygon_cm(t, tr, p, fill=_color(t, "ASSISE"))
+    for p in polys["accoudoirs"]: draw_polygon_cm(t, tr, p, fill=_color(t, "ACC"))
+    for p in polys["angle"]:      draw_polygon_cm(t, tr, p, fill=_color(t, "ASSISE"))
 
     # Traversins + comptage
     n_traversins = _draw_traversins_U_side_F02(t, tr, pts, profondeur, trv)
@@ -3152,21 +3941,26 @@ def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
     draw_title_center(t, tr, tx, ty_canvas, "Canapé en U avec un angle")
     draw_legend(t, tr, tx, ty_canvas, items=legend_items, pos="top-center")
 
-    screen.tracer(True); t.hideturtle()
 
     add_split = int(polys.get("split_flags",{}).get("any",False))
-    print(f"=== Rapport U1F {variant} ===")
-    print(f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — profondeur={profondeur} (A={A})")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    _report(f"=== Rapport U1F {variant} ===")
+    _report(f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — profondeur={profondeur} (A={A})")
+    _report(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
     dossiers_count = _compute_dossiers_count(polys)
     dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
-    print(f"Banquettes d’angle : 1")
-    print(f"Angles : 1 × {A}×{A} cm")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    _report(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    _report(f"Banquettes d’angle : 1")
+    _report(f"Angles : 1 × {A}×{A} cm")
+    _report(f"Traversins : {n_traversins} × 70x30")
+    _report(f"Coussins : {total_line}")
+    _attach_layout(
+        t, kind="U1F", variant=variant, tx=tx, ty=ty_left, tz=tz_right,
+        profondeur=profondeur, polys=polys, n_traversins=n_traversins,
+        cushions_total=nb_coussins, cushions_line=total_line,
+        add_split=add_split, nb_angles=1,
+    )
+    _emit_display_list(t)
 
 def _dry_polys_for_U1F_variant(tx, ty_left, tz_right, profondeur,
                                dossier_left, dossier_bas, dossier_right,
@@ -3257,6 +4051,7 @@ def render_U1F(tx, ty_left, tz_right, profondeur=DEPTH_STD,
     # Mode automatique: choisir la variante la plus simple entre v1 et v3
     candidates = ("v1", "v3")
     best_variant = None
+    best_geometry = None
     best_nb_ban = float("inf")
     best_scissions = float("inf")
     def _count_scissions(polys):
@@ -3280,6 +4075,7 @@ def render_U1F(tx, ty_left, tz_right, profondeur=DEPTH_STD,
             best_variant = var
             best_nb_ban = nb_ban
             best_scissions = sci
+            best_geometry = (_pts, _polys)
     if best_variant is None:
         best_variant = "v1"
     return _render_common_U1F(
@@ -3290,6 +4086,7 @@ def render_U1F(tx, ty_left, tz_right, profondeur=DEPTH_STD,
         meridienne_side, meridienne_len,
         coussins, traversins, couleurs,
         window_title,
+        geometry=best_geometry,
     )
 
 def render_U1F_v1(*args, **kwargs):
@@ -3352,6 +4149,7 @@ def compute_points_LNF_v2(tx, ty, profondeur=DEPTH_STD,
     pts["_tx"], pts["_ty"] = tx, ty
     return pts
 
+@_cost_aware_splits
 def build_polys_LNF_v2(pts, tx, ty, profondeur=DEPTH_STD,
                        dossier_left=True, dossier_bas=True,
                        acc_left=True, acc_bas=True,
@@ -3450,6 +4248,7 @@ def compute_points_LNF_v1(tx, ty, profondeur=DEPTH_STD,
     pts["_tx"], pts["_ty"]=tx,ty
     return pts
 
+@_cost_aware_splits
 def build_polys_LNF_v1(pts, tx, ty, profondeur=DEPTH_STD,
                        dossier_left=True, dossier_bas=True,
                        acc_left=True, acc_bas=True,
@@ -3545,6 +4344,10 @@ def _choose_cushion_size_auto_L(pts, traversins=None):
         if "g" in traversins:
             y_end -= TRAVERSIN_THK
 
+    size = cushion_tables.best_size("l", x_end - F0x, y_end - F0y)
+    if size:
+        return size
+
     def count_bottom(x_start, size):
         if x_end <= x_start or size <= 0:
             return 0
@@ -3623,7 +4426,7 @@ def draw_coussins_L_optimized(t, tr, pts, coussins, traversins=None):
         cnt=0; y=F0y; x_cur=x_start
         while x_cur + size <= x_end + 1e-6:
             poly=[(x_cur,y),(x_cur+size,y),(x_cur+size,y+CUSHION_DEPTH),(x_cur,y+CUSHION_DEPTH),(x_cur,y)]
-            draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+            draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
             label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
             x_cur += size; cnt += 1
         return cnt
@@ -3631,7 +4434,7 @@ def draw_coussins_L_optimized(t, tr, pts, coussins, traversins=None):
         cnt=0; x=F0x; y_cur=y_start
         while y_cur + size <= y_end + 1e-6:
             poly=[(x,y_cur),(x+CUSHION_DEPTH,y_cur),(x+CUSHION_DEPTH,y_cur+size),(x,y_cur+size),(x,y_cur)]
-            draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
+            draw_polygon_cm(t,tr,poly,fill=_color(t, "CUSHION"),outline=COLOR_CONTOUR,width=1,role="cushion")
             label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
             y_cur += size; cnt += 1
         return cnt
@@ -3648,22 +4451,22 @@ def draw_coussins_L_optimized(t, tr, pts, coussins, traversins=None):
 
 def _render_common_L(tx, ty, pts, polys, coussins, window_title,
                      profondeur, dossier_left, dossier_bas, meridienne_side, meridienne_len,
-                     traversins=None, couleurs=None):
+                     traversins=None, couleurs=None, variant=None):
     _assert_banquettes_max_250(polys)
 
     trv = _parse_traversins_spec(traversins, allowed={"g","b"})
-    legend_items = _resolve_and_apply_colors(couleurs)
+    palette, legend_items = _resolve_palette(couleurs)
 
-    screen = turtle.Screen(); screen.setup(WIN_W,WIN_H)
-    screen.title(f"{window_title} — {tx}×{ty} — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}")
-    t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
     tr = WorldToScreen(tx, ty, WIN_W, WIN_H, PAD_PX, ZOOM)
+    # Display list : les outils de dessin enregistrent, _emit_display_list rejoue
+    t = DisplayList(tr, WIN_W, WIN_H, title=f"{window_title} — {tx}×{ty} — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}",
+                    palette=palette)
 
     # (Quadrillage et repères supprimés)
 
-    for p in polys["dossiers"]:   draw_polygon_cm(t,tr,p,fill=COLOR_DOSSIER)
-    for p in polys["banquettes"]: draw_polygon_cm(t,tr,p,fill=COLOR_ASSISE)
-    for p in polys["accoudoirs"]: draw_polygon_cm(t,tr,p,fill=COLOR_ACC)
+    for p in polys["dossiers"]:   draw_polygon_cm(t,tr,p,fill=_color(t, "DOSSIER"))
+    for p in polys["banquettes"]: draw_polygon_cm(t,tr,p,fill=_color(t, "ASSISE"))
+    for p in polys["accoudoirs"]: draw_polygon_cm(t,tr,p,fill=_color(t, "ACC"))
 
     # Traversins + comptage
     n_traversins = _draw_traversins_L_like(t, tr, pts, profondeur, trv)
@@ -3716,22 +4519,27 @@ def _render_common_L(tx, ty, pts, polys, coussins, window_title,
     # Légende
     draw_legend(t, tr, tx, ty, items=legend_items, pos="top-right")
 
-    screen.tracer(True); t.hideturtle()
 
     add_split = int(polys.get("split_flags",{}).get("left",False) and dossier_left) \
               + int(polys.get("split_flags",{}).get("bottom",False) and dossier_bas)
 
-    print("=== Rapport LNF ===")
-    print(f"Dimensions : {tx}×{ty} — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len}")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    _report("=== Rapport LNF ===")
+    _report(f"Dimensions : {tx}×{ty} — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len}")
+    _report(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
     dossiers_count = _compute_dossiers_count(polys)
     dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
-    print(f"Banquettes d’angle : 0")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    _report(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    _report(f"Banquettes d’angle : 0")
+    _report(f"Traversins : {n_traversins} × 70x30")
+    _report(f"Coussins : {total_line}")
+    _attach_layout(
+        t, kind="LNF", variant=variant, tx=tx, ty=ty, tz=None,
+        profondeur=profondeur, polys=polys, n_traversins=n_traversins,
+        cushions_total=cushions_count, cushions_line=total_line,
+        add_split=add_split, nb_angles=0,
+    )
+    _emit_display_list(t)
 
 def render_LNF_v1(tx, ty, profondeur=DEPTH_STD,
                   dossier_left=True, dossier_bas=True,
@@ -3749,7 +4557,7 @@ def render_LNF_v1(tx, ty, profondeur=DEPTH_STD,
         if not dossier_bas: raise ValueError("Méridienne bas impossible sans dossier bas.")
     pts = compute_points_LNF_v1(tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     polys = build_polys_LNF_v1(pts,tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
-    _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs)
+    _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs, variant="v1")
 
 def render_LNF_v2(tx, ty, profondeur=DEPTH_STD,
                   dossier_left=True, dossier_bas=True,
@@ -3767,7 +4575,7 @@ def render_LNF_v2(tx, ty, profondeur=DEPTH_STD,
         if not dossier_bas: raise ValueError("Méridienne bas impossible sans dossier bas.")
     pts = compute_points_LNF_v2(tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     polys = build_polys_LNF_v2(pts,tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
-    _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs)
+    _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs, variant="v2")
 
 def _dry_polys_for_variant(tx, ty, profondeur,
                            dossier_left, dossier_bas,
@@ -3813,6 +4621,7 @@ def render_LNF(tx, ty, profondeur=DEPTH_STD,
     nb_ban_v1 = float("inf")
     nb_ban_v2 = float("inf")
     polys1 = polys2 = None
+    geoms = {}
     try:
         _pts1, _polys1 = _dry_polys_for_variant(tx, ty, profondeur,
                                                dossier_left, dossier_bas,
@@ -3820,6 +4629,7 @@ def render_LNF(tx, ty, profondeur=DEPTH_STD,
                                                meridienne_side, meridienne_len,
                                                "v1")
         nb_ban_v1 = len(_polys1["banquettes"]); polys1=_polys1
+        geoms["v1"] = (_pts1, _polys1)
     except ValueError:
         pass
     try:
@@ -3829,6 +4639,7 @@ def render_LNF(tx, ty, profondeur=DEPTH_STD,
                                                meridienne_side, meridienne_len,
                                                "v2")
         nb_ban_v2 = len(_polys2["banquettes"]); polys2=_polys2
+        geoms["v2"] = (_pts2, _polys2)
     except ValueError:
         pass
 
@@ -3844,7 +4655,13 @@ def render_LNF(tx, ty, profondeur=DEPTH_STD,
         elif scissions(polys2) < scissions(polys1): chosen="v2"
         else: chosen = "v1" if tx >= ty else "v2"
 
-    if chosen == "v2":
+    # Géométrie déjà calculée pour la variante retenue : pas de second calcul
+    if chosen in geoms:
+        pts, polys = geoms[chosen]
+        _render_common_L(tx, ty, pts, polys, coussins, window_title, profondeur,
+                         dossier_left, dossier_bas, meridienne_side, meridienne_len,
+                         traversins=traversins, couleurs=couleurs, variant=chosen)
+    elif chosen == "v2":
         render_LNF_v2(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
                       meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
                       window_title=window_title)
@@ -3962,6 +4779,7 @@ def compute_points_U_v1(
     pts["_ty_canvas"] = max(ty_left, tz_right)
     return pts
 
+@_cost_aware_splits
 def build_polys_U_v1(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                      dossier_left=True, dossier_bas=True, dossier_right=True,
                      acc_left=True, acc_bas=True, acc_right=True):
@@ -4126,6 +4944,7 @@ def compute_points_U_v2(
     pts["_ty_canvas"] = max(ty_left, tz_right)
     return pts
 
+@_cost_aware_splits
 def build_polys_U_v2(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                      dossier_left=True, dossier_bas=True, dossier_right=True,
                      acc_left=True, acc_bas=True, acc_right=True):
@@ -4292,6 +5111,7 @@ def compute_points_U_v3(
     pts["_ty_canvas"] = max(ty_left, tz_right)
     return pts
 
+@_cost_aware_splits
 def build_polys_U_v3(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                      dossier_left=True, dossier_bas=True, dossier_right=True,
                      acc_left=True, acc_bas=True, acc_right=True):
@@ -4449,6 +5269,7 @@ def compute_points_U_v4(
     pts["_ty_canvas"] = max(ty_left, tz_right)
     return pts
 
+@_cost_aware_splits
 def build_polys_U_v4(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
                      dossier_left=True, dossier_bas=True, dossier_right=True,
                      acc_left=True, acc_bas=True, acc_right=True):
@@ -4948,7 +5769,7 @@ def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
             (x, y),
         ]
         draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
+            t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion"
         )
         label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
         x += size
@@ -4966,7 +5787,7 @@ def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
             (x, y),
         ]
         draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
+            t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion"
         )
         label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
         y += size
@@ -4984,7 +5805,7 @@ def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
             (x - CUSHION_DEPTH, y),
         ]
         draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
+            t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion"
         )
         label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
         y += size
@@ -4992,8 +5813,9 @@ def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
 
     return count
 
-def _render_common_U(
-    variant,
+def _geometry_U(
+    compute_fn,
+    build_fn,
     tx,
     ty_left,
     tz_right,
@@ -5004,23 +5826,14 @@ def _render_common_U(
     acc_left,
     acc_bas,
     acc_right,
-    coussins,
-    window_title,
-    compute_fn,
-    build_fn,
-    traversins=None,
-    couleurs=None,
     meridienne_side=None,
     meridienne_len=0,
 ):
     """
-    Common rendering routine for all U‑shaped sofa variants.
+    Compute points and polygons for one U variant, without drawing.
 
-    This function computes the geometry via ``compute_fn`` (passing
-    through ``meridienne_side`` and ``meridienne_len``), builds the
-    polygons via ``build_fn``, draws the backs, seats, armrests,
-    cushions and traversins, and prints a textual report. The window
-    title is augmented to display the méridienne configuration.
+    Returns ``(pts, polys, drawn)``; shared by the renderer and by the
+    automatic variant selection so the winner's geometry is built once.
     """
     # Compute points with méridienne parameters
     pts = compute_fn(
@@ -5051,34 +5864,84 @@ def _render_common_U(
         acc_bas,
         acc_right,
     )
+    return pts, polys, drawn
+
+def _render_common_U(
+    variant,
+    tx,
+    ty_left,
+    tz_right,
+    profondeur,
+    dossier_left,
+    dossier_bas,
+    dossier_right,
+    acc_left,
+    acc_bas,
+    acc_right,
+    coussins,
+    window_title,
+    compute_fn,
+    build_fn,
+    traversins=None,
+    couleurs=None,
+    meridienne_side=None,
+    meridienne_len=0,
+    geometry=None,
+):
+    """
+    Common rendering routine for all U‑shaped sofa variants.
+
+    This function computes the geometry via ``compute_fn`` (passing
+    through ``meridienne_side`` and ``meridienne_len``), builds the
+    polygons via ``build_fn`` — or reuses ``geometry`` = (pts, polys,
+    drawn) when the automatic variant selection already built it — draws the backs, seats, armrests,
+    cushions and traversins, and prints a textual report. The window
+    title is augmented to display the méridienne configuration.
+    """
+    if geometry is None:
+        geometry = _geometry_U(
+            compute_fn,
+            build_fn,
+            tx,
+            ty_left,
+            tz_right,
+            profondeur,
+            dossier_left,
+            dossier_bas,
+            dossier_right,
+            acc_left,
+            acc_bas,
+            acc_right,
+            meridienne_side,
+            meridienne_len,
+        )
+    pts, polys, drawn = geometry
     # Ensure no seat exceeds maximum length
     _assert_banquettes_max_250(polys)
 
     # Parse traversins and resolve colors
     trv = _parse_traversins_spec(traversins, allowed={"g", "d"})
-    legend_items = _resolve_and_apply_colors(couleurs)
+    palette, legend_items = _resolve_palette(couleurs)
 
     # Setup drawing canvas
     ty_canvas = pts["_ty_canvas"]
-    screen = turtle.Screen()
-    screen.setup(WIN_W, WIN_H)
-    screen.title(
-        f"{window_title} — {variant} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}"
-        f" — méridienne {meridienne_side or '-'}={meridienne_len}"
-    )
-    t = turtle.Turtle(visible=False)
-    t.speed(0)
-    screen.tracer(False)
     tr = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
+    # Display list : les outils de dessin enregistrent, _emit_display_list rejoue
+    t = DisplayList(
+        tr, WIN_W, WIN_H,
+        title=f"{window_title} — {variant} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}"
+              f" — méridienne {meridienne_side or '-'}={meridienne_len}",
+        palette=palette,
+    )
 
     # Draw backs, seats and armrests
     for p in polys["dossiers"]:
         if _poly_has_area(p):
-            draw_polygon_cm(t, tr, p, fill=COLOR_DOSSIER)
+            draw_polygon_cm(t, tr, p, fill=_color(t, "DOSSIER"))
     for p in polys["banquettes"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
+        draw_polygon_cm(t, tr, p, fill=_color(t, "ASSISE"))
     for p in polys["accoudoirs"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ACC)
+        draw_polygon_cm(t, tr, p, fill=_color(t, "ACC"))
 
     # Draw traversins and count
     n_traversins = _draw_traversins_U_common(
@@ -5189,10 +6052,6 @@ def _render_common_U(
         t, tr, tx, ty_canvas, items=legend_items, pos="top-center"
     )
 
-    # Finalize drawing
-    screen.tracer(True)
-    t.hideturtle()
-
     # Compute split bonus for backs
     split_flags = polys.get("split_flags", {})
     add_split = int(
@@ -5205,26 +6064,32 @@ def _render_common_U(
     )
 
     # Print report
-    print(f"=== Rapport canapé U (variant {variant}) ===")
-    print(
+    _report(f"=== Rapport canapé U (variant {variant}) ===")
+    _report(
         f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}"
     )
-    print(
+    _report(
         f"Méridienne : {meridienne_side or '-'} ({meridienne_len} cm)"
     )
-    print(
+    _report(
         f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}"
     )
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
     dossiers_count = _compute_dossiers_count(polys)
     dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(
+    _report(
         f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}"
     )
-    print("Banquettes d’angle : 0")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    _report("Banquettes d’angle : 0")
+    _report(f"Traversins : {n_traversins} × 70x30")
+    _report(f"Coussins : {total_line}")
+    _attach_layout(
+        t, kind="U", variant=variant, tx=tx, ty=ty_left, tz=tz_right,
+        profondeur=profondeur, polys=polys, n_traversins=n_traversins,
+        cushions_total=cushions_count, cushions_line=total_line,
+        add_split=add_split, nb_angles=0,
+    )
+    _emit_display_list(t)
 
 def render_U_v1(
     tx,
@@ -5481,6 +6346,13 @@ def render_U_v4(
     )
 
 # ---------- AUTO sélection U ----------
+_U_VARIANTS = {
+    "v1": (compute_points_U_v1, build_polys_U_v1),
+    "v2": (compute_points_U_v2, build_polys_U_v2),
+    "v3": (compute_points_U_v3, build_polys_U_v3),
+    "v4": (compute_points_U_v4, build_polys_U_v4),
+}
+
 def _metrics_U(
     variant,
     tx,
@@ -5510,20 +6382,8 @@ def _metrics_U(
     Additional parameters ``meridienne_side`` and ``meridienne_len`` are
     forwarded to the geometry computation to account for a méridienne.
     """
-    comp = {
-        "v1": compute_points_U_v1,
-        "v2": compute_points_U_v2,
-        "v3": compute_points_U_v3,
-        "v4": compute_points_U_v4,
-    }[variant]
-    build = {
-        "v1": build_polys_U_v1,
-        "v2": build_polys_U_v2,
-        "v3": build_polys_U_v3,
-        "v4": build_polys_U_v4,
-    }[variant]
-
-    pts = comp(
+    _pts, polys, _drawn = _geometry_U(
+        *_U_VARIANTS[variant],
         tx,
         ty_left,
         tz_right,
@@ -5537,20 +6397,10 @@ def _metrics_U(
         meridienne_side,
         meridienne_len,
     )
-    polys, _ = build(
-        pts,
-        tx,
-        ty_left,
-        tz_right,
-        profondeur,
-        dossier_left,
-        dossier_bas,
-        dossier_right,
-        acc_left,
-        acc_bas,
-        acc_right,
-    )
+    return _metrics_U_polys(polys)
 
+def _metrics_U_polys(polys):
+    """(nb_banquettes, scissions, nb_le_200, ok) for already built U polygons."""
     nb_banquettes = len(polys["banquettes"])
     scissions = max(0, nb_banquettes - 3)
 
@@ -5643,29 +6493,42 @@ def render_U(
             meridienne_len=meridienne_len,
         )
 
-    # Automatic variant selection
+    # Automatic variant selection, made on the standard (midpoint) splits so that
+    # the optional cost-aware splits never change the chosen variant or its cushions
     variants = ["v1", "v2", "v3", "v4"]
-    metrics = {
-        vv: _metrics_U(
-            vv,
-            tx,
-            ty_left,
-            tz_right,
-            profondeur,
-            dossier_left,
-            dossier_bas,
-            dossier_right,
-            acc_left,
-            acc_bas,
-            acc_right,
-            meridienne_side,
-            meridienne_len,
-        )
-        for vv in variants
-    }
+    split_costs = _split_costs.get()
+    token = _split_costs.set(None)
+    try:
+        geometries = {
+            vv: _geometry_U(
+                *_U_VARIANTS[vv],
+                tx,
+                ty_left,
+                tz_right,
+                profondeur,
+                dossier_left,
+                dossier_bas,
+                dossier_right,
+                acc_left,
+                acc_bas,
+                acc_right,
+                meridienne_side,
+                meridienne_len,
+            )
+            for vv in variants
+        }
+    finally:
+        _split_costs.reset(token)
+    metrics = {vv: _metrics_U_polys(geometries[vv][1]) for vv in variants}
 
     # 1) Keep only feasible variants (no seat > 250 cm)
     ok_variants = [vv for vv in variants if metrics[vv][3]]
+    if not ok_variants and split_costs is not None:
+        # Cost-aware splits may cut an over-long seat in three
+        for vv in variants:
+            _optimize_splits(geometries[vv][1], split_costs)
+        metrics = {vv: _metrics_U_polys(geometries[vv][1]) for vv in variants}
+        ok_variants = [vv for vv in variants if metrics[vv][3]]
     if not ok_variants:
         raise ValueError(
             "Aucune variante U faisable (certaines banquettes resteraient > 250 cm). "
@@ -5689,9 +6552,12 @@ def render_U(
             break
     if choice is None:
         choice = tied[0]
+    if split_costs is not None:
+        _optimize_splits(geometries[choice][1], split_costs)
 
-    # Delegate to the chosen variant
-    return render_U(
+    # Render the chosen variant, reusing the geometry built for the metrics
+    return _render_common_U(
+        choice,
         tx,
         ty_left,
         tz_right,
@@ -5703,12 +6569,13 @@ def render_U(
         acc_bas,
         acc_right,
         coussins,
-        variant=choice,
+        f"{window_title} [{choice}]",
+        *_U_VARIANTS[choice],
         traversins=traversins,
         couleurs=couleurs,
-        window_title=window_title,
         meridienne_side=meridienne_side,
         meridienne_len=meridienne_len,
+        geometry=geometries[choice],
     )
 
 # =====================================================================
@@ -5753,6 +6620,7 @@ def compute_points_simple_S1(tx,
     pts["_prof"] = profondeur
     return pts
 
+@_cost_aware_splits
 def build_polys_simple_S1(pts, dossier=True, acc_left=True, acc_right=True,
                           meridienne_side=None, meridienne_len=0):
     polys = {"banquettes": [], "dossiers": [], "accoudoirs": []}
@@ -5801,6 +6669,9 @@ def build_polys_simple_S1(pts, dossier=True, acc_left=True, acc_right=True,
 
 def _choose_cushion_size_auto_simple_S1(x0, x1):
     usable = max(0, x1 - x0)
+    size = cushion_tables.best_size("s1", usable)
+    if size:
+        return size
     best, best_score = 65, (1e9, -1)
     for s in (65, 80, 90):
         waste = usable % s if usable > 0 else 0
@@ -5830,7 +6701,7 @@ def _draw_coussins_simple_S1(t, tr, pts, size,
     x = x0 + off; n = 0
     while x + size <= x1 + 1e-6:
         poly = [(x, y), (x+size, y), (x+size, y+CUSHION_DEPTH), (x, y+CUSHION_DEPTH), (x, y)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
+        draw_polygon_cm(t, tr, poly, fill=_color(t, "CUSHION"), outline=COLOR_CONTOUR, width=1, role="cushion")
         label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
         x += size; n += 1
     return n
@@ -5851,26 +6722,26 @@ def render_Simple1(tx,
     _assert_banquettes_max_250(polys)
 
     trv = _parse_traversins_spec(traversins, allowed={"g","d"})
-    legend_items = _resolve_and_apply_colors(couleurs)
+    palette, legend_items = _resolve_palette(couleurs)
 
     # profondeur totale pour l'affichage : dossier + assise
     y_base = DOSSIER_THICK if dossier else 0
     prof_tot = profondeur + y_base
 
-    screen = turtle.Screen(); screen.setup(WIN_W, WIN_H)
-    screen.title(f"{window_title} — tx={tx} / prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}")
-    t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
     # utiliser la profondeur totale pour le repère
     tr = WorldToScreen(tx, prof_tot, WIN_W, WIN_H, PAD_PX, ZOOM)
+    # Display list : les outils de dessin enregistrent, _emit_display_list rejoue
+    t = DisplayList(tr, WIN_W, WIN_H, title=f"{window_title} — tx={tx} / prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}",
+                    palette=palette)
 
     # (Quadrillage et repères supprimés)
 
     for p in polys["dossiers"]:
-        if _poly_has_area(p):  draw_polygon_cm(t, tr, p, fill=COLOR_DOSSIER)
+        if _poly_has_area(p):  draw_polygon_cm(t, tr, p, fill=_color(t, "DOSSIER"))
     for p in polys["banquettes"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
+        draw_polygon_cm(t, tr, p, fill=_color(t, "ASSISE"))
     for p in polys["accoudoirs"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ACC)
+        draw_polygon_cm(t, tr, p, fill=_color(t, "ACC"))
 
     # Traversins + comptage (on travaille avec la profondeur totale)
     n_traversins = _draw_traversins_simple_S1(t, tr, pts, prof_tot, dossier, trv)
@@ -5935,21 +6806,268 @@ def render_Simple1(tx,
     # Légende
     draw_legend(t, tr, tx, profondeur, items=legend_items, pos="top-right")
 
-    screen.tracer(True); t.hideturtle()
     add_split = int(polys.get("split_flags",{}).get("center",False) and dossier)
-    print("=== Rapport Canapé simple 1 ===")
-    print(f"Dimensions : {tx}×{profondeur} cm")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    _report("=== Rapport Canapé simple 1 ===")
+    _report(f"Dimensions : {tx}×{profondeur} cm")
+    _report(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
     dossiers_count = _compute_dossiers_count(polys)
     dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers   : {dossiers_str} (+{add_split} via scission)  |  Accoudoirs : {len(polys['accoudoirs'])}")
-    print(f"Banquettes d’angle : 0")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins   : {total_line}")
+    _report(f"Dossiers   : {dossiers_str} (+{add_split} via scission)  |  Accoudoirs : {len(polys['accoudoirs'])}")
+    _report(f"Banquettes d’angle : 0")
+    _report(f"Traversins : {n_traversins} × 70x30")
+    _report(f"Coussins   : {total_line}")
     if meridienne_side:
-        print(f"Méridienne : côté {'gauche' if meridienne_side=='g' else 'droit'} — {meridienne_len} cm")
-    turtle.done()
+        _report(f"Méridienne : côté {'gauche' if meridienne_side=='g' else 'droit'} — {meridienne_len} cm")
+    _attach_layout(
+        t, kind="Simple1", variant=None, tx=tx, ty=None, tz=None,
+        profondeur=profondeur, polys=polys, n_traversins=n_traversins,
+        cushions_total=nb_coussins, cushions_line=total_line,
+        add_split=add_split, nb_angles=0,
+    )
+    _emit_display_list(t)
+
+# =====================================================================
+# ==================  RENDU SANS AFFICHAGE (serveur)  =================
+# =====================================================================
+
+# Nom court -> fonction render_* (utilisé par render_to_bytes)
+RENDERERS = {
+    "Simple1": render_Simple1,
+    "LNF": render_LNF,
+    "LF": render_LF_variant,
+    "U": render_U,
+    "U1F": render_U1F,
+    "U1F_v1": render_U1F_v1,
+    "U1F_v2": render_U1F_v2,
+    "U1F_v3": render_U1F_v3,
+    "U1F_v4": render_U1F_v4,
+    "U2F": render_U2f_variant,
+}
+
+_MIMETYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+}
+
+def _png_size(data):
+    """(largeur, hauteur) en pixels lues dans l'en-tête IHDR d'un PNG."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or len(data) < 24:
+        return None, None
+    return int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+
+def _resolve_renderer(renderer):
+    """(nom, fonction) pour un nom court de RENDERERS ou une fonction render_*."""
+    if isinstance(renderer, str):
+        if renderer not in RENDERERS:
+            raise ValueError(f"Renderer inconnu : {renderer!r} (attendu : {', '.join(RENDERERS)})")
+        return renderer, RENDERERS[renderer]
+    return getattr(renderer, "__name__", str(renderer)), renderer
+
+def _run_headless(func, params, backend):
+    """
+    Exécute func(**params) sans affichage ; retourne le dernier objet capturé :
+    la DisplayList (backend "dl") ou l'écran final ("mpl" / "svg").
+    """
+    captured = []
+    tokens = [(_headless_capture, _headless_capture.set(captured)),
+              (_current_screen, _current_screen.set(None)),
+              (_screen_backend, _screen_backend.set(backend))]
+    try:
+        func(**params)
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+    if not captured:
+        raise RuntimeError(f"{getattr(func, '__name__', func)} n'a produit aucune figure")
+    return captured[-1]
+
+# Libellés type_canape de l'application -> renderer (recherche par fragment, dans l'ordre)
+TYPE_CANAPE_RENDERERS = (
+    ("Simple", "Simple1"),
+    ("L - Sans Angle", "LNF"),
+    ("L - Avec Angle", "LF"),
+    ("U - Sans Angle", "U"),
+    ("U - 1 Angle", "U1F"),
+    ("U - 2 Angles", "U2F"),
+)
+
+def _render_call_from_config(config):
+    """
+    (renderer, params) à partir d'une configuration :
+      - "renderer" (nom court de RENDERERS) ou "type_canape" (libellé de l'app) ;
+      - dimensions/options à plat, ou imbriquées sous "dimensions" / "options"
+        comme dans la config du devis PDF ;
+      - alias acceptés : ty/tz (U), dossier_bas (Simple), type_coussins.
+    Les clés inconnues du renderer sont ignorées.
+    """
+    flat = {k: v for k, v in config.items() if k not in ("dimensions", "options")}
+    flat.update(config.get("dimensions") or {})
+    flat.update(config.get("options") or {})
+
+    renderer = flat.pop("renderer", None)
+    if renderer is None:
+        label = str(flat.get("type_canape", ""))
+        renderer = next((r for frag, r in TYPE_CANAPE_RENDERERS if frag in label), None)
+        if renderer is None:
+            raise ValueError(f"Type de canapé inconnu : {label!r}")
+    _name, func = _resolve_renderer(renderer)
+
+    if "coussins" not in flat and "type_coussins" in flat:
+        flat["coussins"] = flat["type_coussins"]
+    if "ty_left" not in flat and "ty" in flat:
+        flat["ty_left"] = flat["ty"]
+    if "tz_right" not in flat and "tz" in flat:
+        flat["tz_right"] = flat["tz"]
+    if "dossier" not in flat and "dossier_bas" in flat:
+        flat["dossier"] = flat["dossier_bas"]
+
+    sig = _renderer_params(func)
+    params = {k: v for k, v in flat.items() if k in sig}
+    return renderer, params
+
+@functools.lru_cache(maxsize=None)
+def _renderer_params(func):
+    """Noms des paramètres d'un renderer (inspect.signature est lent, cf. recherche_config)."""
+    import inspect
+    sig = inspect.signature(func).parameters
+    if any(p.kind == p.VAR_KEYWORD for p in sig.values()):
+        sig = inspect.signature(render_U1F).parameters  # render_U1F_v* (*args, **kwargs)
+    return frozenset(sig)
+
+def compute_layout(config, split_costs=None):
+    """
+    Calcule la disposition d'un canapé sans créer de figure ni rien afficher.
+
+    Mêmes compute_points_* / build_polys_*, choix de variante (auto) et placement
+    des coussins/traversins que le rendu. config : voir _render_call_from_config,
+    p. ex. {"type_canape": "U - Sans Angle", "tx": 520, "ty": 420, "tz": 420,
+    "profondeur": 80, "coussins": "valise"}. split_costs : cf. build_display_list.
+
+    Retourne un dict :
+      type, variant, dimensions,
+      banquettes      : [{"longueur", "profondeur", "poly"}, ...]
+      dossiers, accoudoirs, angles : listes de polygones (cm)
+      nb_dossiers     : comptage pondéré (_compute_dossiers_count)
+      dossiers_scission, nb_accoudoirs, nb_angles, traversins,
+      coussins        : {"total", "resume", "par_branche": {côté: {"nombre", "tailles": {taille: n}}},
+                         "chute": assise non couverte en cm}
+    """
+    renderer, params = _render_call_from_config(config)
+    token = _reports_enabled.set(False)
+    try:
+        dl = build_display_list(renderer, split_costs=split_costs, **params)
+    finally:
+        _reports_enabled.reset(token)
+    return dl.layout
+
+def build_display_list(renderer, split_costs=None, **params):
+    """
+    Calcule la géométrie d'un canapé et retourne sa DisplayList, sans rien dessiner.
+
+    La liste peut être mise en cache, sérialisée (to_dict) et rejouée vers
+    plusieurs formats (display_list_to_bytes / display_list_to_svg).
+
+    split_costs : coûts de revient des supports (pricing.couts_scission()) ;
+    si fournis, les banquettes scindées sont recoupées au moindre coût
+    (_optimize_splits) au lieu d'être coupées au milieu.
+    """
+    name, func = _resolve_renderer(renderer)
+    token = _split_costs.set(split_costs)
+    try:
+        dl = _run_headless(func, params, backend="dl")
+    finally:
+        _split_costs.reset(token)
+    dl.renderer = name
+    return dl
+
+def display_list_to_bytes(dl, fmt="png", dpi=150, bbox_inches="tight"):
+    """
+    Rejoue une DisplayList sur une Figure Agg autonome et retourne (bytes, meta).
+
+    Paramètres :
+      fmt         : format Matplotlib ("png", "svg", "pdf", ...).
+      dpi         : résolution pour les formats raster.
+      bbox_inches : transmis à savefig ("tight" par défaut, None = page entière).
+
+    Ni plt.show(), ni registre pyplot.
+    meta = {"renderer", "format", "mimetype", "dpi", "title", "width_px", "height_px"}.
+    """
+    fmt = (fmt or "png").lower()
+    screen = _run_headless(_emit_display_list, {"dl": dl}, backend="mpl")
+
+    buf = BytesIO()
+    screen.fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches=bbox_inches)
+    data = buf.getvalue()
+    width_px, height_px = _png_size(data) if fmt == "png" else (None, None)
+    meta = {
+        "renderer": dl.renderer,
+        "format": fmt,
+        "mimetype": _MIMETYPES.get(fmt, "application/octet-stream"),
+        "dpi": dpi,
+        "title": screen.window_title,
+        "width_px": width_px,
+        "height_px": height_px,
+    }
+    return data, meta
+
+def display_list_to_svg(dl):
+    """Rejoue une DisplayList avec le backend SVG natif ; retourne (texte SVG, meta)."""
+    screen = _run_headless(_emit_display_list, {"dl": dl}, backend="svg")
+    meta = {
+        "renderer": dl.renderer,
+        "format": "svg",
+        "mimetype": _MIMETYPES["svg"],
+        "dpi": None,
+        "title": screen.window_title,
+        "width_px": int(screen.width),
+        "height_px": int(screen.height),
+    }
+    return screen.svg, meta
+
+def display_list_to_screen(dl, screen):
+    """
+    Rejoue une DisplayList sur un écran fourni par l'appelant, même interface
+    que _SvgScreen (setup / title / tracer / add_segment / add_fill /
+    add_rounded_rect / add_text / flush) : backends hors de ce module, comme
+    le dessin vectoriel du devis PDF (pdf_generator). Retourne l'écran.
+    """
+    screen.setup(dl.width, dl.height)
+    if dl.title:
+        screen.title(dl.title)
+    t = turtle.Turtle(visible=False, screen=screen); t.speed(0); screen.tracer(False)
+    dl.replay(t)
+    screen.tracer(True)
+    screen.flush()
+    return screen
+
+def render_to_bytes(renderer, fmt="png", dpi=150, bbox_inches="tight", **params):
+    """
+    Rend un canapé sans interface graphique et retourne (bytes, meta).
+
+    Paramètres :
+      renderer    : nom court de RENDERERS ("U", "LNF", ...) ou fonction render_*.
+      fmt, dpi, bbox_inches : voir display_list_to_bytes.
+      **params    : arguments de la fonction render_* (tx, ty, profondeur, ...).
+    """
+    return display_list_to_bytes(build_display_list(renderer, **params),
+                                 fmt=fmt, dpi=dpi, bbox_inches=bbox_inches)
+
+def render_to_svg(renderer, **params):
+    """
+    Rend un canapé en SVG avec le backend natif (_SvgScreen), sans matplotlib.
+
+    Même paramètres que render_to_bytes ; retourne (texte SVG, meta).
+    Pour un aperçu navigateur : quelques ms au lieu de plusieurs centaines.
+    """
+    return display_list_to_svg(build_display_list(renderer, **params))
+
+# Tailles auto précalculées (cushion_tables.npy) : ignorées si calculées pour
+# une autre profondeur de coussin ou une autre version des choix automatiques.
+cushion_tables.check(globals())
 
 # =====================================================================
 # =====================  TESTS ÉTENDUS (30)  ==========================
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Catalogue de prix versionné (catalogue_prix.json)
+
+Chaque version porte une date d'effet et ne liste que ce qui change par
+rapport à la version précédente :
+
+    {"versions": [
+        {"version": "2024-01", "date_effet": "2024-01-01", "prix_ttc": {...}, ...},
+        {"version": "2025-03", "date_effet": "2025-03-01",
+         "cout_revient_ht": {"supports": {"dossier": 160}}}
+    ]}
+
+À la compilation, chaque version est fusionnée avec les précédentes, validée
+et convertie en tables prêtes à l'emploi (clés de taille entières) ; un devis
+ne fait ensuite qu'une recherche dichotomique sur les dates d'effet puis des
+accès dict.
+
+Rechargement à chaud : recharger() compile le nouveau fichier à part puis
+remplace la référence du module en une seule affectation. Un devis en cours
+garde la version qu'il a obtenue au départ ; un fichier invalide lève
+ValueError et laisse le catalogue courant en place.
+
+Fichier utilisé : variable d'environnement CANAPE_CATALOGUE_PRIX, sinon
+catalogue_prix.json à côté de ce module.
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date, datetime
+
+CATALOGUE_PATH = os.environ.get("CANAPE_CATALOGUE_PRIX") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "catalogue_prix.json")
+
+# Champs obligatoires de chaque version compilée (chemins dans le dict)
+_CHAMPS_REQUIS = (
+    ("prix_ttc", "coussins", 65), ("prix_ttc", "coussins", 80), ("prix_ttc", "coussins", 90),
+    ("prix_ttc", "coussins", "valise"),
+    ("prix_ttc", "supports", "banquette"), ("prix_ttc", "supports", "banquette_angle"),
+    ("prix_ttc", "supports", "accoudoir"), ("prix_ttc", "supports", "dossier"),
+    ("prix_ttc", "accessoires", "coussin_deco"), ("prix_ttc", "accessoires", "traversin"),
+    ("prix_ttc", "accessoires", "surmatelas"),
+    ("coef_mousse_ttc", "D25"),
+    ("cout_revient_ht", "coussins", 65), ("cout_revient_ht", "coussins", 80),
+    ("cout_revient_ht", "coussins", 90), ("cout_revient_ht", "coussins", "valise"),
+    ("cout_revient_ht", "supports", "banquette"), ("cout_revient_ht", "supports", "banquette_long"),
+    ("cout_revient_ht", "supports", "banquette_angle"), ("cout_revient_ht", "supports", "accoudoir"),
+    ("cout_revient_ht", "supports", "dossier"), ("cout_revient_ht", "supports", "dossier_long"),
+    ("cout_revient_ht", "accessoires", "coussin_deco"), ("cout_revient_ht", "accessoires", "traversin"),
+    ("cout_revient_ht", "accessoires", "surmatelas"),
+    ("cout_revient_ht", "arrondis"),
+    ("coef_mousse_cout_ht", "D25"),
+    ("tissu", "petit_ttc"), ("tissu", "grand_ttc"),
+    ("tissu", "petit_cout_ht"), ("tissu", "grand_cout_ht"), ("tissu", "supplement_cout_ht"),
+)
+
+# dates : ordinaux des dates d'effet (croissants) ; versions : tables compilées
+Catalogue = namedtuple("Catalogue", "dates versions chemin signature")
+
+_CATALOGUE = None
+_VERROU = threading.Lock()  # sérialise les rechargements ; les lectures ne le prennent jamais
+
+
+# ============================================================================
+# COMPILATION
+# ============================================================================
+
+def _ordinal(jour):
+    """Ordinal d'une date (date, datetime, 'AAAA-MM-JJ' ; None -> aujourd'hui)"""
+    if jour is None:
+        jour = date.today()
+    elif isinstance(jour, datetime):
+        jour = jour.date()
+    elif isinstance(jour, str):
+        jour = date.fromisoformat(jour.strip()[:10])
+    return jour.toordinal()
+
+
+def _cles(valeur):
+    """Clés numériques JSON ("65") -> int, récursivement"""
+    if not isinstance(valeur, dict):
+        return valeur
+    return {(int(k) if isinstance(k, str) and k.isdigit() else k): _cles(v)
+            for k, v in valeur.items()}
+
+
+def _fusion(base, delta):
+    """Copie de base complétée/écrasée par delta (dicts imbriqués)"""
+    resultat = dict(base)
+    for k, v in delta.items():
+        if isinstance(v, dict) and isinstance(resultat.get(k), dict):
+            resultat[k] = _fusion(resultat[k], v)
+        else:
+            resultat[k] = v
+    return resultat
+
+
+def compiler(donnees, chemin=None, signature=None):
+    """Fusionne, valide et indexe les versions d'un catalogue déjà décodé"""
+    brutes = donnees.get("versions") if isinstance(donnees, dict) else None
+    if not brutes:
+        raise ValueError("Catalogue de prix vide (clé 'versions')")
+    try:
+        brutes = sorted(brutes, key=lambda v: _ordinal(v["date_effet"]))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"date_effet absente ou invalide dans le catalogue : {e}") from e
+
+    dates, versions = [], []
+    courante = {}
+    for brute in brutes:
+        jour = _ordinal(brute["date_effet"])
+        nom = str(brute.get("version", brute["date_effet"]))
+        if dates and jour == dates[-1]:
+            raise ValueError(f"Deux versions du catalogue prennent effet le {brute['date_effet']}")
+        courante = _fusion(courante, _cles({k: v for k, v in brute.items()
+                                            if k not in ("version", "date_effet")}))
+        for champ in _CHAMPS_REQUIS:
+            noeud = courante
+            for cle in champ:
+                if not isinstance(noeud, dict) or cle not in noeud:
+                    raise ValueError(f"Version {nom} : champ manquant {'.'.join(map(str, champ))}")
+                noeud = noeud[cle]
+        dates.append(jour)
+        versions.append(dict(courante, version=nom,
+                             date_effet=date.fromordinal(jour).isoformat()))
+    return Catalogue(tuple(dates), tuple(versions), chemin, signature)
+
+
+def _signature(chemin):
+    st = os.stat(chemin)
+    return st.st_mtime_ns, st.st_size
+
+
+def charger(chemin=CATALOGUE_PATH):
+    """Lit et compile un fichier catalogue (ne touche pas au catalogue courant)"""
+    signature = _signature(chemin)
+    with open(chemin, encoding="utf-8") as f:
+        try:
+            donnees = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Catalogue de prix illisible ({chemin}) : {e}") from e
+    return compiler(donnees, chemin, signature)
+
+
+# ============================================================================
+# RECHARGEMENT À CHAUD
+# ============================================================================
+
+def recharger(chemin=None):
+    """Recompile le catalogue et le met en service ; renvoie la dernière version"""
+    global _CATALOGUE
+    with _VERROU:
+        nouveau = charger(chemin or (_CATALOGUE.chemin if _CATALOGUE else CATALOGUE_PATH))
+        _CATALOGUE = nouveau  # une seule affectation : bascule atomique
+    return nouveau.versions[-1]["version"]
+
+
+def recharger_si_modifie():
+    """Recharge si le fichier a changé depuis la dernière compilation ; True si rechargé"""
+    courant = _CATALOGUE
+    if courant is not None and _signature(courant.chemin) == courant.signature:
+        return False
+    recharger()
+    return True
+
+
+# ============================================================================
+# LECTURE
+# ============================================================================
+
+def en_vigueur(date_devis=None, catalogue=None):
+    """
+    Version compilée applicable à date_devis (None : aujourd'hui), dans le
+    catalogue courant ou dans catalogue (résultat de charger / compiler).
+    """
+    catalogue = catalogue or _CATALOGUE  # instantané : indifférent à un rechargement concurrent
+    i = bisect_right(catalogue.dates, _ordinal(date_devis)) - 1
+    if i < 0:
+        raise ValueError(f"Aucun tarif en vigueur au {date_devis} "
+                         f"(premier tarif : {catalogue.versions[0]['date_effet']})")
+    return catalogue.versions[i]
+
+
+def versions():
+    """[(version, date_effet)] du catalogue courant, de la plus ancienne à la plus récente"""
+    return [(v["version"], v["date_effet"]) for v in _CATALOGUE.versions]
+
+
+recharger()
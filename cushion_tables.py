@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Tables de découpe des coussins précalculées (longueurs entières 0..600 cm)
+
+La taille "auto" (65/80/90) retenue par les choix automatiques LF
+(_choose_cushion_size_auto), L (_choose_cushion_size_auto_L) et simple
+(_choose_cushion_size_auto_simple_S1) ne dépend que des longueurs utiles :
+on la précalcule une fois pour toutes. Le couple (nombre, chute) d'une
+branche reste calculé par // et % : deux opérations entières coûtent moins
+qu'une lecture de table.
+
+Régénération (après modification des règles de choix ou de CUSHION_DEPTH) :
+    python cushion_tables.py
+
+Le fichier est projeté en mémoire (mmap) à l'import. S'il est absent, périmé
+(empreinte du code des fonctions tabulées différente : elles ont été modifiées
+sans régénérer) ou si NumPy n'est pas disponible, best_size renvoie None et
+l'appelant retombe sur le calcul direct.
+"""
+
+import hashlib
+import inspect
+import linecache
+import os
+
+try:
+    import numpy as np
+except ImportError:  # calcul direct uniquement
+    np = None
+
+# ============================================================================
+# FORMAT
+# ============================================================================
+
+TABLE_VERSION = 2
+MAX_LEN = 600
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cushion_tables.npy")
+
+_N_LEN = MAX_LEN + 1
+
+# Fonctions de canapematplot tabulées
+FONCTIONS = ("_choose_cushion_size_auto", "_choose_cushion_size_auto_L",
+             "_choose_cushion_size_auto_simple_S1")
+
+# Un seul tableau uint8 à plat :
+#   [version, CUSHION_DEPTH, empreinte (8 octets)]
+#   lf    : (usable_h, usable_v) -> taille auto LF
+#   l     : (x_end - F0x, y_end - F0y) -> taille auto L
+#   s1    : usable -> taille auto simple
+_EMPREINTE = slice(2, 10)
+_HEADER = 10
+_SECTIONS = (
+    ("lf", (_N_LEN, _N_LEN)),
+    ("l", (_N_LEN, _N_LEN)),
+    ("s1", (_N_LEN,)),
+)
+
+TABLES = None
+
+
+def _imbriques(code):
+    """Le code objet et ceux de ses fonctions imbriquées."""
+    yield code
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _imbriques(const)
+
+
+def _source(code):
+    """Lignes source d'une fonction (sans tokenisation, cf. inspect.getsource), ou None."""
+    codes = list(_imbriques(code))
+    fin = max((ligne for c in codes for _, _, ligne in c.co_lines() if ligne is not None),
+              default=code.co_firstlineno)
+    lignes = linecache.getlines(code.co_filename)[code.co_firstlineno - 1:fin]
+    return "".join(lignes) or None
+
+
+def empreinte(namespace):
+    """
+    Empreinte (8 octets) des fonctions tabulées : leur source (indépendante de
+    la version de Python, contrairement au bytecode) et la valeur des
+    constantes du module qu'elles lisent (CUSHION_DEPTH, TRAVERSIN_THK, ...).
+    namespace : globals() de canapematplot.
+    """
+    h = hashlib.sha1()
+    for nom in FONCTIONS:
+        code = namespace[nom].__code__
+        source = _source(code)
+        # source indisponible (.pyc seul) : bytecode
+        h.update(source.encode("utf-8") if source else code.co_code)
+        noms = set()
+        for c in _imbriques(code):
+            noms.update(c.co_names)
+        for ref in sorted(noms):
+            valeur = namespace.get(ref)
+            if isinstance(valeur, (int, float, str, tuple)):
+                h.update(f"{ref}={valeur!r};".encode("utf-8"))
+    return h.digest()[:8]
+
+
+def _split(flat):
+    tables = {"version": int(flat[0]), "depth": int(flat[1]), "empreinte": bytes(flat[_EMPREINTE])}
+    pos = _HEADER
+    for name, shape in _SECTIONS:
+        n = 1
+        for d in shape:
+            n *= d
+        tables[name] = flat[pos:pos + n].reshape(shape)
+        pos += n
+    return tables, pos
+
+
+def load(path=TABLE_PATH):
+    """Projette le fichier en mémoire ; None si absent ou incompatible."""
+    if np is None or not os.path.exists(path):
+        return None
+    try:
+        flat = np.asarray(np.load(path, mmap_mode="r"))
+        if flat.dtype != np.uint8 or flat.ndim != 1 or len(flat) < _HEADER:
+            return None
+        if int(flat[0]) != TABLE_VERSION:
+            return None
+        tables, size = _split(flat)
+    except (OSError, ValueError):
+        return None
+    return tables if size == len(flat) else None
+
+
+def check(namespace):
+    """
+    Désactive les tables si elles ont été calculées pour une autre profondeur
+    de coussin ou pour une autre version des fonctions tabulées.
+    namespace : globals() de canapematplot, une fois ces fonctions définies.
+    """
+    global TABLES
+    if TABLES is not None and (TABLES["depth"] != namespace["CUSHION_DEPTH"]
+                               or TABLES["empreinte"] != empreinte(namespace)):
+        TABLES = None
+    return TABLES is not None
+
+
+# ============================================================================
+# LECTURES
+# ============================================================================
+
+def _index(length):
+    """Indice de table pour une longueur entière (négatif -> 0), sinon None."""
+    if isinstance(length, float):
+        if not length.is_integer():
+            return None
+        length = int(length)
+    elif not isinstance(length, int):
+        return None
+    if length > MAX_LEN:
+        return None
+    return max(0, length)
+
+
+def best_size(kind, *lengths):
+    """Taille auto précalculée ("lf", "l" ou "s1"), ou None hors table."""
+    if TABLES is None:
+        return None
+    idx = tuple(_index(v) for v in lengths)
+    if None in idx:
+        return None
+    return TABLES[kind].item(*idx)
+
+
+# ============================================================================
+# CONSTRUCTION
+# ============================================================================
+
+def build(path=TABLE_PATH):
+    """Tabule les fonctions de canapematplot elles-mêmes et écrit le fichier."""
+    global TABLES
+    import canapematplot as cm
+
+    saved, TABLES = TABLES, None  # ne pas relire l'ancienne table pendant le calcul
+    try:
+        depth = cm.CUSHION_DEPTH
+        flat = np.zeros(_HEADER + sum(int(np.prod(s)) for _, s in _SECTIONS), dtype=np.uint8)
+        flat[:2] = (TABLE_VERSION, depth)
+        flat[_EMPREINTE] = np.frombuffer(empreinte(vars(cm)), dtype=np.uint8)
+        tables, _ = _split(flat)
+
+        for a in range(_N_LEN):
+            tables["s1"][a] = cm._choose_cushion_size_auto_simple_S1(0, a)
+            for b in range(_N_LEN):
+                # coin en (0, 0) : les longueurs utiles sont directement a et b
+                tables["lf"][a, b] = cm._choose_cushion_size_auto(
+                    {"F0": (0, 0), "Bx": (a, 0), "By": (0, b + depth)}, a, b + depth)
+                tables["l"][a, b] = cm._choose_cushion_size_auto_L(
+                    {"F0": (0, 0), "Bx": (a, 0), "By": (0, b)})
+    finally:
+        TABLES = saved
+
+    np.save(path, flat)
+    TABLES = load(path)
+    return path
+
+
+TABLES = load()
+
+
+if __name__ == "__main__":
+    print(f"Tables écrites : {build()}")
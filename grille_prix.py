@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Grille de prix précalculée (longueurs 100..600 cm par pas de 10, profondeurs
+50..120 par pas de 5, épaisseurs 15..35 par pas de 5, 4 mousses)
+
+Dans un devis estimé, seul le couple mousse + tissu d'une banquette demande un
+vrai calcul (volume × coefficient, palier de largeur de tissu) ; supports,
+coussins et accessoires sont des prix unitaires du catalogue. On tabule une
+fois pour toutes calculer_prix_mousse_tissu_ttc / _ht sur la grille de l'app,
+et pricing.calculer_prix_grille n'a plus qu'à lire et additionner, dans le
+même ordre que calculer_prix_total (résultats identiques au centime près,
+bit à bit).
+
+Régénération (après modification des coefficients mousse ou du tissu) :
+    python grille_prix.py
+
+Le fichier est projeté en mémoire (mmap) à l'import : plusieurs processus
+partagent la même copie via le cache de pages. Absent, illisible, calculé
+pour d'autres coefficients que ceux de la version de tarif demandée ou avec
+d'autres formules (source de calculer_prix_mousse_tissu_ttc / _ht modifiée
+sans régénérer), ou NumPy indisponible : lecture() renvoie None et
+l'appelant retombe sur le calcul direct.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # calcul direct uniquement
+    np = None
+
+# ============================================================================
+# FORMAT
+# ============================================================================
+
+TABLE_VERSION = 1
+LONGUEURS = (100, 600, 10)
+PROFONDEURS = (50, 120, 5)
+EPAISSEURS = (15, 35, 5)
+MOUSSES = ("D25", "D30", "HR35", "HR45")
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grille_prix.npy")
+
+_AXES = (LONGUEURS, PROFONDEURS, EPAISSEURS)
+_INDICE_MOUSSE = {m: i for i, m in enumerate(MOUSSES)}
+_FORME = tuple((fin - debut) // pas + 1 for debut, fin, pas in _AXES) + (len(MOUSSES), 2)
+
+# Un seul tableau float64 à plat :
+#   [version, empreinte des coefficients, bornes et pas des trois axes (9)]
+#   valeurs : (longueur, profondeur, épaisseur, mousse, {0: TTC, 1: coût HT})
+_HEADER = 2 + 3 * len(_AXES)
+
+TABLES = None
+_EMPREINTES = {}  # id(version du catalogue) -> (version, empreinte) ; la référence garde l'id valide
+
+
+@lru_cache(maxsize=None)
+def _formules():
+    """Source des fonctions tabulées (bytecode si la source est indisponible)"""
+    import pricing
+    sources = []
+    for fonction in (pricing.calculer_prix_mousse_tissu_ttc, pricing.calculer_cout_mousse_tissu_ht):
+        try:
+            sources.append(inspect.getsource(fonction))
+        except OSError:
+            sources.append(fonction.__code__.co_code.hex())
+    return sources
+
+
+def _empreinte(version):
+    """Empreinte (48 bits, exacte en float64) des tarifs et des formules utilisés par la grille"""
+    entree = _EMPREINTES.get(id(version))
+    if entree is None or entree[0] is not version:
+        utiles = {k: version[k] for k in ("coef_mousse_ttc", "coef_mousse_cout_ht", "tissu")}
+        utiles["formules"] = _formules()
+        texte = json.dumps(utiles, sort_keys=True, default=str)
+        entree = (version, int(hashlib.sha1(texte.encode("utf-8")).hexdigest()[:12], 16))
+        _EMPREINTES[id(version)] = entree
+    return entree[1]
+
+
+def _entete(empreinte):
+    return [TABLE_VERSION, empreinte] + [v for axe in _AXES for v in axe]
+
+
+def load(path=TABLE_PATH):
+    """Projette le fichier en mémoire ; None si absent ou incompatible."""
+    if np is None or not os.path.exists(path):
+        return None
+    try:
+        flat = np.asarray(np.load(path, mmap_mode="r"))
+        if flat.dtype != np.float64 or flat.ndim != 1 or len(flat) != _HEADER + int(np.prod(_FORME)):
+            return None
+        if [int(v) for v in flat[2:_HEADER]] != _entete(0)[2:] or int(flat[0]) != TABLE_VERSION:
+            return None
+    except (OSError, ValueError):
+        return None
+    return {"empreinte": int(flat[1]), "valeurs": flat[_HEADER:].reshape(_FORME)}
+
+
+# ============================================================================
+# LECTURES
+# ============================================================================
+
+def _indice(valeur, axe):
+    """Indice sur un axe (début, fin, pas) pour une valeur entière de la grille, sinon None."""
+    debut, fin, pas = axe
+    if isinstance(valeur, float):
+        if not valeur.is_integer():
+            return None
+        valeur = int(valeur)
+    elif type(valeur) is not int:
+        return None
+    if not debut <= valeur <= fin or (valeur - debut) % pas:
+        return None
+    return (valeur - debut) // pas
+
+
+def lecture(version, profondeur, epaisseur, type_mousse):
+    """
+    Lecteur longueur -> (prix TTC, coût HT) mousse + tissu d'une banquette,
+    pour une version de tarif, une profondeur, une épaisseur et une mousse ;
+    None si hors grille ou grille calculée pour d'autres coefficients.
+    Le lecteur renvoie lui-même None pour une longueur hors grille.
+    """
+    tables = TABLES
+    if tables is None or tables["empreinte"] != _empreinte(version):
+        return None
+    j = _indice(profondeur, PROFONDEURS)
+    k = _indice(epaisseur, EPAISSEURS)
+    m = _INDICE_MOUSSE.get(type_mousse)
+    if j is None or k is None or m is None:
+        return None
+    valeurs = tables["valeurs"]
+
+    def lire(longueur):
+        i = _indice(longueur, LONGUEURS)
+        if i is None:
+            return None
+        return valeurs.item(i, j, k, m, 0), valeurs.item(i, j, k, m, 1)
+    return lire
+
+
+# ============================================================================
+# CONSTRUCTION
+# ============================================================================
+
+def build(path=TABLE_PATH, date_devis=None):
+    """Tabule les fonctions de pricing elles-mêmes (version de tarif en vigueur) et écrit le fichier."""
+    global TABLES
+    import catalogue_prix
+    import pricing
+
+    cat = catalogue_prix.en_vigueur(date_devis)
+    flat = np.zeros(_HEADER + int(np.prod(_FORME)), dtype=np.float64)
+    flat[:_HEADER] = _entete(_empreinte(cat))
+    valeurs = flat[_HEADER:].reshape(_FORME)
+    for i, longueur in enumerate(range(LONGUEURS[0], LONGUEURS[1] + 1, LONGUEURS[2])):
+        for j, profondeur in enumerate(range(PROFONDEURS[0], PROFONDEURS[1] + 1, PROFONDEURS[2])):
+            for k, epaisseur in enumerate(range(EPAISSEURS[0], EPAISSEURS[1] + 1, EPAISSEURS[2])):
+                for m, mousse in enumerate(MOUSSES):
+                    valeurs[i, j, k, m] = (
+                        pricing.calculer_prix_mousse_tissu_ttc(longueur, profondeur, epaisseur, mousse, cat),
+                        pricing.calculer_cout_mousse_tissu_ht(longueur, profondeur, epaisseur, mousse, cat))
+
+    np.save(path, flat)
+    TABLES = load(path)
+    return path
+
+
+TABLES = load()
+
+
+if __name__ == "__main__":
+    print(f"Grille écrite : {build()}")
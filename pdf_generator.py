@@ -1,25 +1,41 @@
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Frame, Flowable, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus.doctemplate import LayoutError
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from io import BytesIO
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.utils import ImageReader
+from PIL import Image as PILImage
+from canapematplot import DisplayList, display_list_to_screen
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+import copy
 import os
+import re
+import threading
+import unicodedata
+import zipfile
+
+# Flux compressés écrits en binaire : l'encodage ASCII85 (en Python pur sans
+# l'extension rl_accel) coûtait plus que tout le reste du devis
+rl_config.useA85 = 0
 
 # --- POLICE UNICODE ---
 FONT_NAME_UNICODE = 'DejaVuSans'
 FONT_FILE = 'DejaVuSans.ttf'
-
-if os.path.exists(FONT_FILE):
-    pdfmetrics.registerFont(TTFont(FONT_NAME_UNICODE, FONT_FILE))
-    BASE_FONT = FONT_NAME_UNICODE
-else:
-    BASE_FONT = 'Helvetica'
-    print(f"ATTENTION : Le fichier de police {FONT_FILE} est introuvable.")
-# ----------------------
+# Variantes utilisées par <b> / <i> ; absentes, la police normale les remplace
+FONT_VARIANTES = {
+    'bold': ('DejaVuSans-Bold', 'DejaVuSans-Bold.ttf'),
+    'italic': ('DejaVuSans-Oblique', 'DejaVuSans-Oblique.ttf'),
+    'boldItalic': ('DejaVuSans-BoldOblique', 'DejaVuSans-BoldOblique.ttf'),
+}
 
 # --- MAPPING DES IMAGES ---
 IMAGE_FILES = {
@@ -28,128 +44,467 @@ IMAGE_FILES = {
     'HR35': 'HR35.png',
     'HR45': 'HR45.png'
 }
+TAILLE_IMAGE_MOUSSE = 2.5*cm
+# Résolution maximale gardée pour les images de mousse (impression 300 dpi)
+PIXELS_IMAGE_MOUSSE = round(TAILLE_IMAGE_MOUSSE / 72 * 300)
+
+# --- MISE EN PAGE (marges de l'ancien SimpleDocTemplate) ---
+MARGE = 1*cm
+MARGE_BAS = 6*cm
+LARGEUR_UTILE = A4[0] - 2*MARGE
+PIED_Y = 1.5*cm
+VILLE_Y = 0.5*cm
+FORME_PIED = 'PiedDevis'
+
+DESCRIPTIONS_MOUSSE = {
+    'D25': "La mousse D25 est une mousse polyuréthane de 25kg/m3. Elle est très ferme, parfaite pour les habitués des banquettes marocaines classiques.",
+    'D30': "La mousse D30 est une mousse polyuréthane de 30kg/m3. Elle est ultra ferme, idéale pour ceux qui recherchent un canapé très ferme.",
+    'HR35': "La mousse HR35 est une mousse haute résilience de 35kg/m3. Elle est semi ferme confortable, parfaite pour les adeptes des salons confortables.<br/>Les mousses haute résilience reprennent rapidement leur forme initiale et donc limitent l’affaissement dans le temps.",
+    'HR45': "La mousse HR45 est une mousse haute résilience de 45kg/m3. Elle est ferme confortable, parfaite pour les adeptes des salons confortables mais pas trop moelleux.<br/>Les mousses haute résilience reprennent rapidement leur forme initiale et donc limitent l’affaissement dans le temps."
+}
+
+INCLUS_ITEMS = [
+    "Livraison bas d'immeuble",
+    "Fabrication 100% artisanale France",
+    "Choix du tissu n'impacte pas le devis",
+    "Paiement 2 à 6 fois sans frais",
+    "Livraison 5 à 7 semaines",
+    "Housses déhoussables"
+]
+
+COTATIONS_FIXES = [
+    "Accoudoir: 15cm large / 60cm haut",
+    "Dossier: 10cm large / 70cm haut",
+    "Coussins: 65/80/90cm large",
+]
+
 
+# ============================================================================
+# RESSOURCES (polices et images de mousse, chargées au premier usage)
+# ============================================================================
 
-def generer_pdf_devis(config, prix_details, schema_image=None):
+@lru_cache(maxsize=None)
+def _polices():
     """
-    Génère un PDF de devis (1 page) avec un pied de page fixe en bas et des images de mousse.
+    Noms des polices du devis {normal, bold, italic, boldItalic}, enregistrées
+    au premier PDF : DejaVuSans si le fichier est présent, sinon Helvetica.
+    """
+    if not os.path.exists(FONT_FILE):
+        print(f"ATTENTION : Le fichier de police {FONT_FILE} est introuvable.")
+        return {'normal': 'Helvetica', 'bold': 'Helvetica-Bold',
+                'italic': 'Helvetica-Oblique', 'boldItalic': 'Helvetica-BoldOblique'}
+
+    pdfmetrics.registerFont(TTFont(FONT_NAME_UNICODE, FONT_FILE))
+    polices = {'normal': FONT_NAME_UNICODE}
+    for variante, (nom, fichier) in FONT_VARIANTES.items():
+        if os.path.exists(fichier):
+            pdfmetrics.registerFont(TTFont(nom, fichier))
+            polices[variante] = nom
+        else:
+            polices[variante] = FONT_NAME_UNICODE
+    pdfmetrics.registerFontFamily(FONT_NAME_UNICODE, **polices)
+    return polices
+
+
+@lru_cache(maxsize=None)
+def _image_mousse(mousse_type):
+    """
+    Image d'une mousse décodée une fois (ImageReader réduit à
+    PIXELS_IMAGE_MOUSSE) ; None si pas d'image ou fichier illisible.
+    Le même objet est dessiné par tous les devis : dans un document,
+    son XObject n'est intégré qu'une fois.
+    """
+    image_path = IMAGE_FILES.get(mousse_type)
+    if not image_path:
+        return None
+    try:
+        with PILImage.open(image_path) as source:
+            im = source.copy()
+        im.thumbnail((PIXELS_IMAGE_MOUSSE, PIXELS_IMAGE_MOUSSE))
+        reader = ImageReader(im)
+        reader.getRGBData()  # décodage (et masque alpha) fait ici, une fois
+    except (OSError, ValueError) as e:
+        print(f"ATTENTION : image de mousse {image_path} illisible ({e}).")
+        return None
+    return reader
+
+
+class _ImageMousse(Flowable):
+    """Image de mousse (ImageReader partagé) dessinée en TAILLE_IMAGE_MOUSSE × TAILLE_IMAGE_MOUSSE"""
+
+    def __init__(self, reader):
+        Flowable.__init__(self)
+        self.reader = reader
+        self.width = self.height = TAILLE_IMAGE_MOUSSE
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask='auto')
+
+
+# ============================================================================
+# SCHÉMA VECTORIEL (DisplayList de canapematplot dessinée sur le canvas)
+# ============================================================================
+
+# Repère turtle de canapematplot : 100 px par pouce, soit 1 pt = 100/72 px
+_PT_TO_PX = 100.0 / 72.0
+# Marge autour du schéma, en px (pad_inches=0.1 du PNG)
+MARGE_SCHEMA_PX = 10
+
+
+def _couleur(c):
+    """Couleur turtle / Matplotlib -> couleur ReportLab ; None pour "none" ou vide"""
+    if c is None or c == "" or c == "none":
+        return None
+    if isinstance(c, (tuple, list)):
+        rgb = [float(v) for v in c[:3]]
+        return colors.Color(*(v / 255.0 if max(rgb) > 1.0 else v for v in rgb))
+    try:
+        return colors.toColor(c)
+    except ValueError:
+        return colors.black
+
+
+class _EcranPdf:
+    """
+    Écran turtle qui enregistre les primitives pour un canvas ReportLab
+    (même interface et même rendu que canapematplot._SvgScreen) : repère
+    turtle en px centré sur (0,0), y vers le haut comme le PDF ; épaisseurs
+    et tailles de police en pt convertis en px. Ordre de peinture :
+    remplissages, puis traits, puis textes.
+    """
+
+    def __init__(self):
+        self.width = self.height = None
+        self.window_title = None
+        self._fills = []
+        self._polylines = []   # [couleur, épaisseur, [(x, y), ...]]
+        self._texts = []
+        self._boite = [float('inf'), float('inf'), float('-inf'), float('-inf')]
+
+    def _etendre(self, x0, y0, x1, y1):
+        b = self._boite
+        b[0], b[1], b[2], b[3] = min(b[0], x0), min(b[1], y0), max(b[2], x1), max(b[3], y1)
+
+    def setup(self, width, height):
+        self.width, self.height = float(width), float(height)
+
+    def title(self, text):
+        self.window_title = str(text)
+
+    def tracer(self, flag):
+        pass
+
+    # --- Primitives appelées par la tortue ---
+    def add_segment(self, x0, y0, x1, y1, color, width):
+        m = width * _PT_TO_PX / 2
+        self._etendre(min(x0, x1) - m, min(y0, y1) - m, max(x0, x1) + m, max(y0, y1) + m)
+        # Segments consécutifs de même style fusionnés en une polyline
+        if self._polylines:
+            last = self._polylines[-1]
+            if last[0] == color and last[1] == width and last[2][-1] == (x0, y0):
+                last[2].append((x1, y1))
+                return
+        self._polylines.append([color, width, [(x0, y0), (x1, y1)]])
+
+    def add_fill(self, path, facecolor, edgecolor, width):
+        xs, ys = [x for x, _ in path], [y for _, y in path]
+        self._etendre(min(xs), min(ys), max(xs), max(ys))
+        self._fills.append(('polygon', list(path), facecolor, edgecolor, width))
+
+    def add_rounded_rect(self, x0, y0, x1, y1, r, facecolor, edgecolor, width):
+        self._etendre(x0, y0, x1, y1)
+        self._fills.append(('rect', (x0, y0, x1, y1, r), facecolor, edgecolor, width))
+
+    def add_text(self, x, y, text, ha="left", va="center", fontfamily=None,
+                 fontsize=10, fontweight=None, fontstyle=None, **_kwargs):
+        polices = _polices()
+        gras = bool(fontweight and fontweight != "normal")
+        italique = bool(fontstyle and fontstyle != "normal")
+        police = polices[{(False, False): 'normal', (True, False): 'bold',
+                          (False, True): 'italic', (True, True): 'boldItalic'}[gras, italique]]
+        taille = float(fontsize) * _PT_TO_PX
+        lignes = str(text).split("\n")
+        largeur = max(pdfmetrics.stringWidth(l, police, taille) for l in lignes)
+        x0 = {"left": x, "center": x - largeur / 2, "right": x - largeur}.get(ha, x)
+        demi = 1.2 * taille * len(lignes) / 2
+        self._etendre(x0, y - demi, x0 + largeur, y + demi)
+        self._texts.append((x, y, lignes, ha, police, taille))
+
+    def flush(self):
+        if self.window_title:
+            # Titre centré au-dessus du dessin (hors de la scène, comme le PNG) :
+            # en haut de la scène il chevauche la légende une fois recadré
+            y = max(self._boite[3], -self.height / 2) + MARGE_SCHEMA_PX + 6 * _PT_TO_PX
+            self.add_text(0.0, y, self.window_title, ha="center", fontsize=12)
+
+    def show(self):
+        pass
+
+    # --- Dessin ---
+    def boite(self):
+        """(x0, y0, x1, y1) du dessin en px, marge comprise"""
+        x0, y0, x1, y1 = self._boite
+        if x0 > x1:  # rien de dessiné
+            x0 = y0 = x1 = y1 = 0.0
+        m = MARGE_SCHEMA_PX
+        return x0 - m, y0 - m, x1 + m, y1 + m
+
+    def dessiner(self, canvas):
+        canvas.setLineJoin(1)
+        for forme, geometrie, facecolor, edgecolor, width in self._fills:
+            fond, trait = _couleur(facecolor), _couleur(edgecolor)
+            if fond is not None:
+                canvas.setFillColor(fond)
+            if trait is not None:
+                canvas.setStrokeColor(trait)
+                canvas.setLineWidth(width * _PT_TO_PX)
+            if forme == 'rect':
+                x0, y0, x1, y1, r = geometrie
+                canvas.roundRect(x0, y0, x1 - x0, y1 - y0, r,
+                                 stroke=trait is not None, fill=fond is not None)
+            else:
+                chemin = canvas.beginPath()
+                chemin.moveTo(*geometrie[0])
+                for x, y in geometrie[1:]:
+                    chemin.lineTo(x, y)
+                chemin.close()
+                canvas.drawPath(chemin, stroke=trait is not None, fill=fond is not None)
+
+        canvas.setLineCap(2)
+        for color, width, pts in self._polylines:
+            trait = _couleur(color)
+            if trait is None:
+                continue
+            canvas.setStrokeColor(trait)
+            canvas.setLineWidth(width * _PT_TO_PX)
+            chemin = canvas.beginPath()
+            chemin.moveTo(*pts[0])
+            for x, y in pts[1:]:
+                chemin.lineTo(x, y)
+            canvas.drawPath(chemin, stroke=1, fill=0)
+
+        canvas.setFillColor(colors.black)
+        for x, y, lignes, ha, police, taille in self._texts:
+            canvas.setFont(police, taille)
+            ascent, descent = pdfmetrics.getAscentDescent(police, taille)
+            # Bloc centré verticalement sur y, interligne 1.2 comme Matplotlib
+            pas = 1.2 * taille
+            haut = y + pas * (len(lignes) - 1) / 2
+            for i, ligne in enumerate(lignes):
+                base = haut - i * pas - (ascent + descent) / 2
+                if ha == "center":
+                    canvas.drawCentredString(x, base, ligne)
+                elif ha == "right":
+                    canvas.drawRightString(x, base, ligne)
+                else:
+                    canvas.drawString(x, base, ligne)
+
+
+class SchemaVectoriel(Flowable):
+    """
+    Schéma du canapé (DisplayList de canapematplot) dessiné en vectoriel :
+    polygones, coussins arrondis, libellés, flèches et légende, sans rendu
+    raster. Ajusté (rapport conservé) dans largeur_max × hauteur_max.
+    """
+
+    def __init__(self, dl, largeur_max=18*cm, hauteur_max=10*cm):
+        Flowable.__init__(self)
+        self.ecran = display_list_to_screen(dl, _EcranPdf())
+        x0, y0, x1, y1 = self.ecran.boite()
+        self.origine = (x0, y0)
+        self.echelle = min(largeur_max / (x1 - x0), hauteur_max / (y1 - y0))
+        self.width = (x1 - x0) * self.echelle
+        self.height = (y1 - y0) * self.echelle
+        self.hAlign = 'CENTER'
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canvas = self.canv
+        canvas.saveState()
+        canvas.scale(self.echelle, self.echelle)
+        canvas.translate(-self.origine[0], -self.origine[1])
+        self.ecran.dessiner(canvas)
+        canvas.restoreState()
+
+
+# ============================================================================
+# GABARIT (parties invariantes, composées une fois par processus)
+# ============================================================================
+
+class _Emplacement(Flowable):
+    """Réserve dans le pied de page la place d'une ligne dynamique et mémorise où elle tombe"""
+
+    def __init__(self, hauteur):
+        Flowable.__init__(self)
+        self.hauteur = hauteur
+        self.position = None
+
+    def wrap(self, availWidth, availHeight):
+        self.width = availWidth
+        return availWidth, self.hauteur
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.position = (x, y)  # relatif à l'origine du tableau
+
+
+class _ParagrapheFige(Paragraph):
+    """Paragraphe invariant : coupure des lignes calculée une fois par largeur, puis réutilisée"""
+
+    def wrap(self, availWidth, availHeight):
+        if getattr(self, '_largeur_coupee', None) != availWidth:
+            Paragraph.wrap(self, availWidth, availHeight)
+            self._largeur_coupee = availWidth
+        return self.width, self.height
+
+
+@lru_cache(maxsize=None)
+def _gabarit():
+    """
+    Styles et flowables invariants du devis, construits au premier PDF :
+      - styles : les ParagraphStyle du document ;
+      - titre, trait : paragraphes fixes (copiés à chaque devis) ;
+      - pied : tableau du pied de page, les deux cotations dépendant du devis
+        (profondeur, hauteur d'assise) remplacées par des emplacements ;
+      - ville : ligne « FRÉVENT 62270 ».
+    Le pied est dessiné une fois par document dans une forme (XObject),
+    réutilisable sur chaque page ; seules les deux cotations variables sont
+    mises en page à chaque devis.
     """
-    buffer = BytesIO()
-    
-    doc = SimpleDocTemplate(buffer, pagesize=A4,
-                           rightMargin=1*cm, leftMargin=1*cm,
-                           topMargin=1*cm, bottomMargin=6*cm)
-    
-    elements = []
     styles = getSampleStyleSheet()
-    
+    polices = _polices()
+
     # --- DÉFINITION DES STYLES ---
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Heading1'], fontSize=14, textColor=colors.black, 
-        spaceAfter=5, alignment=TA_CENTER, fontName=BASE_FONT + '-Bold'
+    s = {}
+    s['title'] = ParagraphStyle(
+        'CustomTitle', parent=styles['Heading1'], fontSize=14, textColor=colors.black,
+        spaceAfter=5, alignment=TA_CENTER, fontName=polices['bold']
     )
-    
-    header_info_style = ParagraphStyle(
-        'HeaderInfo', parent=styles['Normal'], fontSize=12, leading=14, 
-        textColor=colors.black, alignment=TA_CENTER, fontName=BASE_FONT
+    s['header_info'] = ParagraphStyle(
+        'HeaderInfo', parent=styles['Normal'], fontSize=12, leading=14,
+        textColor=colors.black, alignment=TA_CENTER, fontName=polices['normal']
     )
-    
-    price_style = ParagraphStyle(
-        'PriceStyle', parent=styles['Heading2'], fontSize=16, alignment=TA_CENTER, 
-        fontName=BASE_FONT, textColor=colors.black, spaceBefore=10, spaceAfter=10
+    s['price'] = ParagraphStyle(
+        'PriceStyle', parent=styles['Heading2'], fontSize=16, alignment=TA_CENTER,
+        fontName=polices['normal'], textColor=colors.black, spaceBefore=10, spaceAfter=10
     )
-    
     # Style de description de mousse
-    description_mousse_style = ParagraphStyle(
-        'MousseDesc', parent=styles['Normal'], fontSize=12, leading=12, 
-        textColor=colors.black, alignment=TA_LEFT, fontName=BASE_FONT
+    s['description_mousse'] = ParagraphStyle(
+        'MousseDesc', parent=styles['Normal'], fontSize=12, leading=12,
+        textColor=colors.black, alignment=TA_LEFT, fontName=polices['normal']
     )
-    
     # Styles pour le pied de page
-    column_header_style = ParagraphStyle(
-        'ColumnHeaderStyle', parent=styles['Normal'], fontSize=12, alignment=TA_LEFT, 
-        fontName=BASE_FONT + '-Bold', spaceAfter=10
+    s['column_header'] = ParagraphStyle(
+        'ColumnHeaderStyle', parent=styles['Normal'], fontSize=12, alignment=TA_LEFT,
+        fontName=polices['bold'], spaceAfter=10
     )
-
-    detail_style = ParagraphStyle(
-        'DetailStyle', parent=styles['Normal'], fontSize=12, leading=12, 
-        textColor=colors.black, alignment=TA_LEFT, fontName=BASE_FONT
+    s['detail'] = ParagraphStyle(
+        'DetailStyle', parent=styles['Normal'], fontSize=12, leading=12,
+        textColor=colors.black, alignment=TA_LEFT, fontName=polices['normal']
     )
-    
-    footer_style = ParagraphStyle(
-        'FooterStyle', parent=styles['Normal'], fontSize=12, textColor=colors.black, 
-        alignment=TA_CENTER, spaceBefore=10, fontName=BASE_FONT
+    s['footer'] = ParagraphStyle(
+        'FooterStyle', parent=styles['Normal'], fontSize=12, textColor=colors.black,
+        alignment=TA_CENTER, spaceBefore=10, fontName=polices['normal']
     )
+    s['normal'] = styles['Normal']
 
-    # --- FONCTION INTERNE POUR DESSINER LE PIED DE PAGE FIXE ---
-    def draw_footer(canvas, doc):
-        canvas.saveState()
-        
-        # 1. Préparation des données des colonnes
-        
-        # Colonne Gauche
-        col_gauche = []
-        col_gauche.append(Paragraph("Il faut savoir que le tarif comprend :", column_header_style))
-        inclus_items = [
-            "Livraison bas d'immeuble",
-            "Fabrication 100% artisanale France",
-            "Choix du tissu n'impacte pas le devis",
-            "Paiement 2 à 6 fois sans frais",
-            "Livraison 5 à 7 semaines",
-            "Housses déhoussables"
-        ]
-        for item in inclus_items:
-            col_gauche.append(Paragraph(f"• {item}", detail_style))
-
-        # Colonne Droite
-        col_droite = []
-        col_droite.append(Paragraph("Détail des cotations :", column_header_style))
-        
-        h_mousse = config['options'].get('epaisseur', 25)
-        h_assise = 46 if h_mousse > 20 else 40
-        
-        cotations_items = [
-            "Accoudoir: 15cm large / 60cm haut",
-            "Dossier: 10cm large / 70cm haut",
-            "Coussins: 65/80/90cm large",
-            f"Profondeur assise: {config['dimensions']['profondeur']} cm",
-            f"Hauteur assise: {h_assise} cm (Mousse {h_mousse}cm)"
-        ]
-        for item in cotations_items:
-            col_droite.append(Paragraph(f"• {item}", detail_style))
-
-        table_footer = Table([[col_gauche, col_droite]], colWidths=[9.5*cm, 9.5*cm])
-        table_footer.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-        ]))
-        
-        w, h = table_footer.wrap(doc.width, doc.bottomMargin)
-        table_footer.drawOn(canvas, doc.leftMargin, 1.5*cm)
-        
-        # 2. Ville (ex-Partie 6)
-        p_ville = Paragraph("FRÉVENT 62270", footer_style)
-        w_ville, h_ville = p_ville.wrap(doc.width, doc.bottomMargin)
-        p_ville.drawOn(canvas, doc.leftMargin, 0.5*cm)
-        
-        canvas.restoreState()
+    # Colonne Gauche
+    col_gauche = [_ParagrapheFige("Il faut savoir que le tarif comprend :", s['column_header'])]
+    col_gauche += [_ParagrapheFige(f"• {item}", s['detail']) for item in INCLUS_ITEMS]
+
+    # Colonne Droite : une ligne de cotation (style detail) par emplacement
+    emplacements = [_Emplacement(s['detail'].leading) for _ in range(2)]
+    col_droite = [_ParagrapheFige("Détail des cotations :", s['column_header'])]
+    col_droite += [_ParagrapheFige(f"• {item}", s['detail']) for item in COTATIONS_FIXES]
+    col_droite += emplacements
+
+    pied = Table([[col_gauche, col_droite]], colWidths=[9.5*cm, 9.5*cm])
+    pied.setStyle(TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 0),
+    ]))
+    pied.wrap(LARGEUR_UTILE, MARGE_BAS)
+
+    ville = _ParagrapheFige("FRÉVENT 62270", s['footer'])
+    ville.wrap(LARGEUR_UTILE, MARGE_BAS)
+
+    return {
+        'styles': s,
+        'titre': _ParagrapheFige("MON CANAPÉ MAROCAIN", s['title']),
+        'trait': _ParagrapheFige("<hr width='100%' color='black'/>", s['normal']),
+        'pied': pied,
+        'ville': ville,
+        'emplacements': emplacements,
+        'largeur_cotation': 9.5*cm,
+    }
+
+
+@lru_cache(maxsize=None)
+def _paragraphe_mousse(mousse_type):
+    """Description (italique) d'une mousse, analysée une fois ; copiée à chaque devis"""
+    texte_mousse = DESCRIPTIONS_MOUSSE.get(mousse_type, DESCRIPTIONS_MOUSSE['HR35'])
+    return _ParagrapheFige(f"<i>{texte_mousse}</i>", _gabarit()['styles']['description_mousse'])
+
+
+# Les flowables du gabarit sont partagés entre sessions (threads Streamlit) :
+# leur dessin (drawOn mémorise le canvas courant) est fait sous verrou
+_VERROU_PIED = threading.Lock()
+
+
+def _dessiner_pied(canvas, config):
+    """Pied de page fixe : forme partagée + cotations profondeur / hauteur d'assise"""
+    gabarit = _gabarit()
+    canvas.saveState()
+
+    if not canvas.hasForm(FORME_PIED):
+        with _VERROU_PIED:
+            canvas.beginForm(FORME_PIED)
+            gabarit['pied'].drawOn(canvas, MARGE, PIED_Y)
+            gabarit['ville'].drawOn(canvas, MARGE, VILLE_Y)
+            canvas.endForm()
+    canvas.doForm(FORME_PIED)
+
+    h_mousse = config['options'].get('epaisseur', 25)
+    h_assise = 46 if h_mousse > 20 else 40
+    cotations = [
+        f"Profondeur assise: {config['dimensions']['profondeur']} cm",
+        f"Hauteur assise: {h_assise} cm (Mousse {h_mousse}cm)"
+    ]
+    for emplacement, item in zip(gabarit['emplacements'], cotations):
+        x, y = emplacement.position
+        p = Paragraph(f"• {item}", gabarit['styles']['detail'])
+        p.wrapOn(canvas, gabarit['largeur_cotation'], MARGE_BAS)
+        p.drawOn(canvas, MARGE + x, PIED_Y + y)
+
+    canvas.restoreState()
+
+
+def _elements_devis(config, prix_details, schema_image=None):
+    """Flowables de la partie haute d'un devis (titre, infos, mousse, schéma, prix)"""
+    gabarit = _gabarit()
+    styles = gabarit['styles']
+    elements = []
 
     # =================== CONTENU DU DOCUMENT ===================
-    
+
     # 1. TITRE et INFOS HAUTES
-    elements.append(Paragraph("MON CANAPÉ MAROCAIN", title_style))
-    
+    elements.append(copy.copy(gabarit['titre']))
+
     type_canape = config['type_canape']
     dims = config['dimensions']
-    
+
     if "U" in type_canape:
         dim_str = f"{dims.get('ty',0)} x {dims.get('tx',0)} x {dims.get('tz',0)}"
     elif "L" in type_canape:
         dim_str = f"{dims.get('ty',0)} x {dims.get('tx',0)}"
     else:
         dim_str = f"{dims.get('tx',0)} x {dims.get('profondeur',0)}"
-        
+
     mousse_type = config['options'].get('type_mousse', 'HR35')
     dossier_txt = 'Avec' if config['options'].get('dossier_bas') else 'Sans'
     acc_txt = 'Oui' if (config['options'].get('acc_left') or config['options'].get('acc_right')) else 'Non'
@@ -160,62 +515,57 @@ def generer_pdf_devis(config, prix_details, schema_image=None):
         f"<b>Dossiers:</b> {dossier_txt}",
         f"<b>Accoudoirs:</b> {acc_txt}"
     ]
-    
+
     client = config['client']
     if client['nom']: lignes_info.append(f"<b>Nom:</b> {client['nom']}")
     if client['email']: lignes_info.append(f"<b>Email:</b> {client['email']}")
-    
-    elements.append(Paragraph("<br/>".join(lignes_info), header_info_style))
-    
+
+    elements.append(Paragraph("<br/>".join(lignes_info), styles['header_info']))
+
     # Description mousse dynamique
-    descriptions_mousse = {
-        'D25': "La mousse D25 est une mousse polyuréthane de 25kg/m3. Elle est très ferme, parfaite pour les habitués des banquettes marocaines classiques.",
-        'D30': "La mousse D30 est une mousse polyuréthane de 30kg/m3. Elle est ultra ferme, idéale pour ceux qui recherchent un canapé très ferme.",
-        'HR35': "La mousse HR35 est une mousse haute résilience de 35kg/m3. Elle est semi ferme confortable, parfaite pour les adeptes des salons confortables.<br/>Les mousses haute résilience reprennent rapidement leur forme initiale et donc limitent l’affaissement dans le temps.",
-        'HR45': "La mousse HR45 est une mousse haute résilience de 45kg/m3. Elle est ferme confortable, parfaite pour les adeptes des salons confortables mais pas trop moelleux.<br/>Les mousses haute résilience reprennent rapidement leur forme initiale et donc limitent l’affaissement dans le temps."
-    }
-    texte_mousse = descriptions_mousse.get(mousse_type, descriptions_mousse['HR35'])
-    
+    text_flowable = copy.copy(_paragraphe_mousse(mousse_type))
+
     elements.append(Spacer(1, 0.2*cm))
-    
+
     # --- MODIFICATION CLÉ : Image et Texte en Tableau ---
-    image_path = IMAGE_FILES.get(mousse_type)
-    
-    if image_path:
-        try:
-            img_mousse = Image(image_path, width=2.5*cm, height=2.5*cm)
-            text_flowable = Paragraph(f"<i>{texte_mousse}</i>", description_mousse_style)
-            
-            # Ajustement des colWidths pour laisser plus de marge
-            # 18cm de largeur totale disponible (A4 - 2x1cm marge)
-            mousse_table = Table([[img_mousse, text_flowable]], colWidths=[3*cm, 14*cm]) 
-            
-            mousse_table.setStyle(TableStyle([
-                # Centrage vertical par rapport à l'image
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'), 
-                # Ajout de padding à gauche et à droite de la table complète pour effet de marge
-                ('LEFTPADDING', (0, 0), (0, 0), 0.5*cm), # Marge à gauche de l'image
-                ('RIGHTPADDING', (0, 0), (-1, -1), 0.5*cm), # Marge à droite du texte
-            ]))
-            elements.append(mousse_table)
-        except Exception:
-            # En cas d'erreur de fichier, afficher le texte seul 
-            elements.append(Paragraph(f"<i>{texte_mousse}</i>", description_mousse_style))
+    # (image absente ou illisible : texte seul)
+    image_mousse = _image_mousse(mousse_type)
+
+    if image_mousse is not None:
+        img_mousse = _ImageMousse(image_mousse)
+
+        # Ajustement des colWidths pour laisser plus de marge
+        # 18cm de largeur totale disponible (A4 - 2x1cm marge)
+        mousse_table = Table([[img_mousse, text_flowable]], colWidths=[3*cm, 14*cm])
+
+        mousse_table.setStyle(TableStyle([
+            # Centrage vertical par rapport à l'image
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            # Ajout de padding à gauche et à droite de la table complète pour effet de marge
+            ('LEFTPADDING', (0, 0), (0, 0), 0.5*cm), # Marge à gauche de l'image
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0.5*cm), # Marge à droite du texte
+        ]))
+        elements.append(mousse_table)
     else:
-        elements.append(Paragraph(f"<i>{texte_mousse}</i>", description_mousse_style))
+        elements.append(text_flowable)
 
     elements.append(Spacer(1, 0.3*cm))
 
-    # 3. SCHÉMA
-    if schema_image:
+    # 3. SCHÉMA (DisplayList : vectoriel ; image PNG : bitmap ajusté)
+    if isinstance(schema_image, DisplayList):
+        try:
+            elements.append(SchemaVectoriel(schema_image, 18*cm, 10*cm))
+        except Exception:
+            elements.append(Paragraph("<i>(Schéma non disponible)</i>", styles['header_info']))
+    elif schema_image:
         try:
             img = Image(schema_image)
             avail_width = 18 * cm
             avail_height = 10 * cm
-            
+
             img_w = img.imageWidth
             img_h = img.imageHeight
-            
+
             if img_w > 0:
                 aspect = img_h / float(img_w)
             else:
@@ -227,20 +577,182 @@ def generer_pdf_devis(config, prix_details, schema_image=None):
             else:
                 img.drawWidth = avail_width
                 img.drawHeight = avail_width * aspect
-            
+
             elements.append(img)
         except Exception:
-            elements.append(Paragraph("<i>(Schéma non disponible)</i>", header_info_style))
+            elements.append(Paragraph("<i>(Schéma non disponible)</i>", styles['header_info']))
 
     elements.append(Spacer(1, 0.5*cm))
 
     # 4. PRIX
     montant_ttc = f"{prix_details['total_ttc']:.2f} €"
-    elements.append(Paragraph(f"PRIX TOTAL TTC : {montant_ttc}", price_style))
-    elements.append(Paragraph("<hr width='100%' color='black'/>", styles['Normal']))
-
-    
-    # GÉNÉRATION AVEC CALLBACK POUR LE FOOTER
-    doc.build(elements, onFirstPage=draw_footer)
-    buffer.seek(0)
-    return buffer
+    elements.append(Paragraph(f"PRIX TOTAL TTC : {montant_ttc}", styles['price']))
+    elements.append(copy.copy(gabarit['trait']))
+
+    return elements
+
+
+def _dessiner_devis(canvas, config, elements):
+    """
+    Dessine un devis à partir de la page courante : cadre aux marges de
+    l'ancien SimpleDocTemplate, pied de page fixe sur sa première page.
+    """
+    _dessiner_pied(canvas, config)
+    while elements:
+        restants = len(elements)
+        frame = Frame(MARGE, MARGE_BAS, LARGEUR_UTILE, A4[1] - MARGE - MARGE_BAS)
+        frame.addFromList(elements, canvas)
+        if len(elements) == restants:
+            raise LayoutError(f"Élément trop grand pour la page : {elements[0].identity()}")
+        canvas.showPage()
+
+
+def _cible(sortie):
+    """
+    Destination d'écriture : BytesIO neuf si sortie est None, sinon le chemin
+    (str / PathLike) ou l'objet binaire muni de write() tel quel (fichier
+    ouvert, socket.makefile('wb'), réponse HTTP envoyée par morceaux).
+    """
+    if sortie is None:
+        return BytesIO()
+    if isinstance(sortie, os.PathLike):
+        return os.fspath(sortie)
+    if not isinstance(sortie, str) and not callable(getattr(sortie, 'write', None)):
+        raise TypeError(f"sortie doit être un chemin ou un objet binaire avec write() : {sortie!r}")
+    return sortie
+
+
+class _SansFlush:
+    """Objet binaire muni de write() seul : zipfile appelle aussi flush(), sans effet ici"""
+
+    def __init__(self, flux):
+        self.write = flux.write
+
+    def flush(self):
+        pass
+
+
+def _resultat(cible, sortie):
+    if sortie is None:
+        cible.seek(0)
+        return cible
+    return sortie
+
+
+def generer_pdf_devis(config, prix_details, schema_image=None, sortie=None):
+    """
+    Génère un PDF de devis (1 page) avec un pied de page fixe en bas et des images de mousse.
+    schema_image : DisplayList de canapematplot (schéma vectoriel, net à
+    toute échelle) ou image PNG (chemin / fichier) ajustée en 18 × 10 cm.
+    sortie : None (BytesIO renvoyé), chemin de fichier ou objet binaire avec
+    write() ; le PDF y est écrit en une fois, sans copie intermédiaire, et
+    sortie est renvoyée.
+    """
+    cible = _cible(sortie)
+    canvas = Canvas(cible, pagesize=A4)
+    _dessiner_devis(canvas, config, _elements_devis(config, prix_details, schema_image))
+    canvas.save()
+    return _resultat(cible, sortie)
+
+
+# ============================================================================
+# LOTS DE DEVIS (régénération en masse, ex. après une mise à jour des tarifs)
+# ============================================================================
+
+TAILLE_LOT_PDF = 50
+
+
+def _schema_portable(schema):
+    """Schéma transmissible à un processus du pool et relisible : DisplayList, octets, chemin ou None"""
+    if schema is None or isinstance(schema, (DisplayList, bytes, str, os.PathLike)):
+        return schema
+    if hasattr(schema, 'getvalue'):
+        return schema.getvalue()
+    return schema.read()
+
+
+def _source_schema(schema):
+    return BytesIO(schema) if isinstance(schema, (bytes, bytearray)) else schema
+
+
+def _nom_fichier_devis(numero, config):
+    """devis_00001_dupont-jean.pdf : numéro d'ordre dans le lot, nom du client s'il y en a un"""
+    nom = unicodedata.normalize('NFKD', (config.get('client') or {}).get('nom') or '')
+    nom = re.sub(r'[^a-z0-9]+', '-', nom.encode('ascii', 'ignore').decode('ascii').lower()).strip('-')
+    return f"devis_{numero:05d}_{nom}.pdf" if nom else f"devis_{numero:05d}.pdf"
+
+
+def _pdf_lot(lot):
+    """
+    Un PDF par devis d'un lot [(numero, config, prix_details, schema)] ;
+    liste [(nom de fichier, octets)]. Fonction de module : exécutable dans
+    un processus du pool (gabarit, polices et images chargés une fois par
+    processus).
+    """
+    return [(_nom_fichier_devis(numero, config),
+             generer_pdf_devis(config, prix_details, _source_schema(schema)).getvalue())
+            for numero, config, prix_details, schema in lot]
+
+
+def generer_pdf_lot(devis, format_sortie='pdf', processus=None, taille_lot=TAILLE_LOT_PDF, sortie=None):
+    """
+    Génère les PDF d'un lot de devis ; devis : itérable de
+    (config, prix_details, schema), schema : None, DisplayList (vectoriel),
+    octets PNG, chemin ou fichier (BytesIO), parcouru au fil de l'eau :
+      - 'pdf' : un seul PDF, un devis par page. Polices, styles, pied de page
+        (forme) et images de mousse sont partagés par toutes les pages, et
+        chaque image (mousse ou schéma identique) n'y est intégrée qu'une fois.
+        Un document ReportLab s'écrit dans un seul processus et reste en
+        mémoire jusqu'à son écriture : pour de très gros lots, préférer 'zip'.
+      - 'zip' : archive d'un PDF par client (devis_00001_nom.pdf, dans l'ordre
+        du lot), rendus par lots de taille_lot sur un pool de processus
+        (processus : défaut nombre de CPU ; 1 : sans pool). Chaque PDF est
+        écrit dans l'archive dès qu'il est prêt : la mémoire reste bornée
+        par les lots en cours, quel que soit le nombre de devis.
+    sortie : None (BytesIO renvoyé), chemin ou objet binaire avec write(),
+    même non positionnable (socket, réponse HTTP) ; sortie est renvoyée.
+    """
+    if format_sortie not in ('pdf', 'zip'):
+        raise ValueError(f"format_sortie inconnu : {format_sortie!r} ('pdf' ou 'zip')")
+    cible = _cible(sortie)
+
+    if format_sortie == 'pdf':
+        canvas = Canvas(cible, pagesize=A4)
+        for config, prix_details, schema in devis:
+            _dessiner_devis(canvas, config, _elements_devis(config, prix_details, _source_schema(schema)))
+        canvas.save()
+        return _resultat(cible, sortie)
+
+    def lots():
+        lot = []
+        for numero, (config, prix_details, schema) in enumerate(devis, start=1):
+            lot.append((numero, config, prix_details, _schema_portable(schema)))
+            if len(lot) >= taille_lot:
+                yield lot
+                lot = []
+        if lot:
+            yield lot
+
+    processus = processus or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(processus) if processus > 1 else None
+    flux = cible
+    if not isinstance(cible, str) and not callable(getattr(cible, 'flush', None)):
+        flux = _SansFlush(cible)
+    # PDF déjà compressés : archive sans recompression
+    with zipfile.ZipFile(flux, 'w', zipfile.ZIP_STORED) as archive:
+        def _ecrire(fichiers):
+            for nom, donnees in (fichiers.result() if isinstance(fichiers, Future) else fichiers):
+                archive.writestr(nom, donnees)
+        try:
+            # Lots rendus en parallèle, écrits dans l'ordre du lot
+            en_cours = deque()
+            for lot in lots():
+                en_cours.append(_pdf_lot(lot) if pool is None else pool.submit(_pdf_lot, lot))
+                while en_cours and (pool is None or len(en_cours) > 2 * processus):
+                    _ecrire(en_cours.popleft())
+            while en_cours:
+                _ecrire(en_cours.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    return _resultat(cible, sortie)
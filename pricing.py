@@ -4,115 +4,72 @@ Module de pricing adapté pour app.py
 Compatible avec la structure existante + calcul de la vraie marge
 """
 
+import inspect
+
+import numpy as np
+
+import catalogue_prix
+import grille_prix
+
 # ============================================================================
-# CONSTANTES DE PRIX
+# TARIFS
 # ============================================================================
 
-# Prix de vente TTC
-PRIX_TTC = {
-    'coussins': {
-        65: 35,
-        80: 44,
-        90: 48,
-        'valise': 70,
-        'auto': 0  # Calculé selon la taille optimale
-    },
-    'supports': {
-        'banquette': 250,
-        'banquette_angle': 250,
-        'accoudoir': 225,
-        'dossier': 250
-    },
-    'accessoires': {
-        'coussin_deco': 15,
-        'traversin': 30,
-        'surmatelas': 80
-    }
-}
-
-# Coefficients mousse TTC
-COEF_MOUSSE_TTC = {
-    'D25': 16 * 25,
-    'D30': 16 * 30,
-    'HR35': 16 * 37,
-    'HR45': 16 * 47
-}
-
-# Prix tissu TTC
-PRIX_TISSU_PETIT_TTC = 74   # Si largeur + épaisseur*2 <= 140cm
-PRIX_TISSU_GRAND_TTC = 105  # Si largeur + épaisseur*2 > 140cm
-
-# Coûts de revient HT (ce qu'on appelait "marge" avant)
-COUT_REVIENT_HT = {
-    'coussins': {
-        65: 14,
-        80: 17,
-        90: 17.5,
-        'valise': 25
-    },
-    'supports': {
-        'banquette': 113,      # <= 200cm
-        'banquette_long': 121,  # > 200cm
-        'banquette_angle': 104.2,
-        'accoudoir': 73,
-        'dossier': 155.2,      # <= 200cm
-        'dossier_long': 176    # > 200cm
-    },
-    'accessoires': {
-        'coussin_deco': 9.5,
-        'traversin': 11.6,
-        'surmatelas': 31
-    },
-    'arrondis': 6.05
-}
-
-# Coefficients mousse coût HT
-COEF_MOUSSE_COUT_HT = {
-    'D25': 157.5,
-    'D30': 188,
-    'HR35': 192,
-    'HR45': 245
-}
-
-# Prix tissu coût HT
-PRIX_TISSU_PETIT_COUT_HT = 11.2
-PRIX_TISSU_GRAND_COUT_HT = 16.16
-SUPPLEMENT_TISSU_COUT_HT = 15
+# Prix de vente TTC, coûts de revient HT, coefficients mousse et tissu :
+# catalogue versionné catalogue_prix.json (voir catalogue_prix.py). Chaque
+# calcul prend la version en vigueur à la date du devis, une seule fois.
 
 # ============================================================================
 # FONCTIONS DE CALCUL
 # ============================================================================
 
-def calculer_prix_mousse_tissu_ttc(longueur, largeur, epaisseur, type_mousse):
+def calculer_prix_mousse_tissu_ttc(longueur, largeur, epaisseur, type_mousse, catalogue=None):
     """Calcule le prix TTC mousse + tissu pour une banquette"""
+    cat = catalogue or catalogue_prix.en_vigueur()
+    tissu = cat['tissu']
     volume_m3 = (longueur * largeur * epaisseur) / 1000000
-    coef = COEF_MOUSSE_TTC.get(type_mousse, COEF_MOUSSE_TTC['D25'])
+    coef = cat['coef_mousse_ttc'].get(type_mousse, cat['coef_mousse_ttc']['D25'])
     prix_mousse = volume_m3 * coef
     
     condition = largeur + (epaisseur * 2)
     if condition > 140:
-        prix_tissu = (longueur / 100) * PRIX_TISSU_GRAND_TTC
+        prix_tissu = (longueur / 100) * tissu['grand_ttc']
     else:
-        prix_tissu = (longueur / 100) * PRIX_TISSU_PETIT_TTC
+        prix_tissu = (longueur / 100) * tissu['petit_ttc']
     
     return prix_mousse + prix_tissu
 
 
-def calculer_cout_mousse_tissu_ht(longueur, largeur, epaisseur, type_mousse):
+def calculer_cout_mousse_tissu_ht(longueur, largeur, epaisseur, type_mousse, catalogue=None):
     """Calcule le coût de revient HT mousse + tissu pour une banquette"""
+    cat = catalogue or catalogue_prix.en_vigueur()
+    tissu = cat['tissu']
     volume_m3 = (longueur * largeur * epaisseur) / 1000000
-    coef = COEF_MOUSSE_COUT_HT.get(type_mousse, COEF_MOUSSE_COUT_HT['D25'])
+    coef = cat['coef_mousse_cout_ht'].get(type_mousse, cat['coef_mousse_cout_ht']['D25'])
     cout_mousse = volume_m3 * coef
     
     condition = 2 + largeur + (epaisseur * 2)
     if condition <= 140:
-        cout_tissu = ((longueur / 100) * PRIX_TISSU_PETIT_COUT_HT) + SUPPLEMENT_TISSU_COUT_HT
+        cout_tissu = ((longueur / 100) * tissu['petit_cout_ht']) + tissu['supplement_cout_ht']
     else:
-        cout_tissu = ((longueur / 100) * PRIX_TISSU_GRAND_COUT_HT) + SUPPLEMENT_TISSU_COUT_HT
+        cout_tissu = ((longueur / 100) * tissu['grand_cout_ht']) + tissu['supplement_cout_ht']
     
     return cout_mousse + cout_tissu
 
 
+def couts_scission(date_devis=None):
+    """Coûts de revient HT des supports pour la scission optimisée (canapematplot split_costs)"""
+    cat = catalogue_prix.en_vigueur(date_devis)
+    supports = cat['cout_revient_ht']['supports']
+    return {
+        'banquette': supports['banquette'],
+        'banquette_long': supports['banquette_long'],
+        'dossier': supports['dossier'],
+        'dossier_long': supports['dossier_long'],
+        'supplement': cat['tissu']['supplement_cout_ht'],
+    }
+
+
 def estimer_nombre_banquettes(type_canape, tx, ty, tz):
     """Estime le nombre de banquettes selon le type de canapé"""
     if "Simple" in type_canape:
@@ -154,32 +111,8 @@ def estimer_nombre_coussins(type_canape, tx, ty, tz, profondeur, type_coussins):
             return 4, 80  # Valeur par défaut
 
 
-def calculer_prix_total(type_canape, tx, ty, tz, profondeur,
-                       type_coussins, type_mousse, epaisseur,
-                       acc_left, acc_right, acc_bas,
-                       dossier_left, dossier_bas, dossier_right,
-                       nb_coussins_deco, nb_traversins_supp,
-                       has_surmatelas, has_meridienne):
-    """
-    Calcule le prix total TTC et le coût de revient HT
-    Compatible avec la structure de app.py
-    
-    Returns:
-        dict avec tous les détails + la VRAIE marge
-    """
-    
-    details = {}
-    prix_ttc_total = 0
-    cout_revient_ht_total = 0
-    
-    # ========================================================================
-    # BANQUETTES (Mousse + Tissu + Support)
-    # ========================================================================
-    
-    nb_banquettes = estimer_nombre_banquettes(type_canape, tx, ty, tz)
-    
-    # Estimation des dimensions des banquettes
-    banquettes_dims = []
+def _banquettes_estimees(type_canape, tx, ty, tz, profondeur):
+    """(longueur, largeur, est_angle) des banquettes estimées d'après le type de canapé"""
     if "Simple" in type_canape:
         banquettes_dims = [(tx, profondeur)]
     elif "L" in type_canape:
@@ -190,136 +123,253 @@ def calculer_prix_total(type_canape, tx, ty, tz, profondeur,
             (ty if ty else 150, profondeur),
             (tz if tz else 150, profondeur)
         ]
+    else:
+        banquettes_dims = []
+    avec_angle = "Angle" in type_canape or "LF" in type_canape or "U2F" in type_canape
+    return [(longueur, largeur, avec_angle and i > 1)
+            for i, (longueur, largeur) in enumerate(banquettes_dims, 1)]
+
+
+def _longueur_poly(poly):
+    """Plus grande dimension (cm) d'un polygone de la disposition"""
+    xs = [pt[0] for pt in poly]
+    ys = [pt[1] for pt in poly]
+    return max(max(xs) - min(xs), max(ys) - min(ys))
+
+
+def _coussins_valise(type_coussins):
+    """True pour les spécifications valise (valise, p, g, s, p:s, g:s)"""
+    base = str(type_coussins).strip().lower().replace(":s", "")
+    return base in ("valise", "p", "g", "s")
+
+
+def tailles_coussins_layout(layout):
+    """{taille: nombre} des coussins réellement placés, toutes branches confondues"""
+    tailles = {}
+    for branche in layout['coussins']['par_branche'].values():
+        for taille, n in branche['tailles'].items():
+            tailles[taille] = tailles.get(taille, 0) + n
+    return tailles
+
+
+# ============================================================================
+# SECTIONS DU DEVIS
+# ============================================================================
+# Chaque section ne dépend que de ses propres entrées (cf. _SECTIONS) et rend
+#   details : lignes du devis (TTC)
+#   ttc, ht : montants dans l'ordre où ils s'ajoutent aux totaux
+#   infos   : compteurs repris dans le résultat
+# calculer_prix_total les enchaîne ; CanapePricing ne recalcule que celles
+# dont les entrées ont changé.
+
+def _section_banquettes(cat, type_canape, tx, ty, tz, profondeur, type_mousse, epaisseur, layout):
+    """Banquettes : mousse + tissu + support"""
+    if layout is not None:
+        # Banquettes réelles (après scission 250 cm) puis banquettes d'angle
+        banquettes_dims = [(b['longueur'], b['profondeur']) for b in layout['banquettes']]
+        nb_droites = len(banquettes_dims)
+        for poly in layout['angles']:
+            xs = [pt[0] for pt in poly]
+            ys = [pt[1] for pt in poly]
+            cotes = (max(xs) - min(xs), max(ys) - min(ys))
+            banquettes_dims.append((max(cotes), min(cotes)))
+        nb_banquettes = len(banquettes_dims)
+        banquettes = [(longueur, largeur, i > nb_droites)
+                      for i, (longueur, largeur) in enumerate(banquettes_dims, 1)]
+    else:
+        nb_banquettes = estimer_nombre_banquettes(type_canape, tx, ty, tz)
+        banquettes = _banquettes_estimees(type_canape, tx, ty, tz, profondeur)
+    
+    # Prix mousse + tissu TTC, coût mousse + tissu HT
+    mousse_tissu = [(calculer_prix_mousse_tissu_ttc(longueur, largeur, epaisseur, type_mousse, cat),
+                     calculer_cout_mousse_tissu_ht(longueur, largeur, epaisseur, type_mousse, cat))
+                    for longueur, largeur, _ in banquettes]
+    return _chiffrer_banquettes(cat, nb_banquettes, banquettes, mousse_tissu)
+
+
+def _chiffrer_banquettes(cat, nb_banquettes, banquettes, mousse_tissu):
+    """
+    Section banquettes à partir des (prix TTC, coût HT) mousse + tissu de
+    chaque banquette : calculés (_section_banquettes) ou lus dans la grille
+    (calculer_prix_grille) ; les supports s'ajoutent ici.
+    """
+    tarif_ttc = cat['prix_ttc']
+    tarif_ht = cat['cout_revient_ht']
     
     prix_banquettes_ttc = 0
     cout_banquettes_ht = 0
     
-    for i, (longueur, largeur) in enumerate(banquettes_dims, 1):
-        # Prix mousse + tissu TTC
-        prix_mt = calculer_prix_mousse_tissu_ttc(longueur, largeur, epaisseur, type_mousse)
+    for (longueur, _, est_angle), (prix_mt, cout_mt) in zip(banquettes, mousse_tissu):
         prix_banquettes_ttc += prix_mt
-        
-        # Coût mousse + tissu HT
-        cout_mt = calculer_cout_mousse_tissu_ht(longueur, largeur, epaisseur, type_mousse)
         cout_banquettes_ht += cout_mt
         
         # Support
-        est_angle = ("Angle" in type_canape or "LF" in type_canape or "U2F" in type_canape) and i > 1
         if est_angle:
-            prix_banquettes_ttc += PRIX_TTC['supports']['banquette_angle']
-            cout_banquettes_ht += COUT_REVIENT_HT['supports']['banquette_angle']
+            prix_banquettes_ttc += tarif_ttc['supports']['banquette_angle']
+            cout_banquettes_ht += tarif_ht['supports']['banquette_angle']
         else:
-            prix_banquettes_ttc += PRIX_TTC['supports']['banquette']
+            prix_banquettes_ttc += tarif_ttc['supports']['banquette']
             if longueur <= 200:
-                cout_banquettes_ht += COUT_REVIENT_HT['supports']['banquette']
+                cout_banquettes_ht += tarif_ht['supports']['banquette']
             else:
-                cout_banquettes_ht += COUT_REVIENT_HT['supports']['banquette_long']
-    
-    details['Banquettes (mousse + tissu + support)'] = round(prix_banquettes_ttc, 2)
-    prix_ttc_total += prix_banquettes_ttc
-    cout_revient_ht_total += cout_banquettes_ht
-    
-    # ========================================================================
-    # DOSSIERS
-    # ========================================================================
-    
-    nb_dossiers = 0
-    if dossier_left:
-        nb_dossiers += 1
-    if dossier_bas:
-        nb_dossiers += 1
-    if dossier_right:
-        nb_dossiers += 1
-    
-    prix_dossiers_ttc = nb_dossiers * PRIX_TTC['supports']['dossier']
-    details['Dossiers'] = prix_dossiers_ttc
-    prix_ttc_total += prix_dossiers_ttc
-    
-    # Coût dossiers HT (on prend la moyenne)
-    cout_dossiers_ht = nb_dossiers * COUT_REVIENT_HT['supports']['dossier']
-    cout_revient_ht_total += cout_dossiers_ht
-    
-    # ========================================================================
-    # ACCOUDOIRS
-    # ========================================================================
-    
-    nb_accoudoirs = 0
-    if acc_left:
-        nb_accoudoirs += 1
-    if acc_right:
-        nb_accoudoirs += 1
-    if acc_bas:
-        nb_accoudoirs += 1
-    
-    prix_accoudoirs_ttc = nb_accoudoirs * PRIX_TTC['supports']['accoudoir']
-    details['Accoudoirs'] = prix_accoudoirs_ttc
-    prix_ttc_total += prix_accoudoirs_ttc
-    
-    cout_accoudoirs_ht = nb_accoudoirs * COUT_REVIENT_HT['supports']['accoudoir']
-    cout_revient_ht_total += cout_accoudoirs_ht
-    
-    # ========================================================================
-    # COUSSINS
-    # ========================================================================
-    
-    nb_coussins, taille_coussin = estimer_nombre_coussins(
-        type_canape, tx, ty, tz, profondeur, type_coussins
-    )
+                cout_banquettes_ht += tarif_ht['supports']['banquette_long']
     
-    # Ajustement si méridienne
-    if has_meridienne:
-        nb_coussins = max(1, nb_coussins - 1)
+    return {
+        'details': {'Banquettes (mousse + tissu + support)': round(prix_banquettes_ttc, 2)},
+        'ttc': [prix_banquettes_ttc],
+        'ht': [cout_banquettes_ht],
+        'infos': {'nb_banquettes': nb_banquettes},
+    }
+
+
+def _section_dossiers(cat, dossier_left, dossier_bas, dossier_right, layout):
+    """Dossiers"""
+    tarif_ttc = cat['prix_ttc']
+    tarif_ht = cat['cout_revient_ht']
+    
+    if layout is not None:
+        # Chaque dossier réel : 0,5 si <= 110 cm (comme canapematplot), palier long > 200 cm
+        nb_dossiers = 0
+        prix_dossiers_ttc = 0
+        cout_dossiers_ht = 0
+        for poly in layout['dossiers']:
+            longueur = _longueur_poly(poly)
+            poids = 0.5 if longueur <= 110 else 1.0
+            nb_dossiers += poids
+            prix_dossiers_ttc += poids * tarif_ttc['supports']['dossier']
+            palier = 'dossier' if longueur <= 200 else 'dossier_long'
+            cout_dossiers_ht += poids * tarif_ht['supports'][palier]
+    else:
+        nb_dossiers = 0
+        if dossier_left:
+            nb_dossiers += 1
+        if dossier_bas:
+            nb_dossiers += 1
+        if dossier_right:
+            nb_dossiers += 1
+        prix_dossiers_ttc = nb_dossiers * tarif_ttc['supports']['dossier']
+        # Coût dossiers HT (on prend la moyenne)
+        cout_dossiers_ht = nb_dossiers * tarif_ht['supports']['dossier']
     
-    prix_unitaire_coussin = PRIX_TTC['coussins'].get(taille_coussin, PRIX_TTC['coussins'][80])
-    prix_coussins_ttc = nb_coussins * prix_unitaire_coussin
-    details[f'Coussins {taille_coussin}cm (×{nb_coussins})'] = prix_coussins_ttc
-    prix_ttc_total += prix_coussins_ttc
+    return {
+        'details': {'Dossiers': prix_dossiers_ttc},
+        'ttc': [prix_dossiers_ttc],
+        'ht': [cout_dossiers_ht],
+        'infos': {'nb_dossiers': nb_dossiers},
+    }
+
+
+def _section_accoudoirs(cat, acc_left, acc_right, acc_bas, layout):
+    """Accoudoirs"""
+    if layout is not None:
+        nb_accoudoirs = layout['nb_accoudoirs']
+    else:
+        nb_accoudoirs = 0
+        if acc_left:
+            nb_accoudoirs += 1
+        if acc_right:
+            nb_accoudoirs += 1
+        if acc_bas:
+            nb_accoudoirs += 1
     
-    cout_unitaire_coussin = COUT_REVIENT_HT['coussins'].get(taille_coussin, COUT_REVIENT_HT['coussins'][80])
-    cout_coussins_ht = nb_coussins * cout_unitaire_coussin
-    cout_revient_ht_total += cout_coussins_ht
+    prix_accoudoirs_ttc = nb_accoudoirs * cat['prix_ttc']['supports']['accoudoir']
+    cout_accoudoirs_ht = nb_accoudoirs * cat['cout_revient_ht']['supports']['accoudoir']
     
-    # ========================================================================
-    # ACCESSOIRES
-    # ========================================================================
+    return {
+        'details': {'Accoudoirs': prix_accoudoirs_ttc},
+        'ttc': [prix_accoudoirs_ttc],
+        'ht': [cout_accoudoirs_ht],
+        'infos': {'nb_accoudoirs': nb_accoudoirs},
+    }
+
+
+def _section_coussins(cat, type_canape, tx, ty, tz, profondeur, type_coussins, has_meridienne, layout):
+    """Coussins d'assise"""
+    tarif_ttc = cat['prix_ttc']
+    tarif_ht = cat['cout_revient_ht']
+    details, ttc, ht = {}, [], []
+    
+    if layout is not None:
+        # Coussins réellement placés, à leur taille réelle (tarif valise hors 65/80/90)
+        tailles = tailles_coussins_layout(layout)
+        valise = _coussins_valise(type_coussins)
+        for taille, nb in sorted(tailles.items()):
+            cle = 'valise' if (valise or taille not in (65, 80, 90)) else taille
+            prix_coussins_ttc = nb * tarif_ttc['coussins'][cle]
+            details[f'Coussins {taille}cm (×{nb})'] = prix_coussins_ttc
+            ttc.append(prix_coussins_ttc)
+            ht.append(nb * tarif_ht['coussins'][cle])
+        nb_coussins = sum(tailles.values())
+        taille_coussin = max(tailles, key=tailles.get) if tailles else None
+    else:
+        nb_coussins, taille_coussin = estimer_nombre_coussins(
+            type_canape, tx, ty, tz, profondeur, type_coussins
+        )
+        
+        # Ajustement si méridienne
+        if has_meridienne:
+            nb_coussins = max(1, nb_coussins - 1)
+        
+        prix_unitaire_coussin = tarif_ttc['coussins'].get(taille_coussin, tarif_ttc['coussins'][80])
+        prix_coussins_ttc = nb_coussins * prix_unitaire_coussin
+        details[f'Coussins {taille_coussin}cm (×{nb_coussins})'] = prix_coussins_ttc
+        ttc.append(prix_coussins_ttc)
+        
+        cout_unitaire_coussin = tarif_ht['coussins'].get(taille_coussin, tarif_ht['coussins'][80])
+        ht.append(nb_coussins * cout_unitaire_coussin)
+    
+    return {
+        'details': details,
+        'ttc': ttc,
+        'ht': ht,
+        'infos': {'nb_coussins': nb_coussins, 'taille_coussins': taille_coussin},
+    }
+
+
+def _section_accessoires(cat, nb_coussins_deco, nb_traversins_supp, has_surmatelas):
+    """Coussins déco, traversins, surmatelas"""
+    tarif_ttc = cat['prix_ttc']
+    tarif_ht = cat['cout_revient_ht']
+    details, ttc, ht = {}, [], []
     
     # Coussins déco
     if nb_coussins_deco > 0:
-        prix_deco = nb_coussins_deco * PRIX_TTC['accessoires']['coussin_deco']
+        prix_deco = nb_coussins_deco * tarif_ttc['accessoires']['coussin_deco']
         details[f'Coussins déco (×{nb_coussins_deco})'] = prix_deco
-        prix_ttc_total += prix_deco
-        
-        cout_deco = nb_coussins_deco * COUT_REVIENT_HT['accessoires']['coussin_deco']
-        cout_revient_ht_total += cout_deco
+        ttc.append(prix_deco)
+        ht.append(nb_coussins_deco * tarif_ht['accessoires']['coussin_deco'])
     
     # Traversins
     if nb_traversins_supp > 0:
-        prix_trav = nb_traversins_supp * PRIX_TTC['accessoires']['traversin']
+        prix_trav = nb_traversins_supp * tarif_ttc['accessoires']['traversin']
         details[f'Traversins (×{nb_traversins_supp})'] = prix_trav
-        prix_ttc_total += prix_trav
-        
-        cout_trav = nb_traversins_supp * COUT_REVIENT_HT['accessoires']['traversin']
-        cout_revient_ht_total += cout_trav
+        ttc.append(prix_trav)
+        ht.append(nb_traversins_supp * tarif_ht['accessoires']['traversin'])
     
     # Surmatelas
     if has_surmatelas:
-        prix_surmat = PRIX_TTC['accessoires']['surmatelas']
+        prix_surmat = tarif_ttc['accessoires']['surmatelas']
         details['Surmatelas'] = prix_surmat
-        prix_ttc_total += prix_surmat
-        
-        cout_surmat = COUT_REVIENT_HT['accessoires']['surmatelas']
-        cout_revient_ht_total += cout_surmat
-    
-    # ========================================================================
-    # ARRONDIS (coût uniquement)
-    # ========================================================================
-    
-    cout_revient_ht_total += COUT_REVIENT_HT['arrondis']
-    
-    # ========================================================================
-    # CALCULS FINAUX
-    # ========================================================================
+        ttc.append(prix_surmat)
+        ht.append(tarif_ht['accessoires']['surmatelas'])
     
+    return {'details': details, 'ttc': ttc, 'ht': ht, 'infos': {}}
+
+
+# (nom, fonction, paramètres de calculer_prix_total dont dépend la section)
+_SECTIONS = (
+    ('banquettes', _section_banquettes,
+     ('type_canape', 'tx', 'ty', 'tz', 'profondeur', 'type_mousse', 'epaisseur', 'layout')),
+    ('dossiers', _section_dossiers, ('dossier_left', 'dossier_bas', 'dossier_right', 'layout')),
+    ('accoudoirs', _section_accoudoirs, ('acc_left', 'acc_right', 'acc_bas', 'layout')),
+    ('coussins', _section_coussins,
+     ('type_canape', 'tx', 'ty', 'tz', 'profondeur', 'type_coussins', 'has_meridienne', 'layout')),
+    ('accessoires', _section_accessoires, ('nb_coussins_deco', 'nb_traversins_supp', 'has_surmatelas')),
+)
+
+
+def _totaux(prix_ttc_total, cout_revient_ht_total):
+    """Sous-total, TVA, total et VRAIE marge (arrondis) à partir des sommes TTC et HT"""
     # Sous-total et TVA
     sous_total = prix_ttc_total / 1.2
     tva = prix_ttc_total - sous_total
@@ -330,7 +380,6 @@ def calculer_prix_total(type_canape, tx, ty, tz, profondeur,
     taux_marge = (marge_ht / prix_ht * 100) if prix_ht > 0 else 0
     
     return {
-        'details': details,
         'sous_total': round(sous_total, 2),
         'tva': round(tva, 2),
         'total_ttc': round(prix_ttc_total, 2),
@@ -340,31 +389,398 @@ def calculer_prix_total(type_canape, tx, ty, tz, profondeur,
         'cout_revient_ht': round(cout_revient_ht_total, 2),
         'marge_ht': round(marge_ht, 2),
         'taux_marge': round(taux_marge, 1),
+    }
+
+
+def _assembler_devis(cat, sections):
+    """Totaux, TVA et marge à partir des sections (dans l'ordre de _SECTIONS)"""
+    details = {}
+    infos = {}
+    prix_ttc_total = 0
+    cout_revient_ht_total = 0
+    for section in sections:
+        details.update(section['details'])
+        infos.update(section['infos'])
+        for montant in section['ttc']:
+            prix_ttc_total += montant
+        for montant in section['ht']:
+            cout_revient_ht_total += montant
+    
+    # Arrondis (coût uniquement)
+    cout_revient_ht_total += cat['cout_revient_ht']['arrondis']
+    
+    return {
+        'details': details,
+        **_totaux(prix_ttc_total, cout_revient_ht_total),
         
         # Informations complémentaires
-        'nb_banquettes': nb_banquettes,
-        'nb_dossiers': nb_dossiers,
-        'nb_accoudoirs': nb_accoudoirs,
-        'nb_coussins': nb_coussins,
-        'taille_coussins': taille_coussin
+        'nb_banquettes': infos['nb_banquettes'],
+        'nb_dossiers': infos['nb_dossiers'],
+        'nb_accoudoirs': infos['nb_accoudoirs'],
+        'nb_coussins': infos['nb_coussins'],
+        'taille_coussins': infos['taille_coussins'],
+        'version_tarif': cat['version']
     }
 
 
+def calculer_prix_total(type_canape, tx, ty, tz, profondeur,
+                       type_coussins, type_mousse, epaisseur,
+                       acc_left, acc_right, acc_bas,
+                       dossier_left, dossier_bas, dossier_right,
+                       nb_coussins_deco, nb_traversins_supp,
+                       has_surmatelas, has_meridienne,
+                       layout=None, date_devis=None):
+    """
+    Calcule le prix total TTC et le coût de revient HT
+    Compatible avec la structure de app.py
+    
+    layout : disposition réelle calculée par canapematplot (DisplayList.layout
+    d'un rendu, ou canapematplot.compute_layout(config) sans dessin). Si fournie,
+    banquettes (après scission), dossiers, accoudoirs et coussins sont chiffrés
+    pièce par pièce au lieu d'être estimés à partir du type de canapé.
+    
+    date_devis : date (date, datetime ou 'AAAA-MM-JJ') qui fixe la version du
+    catalogue de prix appliquée ; None = aujourd'hui.
+    
+    Returns:
+        dict avec tous les détails + la VRAIE marge
+    """
+    parametres = locals()
+    
+    # Une seule version de tarif pour tout le devis, même si le catalogue est rechargé entre-temps
+    cat = catalogue_prix.en_vigueur(date_devis)
+    
+    sections = [fonction(cat, *(parametres[p] for p in entrees))
+                for _, fonction, entrees in _SECTIONS]
+    return _assembler_devis(cat, sections)
+
+
 # ============================================================================
-# CLASSE POUR COMPATIBILITÉ AVEC NOUVEAU CODE
+# GRILLE PRÉCALCULÉE (aperçu en direct)
+# ============================================================================
+
+def calculer_prix_grille(type_canape, tx, ty, tz, profondeur,
+                         type_coussins, type_mousse, epaisseur,
+                         acc_left, acc_right, acc_bas,
+                         dossier_left, dossier_bas, dossier_right,
+                         nb_coussins_deco=0, nb_traversins_supp=0,
+                         has_surmatelas=False, has_meridienne=False,
+                         date_devis=None):
+    """
+    Totaux d'un devis estimé (sans layout), pour les appels fréquents.
+    
+    Mousse + tissu lus dans la grille projetée en mémoire (grille_prix.py),
+    le reste chiffré par les sections de calculer_prix_total : mêmes totaux.
+    Hors grille (dimension hors pas, mousse inconnue, grille absente ou
+    périmée) : calculer_prix_total.
+    
+    Returns:
+        dict : sous_total, tva, total_ttc, prix_ht, cout_revient_ht,
+        marge_ht, taux_marge, version_tarif
+    """
+    cat = catalogue_prix.en_vigueur(date_devis)
+    lire = grille_prix.lecture(cat, profondeur, epaisseur, type_mousse)
+    banquettes = _banquettes_estimees(type_canape, tx, ty, tz, profondeur)
+    mousse_tissu = [lire(longueur) for longueur, _, _ in banquettes] if lire else [None]
+    if None in mousse_tissu:
+        resultat = calculer_prix_total(type_canape, tx, ty, tz, profondeur,
+                                       type_coussins, type_mousse, epaisseur,
+                                       acc_left, acc_right, acc_bas,
+                                       dossier_left, dossier_bas, dossier_right,
+                                       nb_coussins_deco, nb_traversins_supp,
+                                       has_surmatelas, has_meridienne, date_devis=date_devis)
+        return {cle: resultat[cle] for cle in _TOTAUX_GRILLE}
+    
+    # Mêmes sections que calculer_prix_total : seule la mousse + tissu vient de la grille
+    sections = [
+        _chiffrer_banquettes(cat, estimer_nombre_banquettes(type_canape, tx, ty, tz),
+                             banquettes, mousse_tissu),
+        _section_dossiers(cat, dossier_left, dossier_bas, dossier_right, None),
+        _section_accoudoirs(cat, acc_left, acc_right, acc_bas, None),
+        _section_coussins(cat, type_canape, tx, ty, tz, profondeur, type_coussins, has_meridienne, None),
+        _section_accessoires(cat, nb_coussins_deco, nb_traversins_supp, has_surmatelas),
+    ]
+    resultat = _assembler_devis(cat, sections)
+    return {cle: resultat[cle] for cle in _TOTAUX_GRILLE}
+
+
+_TOTAUX_GRILLE = ('sous_total', 'tva', 'total_ttc', 'prix_ht', 'cout_revient_ht',
+                  'marge_ht', 'taux_marge', 'version_tarif')
+
+
+# ============================================================================
+# CALCUL PAR LOTS (NumPy)
+# ============================================================================
+
+def _par_libelle(colonne, fonction):
+    """
+    Applique fonction(libellé) une seule fois par libellé distinct.
+    colonne : tableau, ou couple (libellés, inverse) déjà factorisé.
+    """
+    libelles, inverse = colonne if isinstance(colonne, tuple) else np.unique(colonne, return_inverse=True)
+    return np.asarray([fonction(lib) for lib in libelles.tolist()])[inverse.reshape(-1)]
+
+
+def _arrondi(valeurs, ndigits):
+    """
+    round() Python élément par élément : np.round (×10^n, rint, ÷10^n) donne le
+    même résultat sauf à mi-chemin, où l'on repasse par round() sur les rares
+    valeurs concernées.
+    """
+    echelle = valeurs * 10 ** ndigits
+    resultat = np.round(valeurs, ndigits)
+    douteux = np.abs(echelle - np.floor(echelle) - 0.5) < 1e-4
+    if douteux.any():
+        resultat[douteux] = [round(v, ndigits) for v in valeurs[douteux].tolist()]
+    return resultat
+
+
+def _taille_coussins_fixe(type_coussins):
+    """Taille d'une spécification fixe ("65", "80", ...), None si non numérique"""
+    try:
+        taille = int(type_coussins)
+    except ValueError:
+        return None
+    return taille if taille != 0 else None
+
+
+def calculer_prix_batch(type_canape, tx, ty, tz, profondeur,
+                        type_coussins, type_mousse, epaisseur,
+                        acc_left, acc_right, acc_bas,
+                        dossier_left, dossier_bas, dossier_right,
+                        nb_coussins_deco=0, nb_traversins_supp=0,
+                        has_surmatelas=False, has_meridienne=False,
+                        date_devis=None, catalogue=None):
+    """
+    Version vectorisée de calculer_prix_total (mode estimation, sans layout)
+    pour les grilles de prix et catalogues.
+
+    Chaque paramètre est une colonne (liste / tableau NumPy) ou un scalaire
+    appliqué à toutes les lignes ; ty / tz absents : None, NaN ou 0.
+    date_devis (scalaire) : une même version du catalogue pour tout le lot.
+    catalogue : version compilée imposée (catalogue_prix.en_vigueur), p. ex.
+    celle d'un catalogue candidat ; date_devis est alors ignorée.
+    Mêmes coefficients mousse, seuil tissu (largeur + 2*épaisseur vs 140), paliers de
+    supports et arrondis que calculer_prix_total : résultats identiques.
+
+    Returns:
+        dict de tableaux : total_ttc, prix_ht, cout_revient_ht, marge_ht, taux_marge
+    """
+    cat = catalogue or catalogue_prix.en_vigueur(date_devis)
+    tarif_ttc = cat['prix_ttc']
+    tarif_ht = cat['cout_revient_ht']
+    tissu = cat['tissu']
+
+    textes = (type_canape, type_coussins, type_mousse)
+    nombres = (tx, ty, tz, profondeur, epaisseur, nb_coussins_deco, nb_traversins_supp)
+    booleens = (acc_left, acc_right, acc_bas, dossier_left, dossier_bas, dossier_right,
+                has_surmatelas, has_meridienne)
+    n = max((len(c) for c in textes + nombres + booleens
+             if hasattr(c, '__len__') and not isinstance(c, str)), default=1)
+
+    def colonne(valeurs, dtype):
+        return np.broadcast_to(np.asarray(valeurs, dtype=dtype), (n,))
+
+    # Libellés factorisés une fois : (libellés distincts, indice par ligne)
+    type_canape, type_coussins, type_mousse = [
+        (np.asarray([str(c)]), np.zeros(n, dtype=int)) if np.ndim(c) == 0
+        else np.unique(colonne(c, str), return_inverse=True)
+        for c in textes]
+    tx, ty, tz, profondeur, epaisseur, nb_coussins_deco, nb_traversins_supp = [
+        colonne(c, float) for c in nombres]
+    (acc_left, acc_right, acc_bas, dossier_left, dossier_bas, dossier_right,
+     has_surmatelas, has_meridienne) = [colonne(c, bool) for c in booleens]
+
+    contient_L = _par_libelle(type_canape, lambda t: "L" in t)
+    contient_U = _par_libelle(type_canape, lambda t: "U" in t)
+    est_simple = _par_libelle(type_canape, lambda t: "Simple" in t)
+    est_L = contient_L & ~est_simple
+    est_U = contient_U & ~est_simple & ~est_L
+    est_angle = _par_libelle(type_canape, lambda t: "Angle" in t or "LF" in t or "U2F" in t)
+    ty_ou_150 = np.where(np.isnan(ty) | (ty == 0), 150, ty)
+    tz_ou_150 = np.where(np.isnan(tz) | (tz == 0), 150, tz)
+
+    coef_ttc = _par_libelle(type_mousse, lambda m: cat['coef_mousse_ttc'].get(m, cat['coef_mousse_ttc']['D25']))
+    coef_ht = _par_libelle(type_mousse, lambda m: cat['coef_mousse_cout_ht'].get(m, cat['coef_mousse_cout_ht']['D25']))
+
+    # ------------------------------------------------------------------
+    # Banquettes : même ordre d'accumulation que calculer_prix_total
+    # ------------------------------------------------------------------
+    banquettes = [
+        (tx, est_simple | est_L | est_U, False),
+        (ty_ou_150, est_L | est_U, True),
+        (tz_ou_150, est_U, True),
+    ]
+    prix_banquettes_ttc = np.zeros(n)
+    cout_banquettes_ht = np.zeros(n)
+    largeur = profondeur
+    for longueur, presente, peut_etre_angle in banquettes:
+        volume_m3 = (longueur * largeur * epaisseur) / 1000000
+        prix_tissu = np.where(largeur + (epaisseur * 2) > 140,
+                              (longueur / 100) * tissu['grand_ttc'],
+                              (longueur / 100) * tissu['petit_ttc'])
+        prix_mt = volume_m3 * coef_ttc + prix_tissu
+        cout_tissu = np.where(2 + largeur + (epaisseur * 2) <= 140,
+                              ((longueur / 100) * tissu['petit_cout_ht']) + tissu['supplement_cout_ht'],
+                              ((longueur / 100) * tissu['grand_cout_ht']) + tissu['supplement_cout_ht'])
+        cout_mt = volume_m3 * coef_ht + cout_tissu
+
+        angle = est_angle & peut_etre_angle
+        support_ttc = np.where(angle, tarif_ttc['supports']['banquette_angle'],
+                               tarif_ttc['supports']['banquette'])
+        support_ht = np.where(angle, tarif_ht['supports']['banquette_angle'],
+                              np.where(longueur <= 200, tarif_ht['supports']['banquette'],
+                                       tarif_ht['supports']['banquette_long']))
+        # x + 0.0 == x : les banquettes absentes n'altèrent pas la somme
+        prix_banquettes_ttc = prix_banquettes_ttc + np.where(presente, prix_mt, 0.0)
+        prix_banquettes_ttc = prix_banquettes_ttc + np.where(presente, support_ttc, 0.0)
+        cout_banquettes_ht = cout_banquettes_ht + np.where(presente, cout_mt, 0.0)
+        cout_banquettes_ht = cout_banquettes_ht + np.where(presente, support_ht, 0.0)
+
+    prix_ttc_total = prix_banquettes_ttc
+    cout_revient_ht_total = cout_banquettes_ht
+
+    # Dossiers / accoudoirs
+    nb_dossiers = dossier_left.astype(int) + dossier_bas + dossier_right
+    prix_ttc_total = prix_ttc_total + nb_dossiers * tarif_ttc['supports']['dossier']
+    cout_revient_ht_total = cout_revient_ht_total + nb_dossiers * tarif_ht['supports']['dossier']
+
+    nb_accoudoirs = acc_left.astype(int) + acc_right + acc_bas
+    prix_ttc_total = prix_ttc_total + nb_accoudoirs * tarif_ttc['supports']['accoudoir']
+    cout_revient_ht_total = cout_revient_ht_total + nb_accoudoirs * tarif_ht['supports']['accoudoir']
+
+    # ------------------------------------------------------------------
+    # Coussins (estimer_nombre_coussins)
+    # ------------------------------------------------------------------
+    auto = _par_libelle(type_coussins, lambda c: c == "auto")
+    largeur_totale = tx + np.where(contient_L | contient_U, np.where(np.isnan(ty), 0, ty), 0)
+    largeur_totale = largeur_totale + np.where(contient_U & ~np.isnan(tz), tz, 0)
+    taille_auto = np.where(largeur_totale < 200, 65, np.where(largeur_totale < 350, 80, 90))
+    nb_auto = np.maximum(2, np.trunc(largeur_totale / taille_auto))
+
+    taille_fixe = _par_libelle(type_coussins, lambda c: _taille_coussins_fixe(c) or 0)
+    fixe = ~auto & (taille_fixe != 0)
+    diviseur = np.where(fixe, taille_fixe, 1)
+    nb_fixe = np.maximum(2, np.trunc(tx / diviseur))
+
+    taille_coussin = np.where(auto, taille_auto, np.where(fixe, taille_fixe, 80)).astype(int)
+    nb_coussins = np.where(auto, nb_auto, np.where(fixe, nb_fixe, 4)).astype(int)
+    nb_coussins = np.where(has_meridienne, np.maximum(1, nb_coussins - 1), nb_coussins)
+
+    unite_ttc = _par_libelle(taille_coussin, lambda s: tarif_ttc['coussins'].get(s, tarif_ttc['coussins'][80]))
+    unite_ht = _par_libelle(taille_coussin, lambda s: tarif_ht['coussins'].get(s, tarif_ht['coussins'][80]))
+    prix_ttc_total = prix_ttc_total + nb_coussins * unite_ttc
+    cout_revient_ht_total = cout_revient_ht_total + nb_coussins * unite_ht
+
+    # ------------------------------------------------------------------
+    # Accessoires, arrondis
+    # ------------------------------------------------------------------
+    deco = np.where(nb_coussins_deco > 0, nb_coussins_deco, 0)
+    prix_ttc_total = prix_ttc_total + deco * tarif_ttc['accessoires']['coussin_deco']
+    cout_revient_ht_total = cout_revient_ht_total + deco * tarif_ht['accessoires']['coussin_deco']
+
+    trav = np.where(nb_traversins_supp > 0, nb_traversins_supp, 0)
+    prix_ttc_total = prix_ttc_total + trav * tarif_ttc['accessoires']['traversin']
+    cout_revient_ht_total = cout_revient_ht_total + trav * tarif_ht['accessoires']['traversin']
+
+    prix_ttc_total = prix_ttc_total + np.where(has_surmatelas, tarif_ttc['accessoires']['surmatelas'], 0)
+    cout_revient_ht_total = cout_revient_ht_total + np.where(has_surmatelas, tarif_ht['accessoires']['surmatelas'], 0)
+
+    cout_revient_ht_total = cout_revient_ht_total + tarif_ht['arrondis']
+
+    # ------------------------------------------------------------------
+    # Calculs finaux
+    # ------------------------------------------------------------------
+    prix_ht = prix_ttc_total / 1.2
+    marge_ht = prix_ht - cout_revient_ht_total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        taux_marge = np.where(prix_ht > 0, marge_ht / prix_ht * 100, 0)
+
+    return {
+        'total_ttc': _arrondi(prix_ttc_total, 2),
+        'prix_ht': _arrondi(prix_ht, 2),
+        'cout_revient_ht': _arrondi(cout_revient_ht_total, 2),
+        'marge_ht': _arrondi(marge_ht, 2),
+        'taux_marge': _arrondi(taux_marge, 1),
+    }
+
+
+# ============================================================================
+# MOTEUR INCRÉMENTAL
 # ============================================================================
 
 class CanapePricing:
-    """Classe de compatibilité pour le nouveau système"""
+    """
+    Moteur de devis incrémental (aperçu de prix en direct).
+    
+    Garde la dernière configuration et, pour chaque section du devis, le
+    résultat calculé avec ses entrées : quand un widget change (traversins,
+    une case à cocher...), seules les sections qui en dépendent sont
+    recalculées, puis les totaux sont réassemblés.
+    
+        moteur = CanapePricing()
+        moteur.calculer_devis_complet(config)                    # paramètres de calculer_prix_total
+        moteur.calculer_devis_complet({'nb_traversins_supp': 2})  # -> section 'accessoires' seule
+    
+    Résultats identiques à calculer_prix_total. Un layout est comparé par
+    identité (nouveau rendu = nouvelles sections) ; un changement de version
+    du catalogue vide le cache.
+    """
+    
+    _DEFAUTS = {
+        'nb_coussins_deco': 0, 'nb_traversins_supp': 0,
+        'has_surmatelas': False, 'has_meridienne': False,
+        'layout': None, 'date_devis': None,
+    }
     
     def __init__(self):
-        pass
+        self.configuration = dict(self._DEFAUTS)
+        self.sections_recalculees = []
+        self._catalogue = None
+        self._cache = {}  # section -> résultat
+    
+    def invalider(self):
+        """Oublie les sections en cache (le prochain devis recalcule tout)"""
+        self._cache.clear()
     
     def calculer_devis_complet(self, configuration):
-        """Méthode de compatibilité avec le nouveau système"""
-        # Convertir la configuration en paramètres pour calculer_prix_total
-        # Cette méthode sera utilisée si vous voulez migrer vers le nouveau système
-        pass
+        """
+        Met à jour la configuration (complète au premier appel, partielle
+        ensuite) et renvoie le même dict que calculer_prix_total.
+        """
+        inconnus = set(configuration).difference(_PARAMETRES_DEVIS)
+        if inconnus:
+            raise TypeError(f"Paramètres de devis inconnus : {', '.join(sorted(inconnus))}")
+        modifies = {p for p, v in configuration.items()
+                    if p not in self.configuration or not _meme_valeur(self.configuration[p], v)}
+        self.configuration.update(configuration)
+        manquants = [p for p in _PARAMETRES_DEVIS if p not in self.configuration]
+        if manquants:
+            raise TypeError(f"Paramètres de devis manquants : {', '.join(manquants)}")
+        
+        cat = catalogue_prix.en_vigueur(self.configuration['date_devis'])
+        if cat is not self._catalogue:
+            self._catalogue = cat
+            self._cache.clear()
+        
+        self.sections_recalculees = []
+        sections = []
+        for nom, fonction, entrees in _SECTIONS:
+            section = self._cache.get(nom)
+            if section is None or not modifies.isdisjoint(entrees):
+                section = fonction(cat, *(self.configuration[p] for p in entrees))
+                self._cache[nom] = section
+                self.sections_recalculees.append(nom)
+            sections.append(section)
+        return _assembler_devis(cat, sections)
+
+
+_PARAMETRES_DEVIS = tuple(inspect.signature(calculer_prix_total).parameters)
+
+
+def _meme_valeur(avant, apres):
+    """Même entrée : layout (dict) par identité, le reste par type et valeur"""
+    return avant is apres or (not isinstance(avant, dict) and type(avant) is type(apres) and avant == apres)
 
 
 # ============================================================================
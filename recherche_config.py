@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Recherche de configurations à dimensions extérieures fixées
+
+Explore mousse, épaisseur, mode de coussins, variante de dessin et côté de
+méridienne, chiffre chaque candidat sur sa disposition réelle et renvoie le
+front de Pareto : prix TTC le plus bas, marge HT la plus haute, chute de
+coussins (assise non couverte) la plus faible.
+
+Branches écartées avant chiffrage : méridienne du côté d'un accoudoir,
+dispositions refusées par canapematplot, banquettes de plus de 250 cm.
+
+Coût : la disposition ne dépend que de (variante, coussins, méridienne). Elle
+est calculée une fois, mémoïsée d'une recherche à l'autre, puis chiffrée
+pour chaque mousse × épaisseur avec CanapePricing, qui ne recalcule alors
+que la section banquettes.
+
+Balayage d'une dimension (balayer_dimension) : prix, marge, banquettes et
+coussins le long d'une plage de tx, ty, tz, profondeur ou épaisseur, les
+autres entrées fixées, avec les paliers de prix (scission, banquette au-delà
+de 200 cm, coussins, largeur de tissu). Mêmes dispositions mémoïsées et un
+seul CanapePricing pour toute la plage : faire glisser la plage ne calcule
+que les nouveaux points.
+"""
+
+from functools import lru_cache
+
+import canapematplot as cm
+from pricing import CanapePricing
+
+MOUSSES = ("D25", "D30", "HR35", "HR45")
+EPAISSEURS = (15, 20, 25, 30, 35)
+MODES_COUSSINS = ("auto", "65", "80", "90", "valise", "p", "g")
+LONGUEUR_MAX_BANQUETTE = 250
+DIMENSIONS_BALAYABLES = ("tx", "ty", "tz", "profondeur", "epaisseur")
+
+# Variantes explicites par renderer (le mode auto choisit parmi elles)
+_VARIANTES = {
+    "LNF": ("v1", "v2"),
+    "U": ("v1", "v2", "v3", "v4"),
+    "U1F": ("v1", "v2", "v3", "v4"),
+}
+# Côtés de méridienne gérés par chaque renderer
+_COTES_MERIDIENNE = {
+    "Simple1": ("g", "d"),
+    "LNF": ("g", "b"),
+    "LF": ("g", "b"),
+    "U": ("g", "d"),
+    "U1F": ("g", "d"),
+    "U2F": ("g", "d"),
+}
+_ACCOUDOIR_DU_COTE = {"g": "acc_left", "d": "acc_right", "b": "acc_bas"}
+
+
+# ============================================================================
+# DISPOSITIONS (mémoïsées)
+# ============================================================================
+
+@lru_cache(maxsize=4096)
+def _disposition_brute(config_items, couts_items=None):
+    """
+    Disposition d'une configuration figée (tuples triés), None si refusée par
+    le dessin. Le dict est celui du cache, rendu à chaque appel : lecture seule.
+    """
+    try:
+        return cm.compute_layout(dict(config_items),
+                                 split_costs=dict(couts_items) if couts_items else None)
+    except ValueError:
+        return None
+
+
+def _disposition(config_items, couts_items=None):
+    """Disposition retenue par la recherche : None si refusée ou banquette trop longue"""
+    layout = _disposition_brute(config_items, couts_items)
+    if layout is None or any(b["longueur"] > LONGUEUR_MAX_BANQUETTE for b in layout["banquettes"]):
+        return None
+    return layout
+
+
+def _cotes_meridienne(renderer, meridienne_len, accoudoirs):
+    """Côtés possibles (None si pas de méridienne), accoudoirs en conflit écartés"""
+    if not meridienne_len:
+        return (None,)
+    return tuple(c for c in _COTES_MERIDIENNE[renderer]
+                 if not accoudoirs.get(_ACCOUDOIR_DU_COTE[c]))
+
+
+# ============================================================================
+# FRONT DE PARETO
+# ============================================================================
+
+def front_pareto(candidats):
+    """
+    Candidats non dominés sur (total_ttc ↓, marge_ht ↑, chute ↓).
+    Balayage par prix croissant : un candidat n'est comparé qu'au front déjà
+    retenu (les doublons exacts ne sont gardés qu'une fois).
+    """
+    front = []
+    for c in sorted(candidats, key=lambda c: (c["total_ttc"], -c["marge_ht"], c["chute"])):
+        if not any(f["marge_ht"] >= c["marge_ht"] and f["chute"] <= c["chute"] for f in front):
+            front.append(c)
+    return front
+
+
+# ============================================================================
+# RECHERCHE
+# ============================================================================
+
+def rechercher_configurations(type_canape, tx, ty=None, tz=None, profondeur=70,
+                              acc_left=True, acc_right=True, acc_bas=True,
+                              dossier_left=True, dossier_bas=True, dossier_right=True,
+                              meridienne_len=0,
+                              mousses=MOUSSES, epaisseurs=EPAISSEURS,
+                              modes_coussins=MODES_COUSSINS,
+                              budget_ttc=None, taux_marge_min=None,
+                              nb_coussins_deco=0, nb_traversins_supp=0,
+                              has_surmatelas=False, split_costs=None, date_devis=None):
+    """
+    Configurations Pareto-optimales pour des dimensions extérieures fixées.
+
+    meridienne_len > 0 : le côté de la méridienne fait partie de la recherche.
+    budget_ttc / taux_marge_min : candidats au-dessus du budget ou sous la
+    marge minimale écartés avant le calcul du front.
+    split_costs : comme compute_layout (scission au moindre coût), pour que les
+    prix de la recherche soient ceux du devis.
+
+    Returns:
+        liste de dicts (type_mousse, epaisseur, coussins, variant,
+        meridienne_side, total_ttc, marge_ht, taux_marge, chute,
+        resume_coussins, prix, layout), du plus proche du budget au plus
+        éloigné (sans budget : du moins cher au plus cher). layout est
+        partagé avec le cache des dispositions (et entre candidats) : en
+        lecture seule, copy.deepcopy avant de le modifier.
+    """
+    renderer, _ = cm._render_call_from_config({"type_canape": type_canape})
+    accoudoirs = {"acc_left": acc_left, "acc_right": acc_right, "acc_bas": acc_bas}
+    couts = tuple(sorted(split_costs.items())) if split_costs else None
+    base = dict(type_canape=type_canape, tx=tx, ty=ty, tz=tz, profondeur=profondeur,
+                dossier_left=dossier_left, dossier_bas=dossier_bas, dossier_right=dossier_right,
+                **accoudoirs)
+
+    candidats = []
+    for variant in _VARIANTES.get(renderer, (None,)):
+        for cote in _cotes_meridienne(renderer, meridienne_len, accoudoirs):
+            for coussins in modes_coussins:
+                config = dict(base, coussins=coussins,
+                              meridienne_side=cote, meridienne_len=meridienne_len if cote else 0)
+                if variant is not None:
+                    config["variant"] = variant
+                layout = _disposition(tuple(sorted(config.items())), couts)
+                if layout is None:
+                    continue
+
+                moteur = CanapePricing()
+                moteur.configuration.update(
+                    base, type_coussins=coussins, has_meridienne=cote is not None,
+                    nb_coussins_deco=nb_coussins_deco, nb_traversins_supp=nb_traversins_supp,
+                    has_surmatelas=has_surmatelas, layout=layout, date_devis=date_devis)
+                for mousse in mousses:
+                    for epaisseur in epaisseurs:
+                        prix = moteur.calculer_devis_complet(
+                            {"type_mousse": mousse, "epaisseur": epaisseur})
+                        if budget_ttc is not None and prix["total_ttc"] > budget_ttc:
+                            continue
+                        if taux_marge_min is not None and prix["taux_marge"] < taux_marge_min:
+                            continue
+                        candidats.append({
+                            "type_mousse": mousse,
+                            "epaisseur": epaisseur,
+                            "coussins": coussins,
+                            "variant": layout["variant"],
+                            "meridienne_side": cote,
+                            "total_ttc": prix["total_ttc"],
+                            "marge_ht": prix["marge_ht"],
+                            "taux_marge": prix["taux_marge"],
+                            "chute": layout["coussins"]["chute"],
+                            "resume_coussins": layout["coussins"]["resume"],
+                            "prix": prix,
+                            "layout": layout,
+                        })
+
+    front = front_pareto(candidats)
+    if budget_ttc is not None:
+        front.sort(key=lambda c: budget_ttc - c["total_ttc"])
+    return front
+
+
+# ============================================================================
+# BALAYAGE D'UNE DIMENSION
+# ============================================================================
+
+def _paliers(avant, point):
+    """Ce qui change de palier de prix entre deux points consécutifs"""
+    paliers = []
+    if point["nb_banquettes"] != avant["nb_banquettes"]:
+        paliers.append(f"scission : {avant['nb_banquettes']} → {point['nb_banquettes']} banquettes")
+    longues = sum(l > 200 for l in point["banquettes"])
+    if longues != sum(l > 200 for l in avant["banquettes"]):
+        paliers.append(f"{longues} banquette(s) > 200 cm")
+    if point["resume_coussins"] != avant["resume_coussins"]:
+        paliers.append(f"coussins : {point['resume_coussins']}")
+    if point["grand_tissu"] != avant["grand_tissu"]:
+        paliers.append("tissu grande largeur" if point["grand_tissu"] else "tissu petite largeur")
+    return paliers
+
+
+def balayer_dimension(dimension, valeurs, type_canape, tx, ty=None, tz=None, profondeur=70,
+                      type_coussins="auto", type_mousse="HR35", epaisseur=25,
+                      acc_left=True, acc_right=True, acc_bas=True,
+                      dossier_left=True, dossier_bas=True, dossier_right=True,
+                      meridienne_side=None, meridienne_len=0,
+                      nb_coussins_deco=0, nb_traversins_supp=0, has_surmatelas=False,
+                      split_costs=None, date_devis=None):
+    """
+    Prix, marge, banquettes et coussins pour chaque valeur d'une dimension.
+
+    dimension : l'une de DIMENSIONS_BALAYABLES ; valeurs : valeurs à évaluer
+    (p. ex. range(tx - 50, tx + 51, 2)) ; les autres paramètres restent fixés.
+    split_costs : comme compute_layout (scission au moindre coût), pour que la
+    courbe suive le devis.
+
+    Les dispositions sont mémoïsées (un balayage d'épaisseur n'en calcule
+    qu'une) et chiffrées par un seul CanapePricing : seules les sections du
+    devis touchées par la dimension sont recalculées d'un point à l'autre.
+
+    Returns:
+        liste de dicts (valeur, total_ttc, marge_ht, taux_marge, nb_banquettes,
+        banquettes, nb_coussins, resume_coussins, grand_tissu, paliers), dans
+        l'ordre des valeurs. Disposition refusée (dimension hors limites) :
+        total_ttc à None et paliers vide.
+    """
+    if dimension not in DIMENSIONS_BALAYABLES:
+        raise ValueError(f"Dimension non balayable : {dimension!r} "
+                         f"(choix : {', '.join(DIMENSIONS_BALAYABLES)})")
+    parametres = dict(type_canape=type_canape, tx=tx, ty=ty, tz=tz, profondeur=profondeur,
+                      acc_left=acc_left, acc_right=acc_right, acc_bas=acc_bas,
+                      dossier_left=dossier_left, dossier_bas=dossier_bas,
+                      dossier_right=dossier_right)
+    a_meridienne = bool(meridienne_side and meridienne_len)
+    couts = tuple(sorted(split_costs.items())) if split_costs else None
+
+    moteur = CanapePricing()
+    moteur.configuration.update(
+        type_coussins=type_coussins, type_mousse=type_mousse, epaisseur=epaisseur,
+        has_meridienne=a_meridienne, nb_coussins_deco=nb_coussins_deco,
+        nb_traversins_supp=nb_traversins_supp, has_surmatelas=has_surmatelas,
+        date_devis=date_devis)
+
+    points = []
+    avant = None
+    for valeur in valeurs:
+        config = dict(parametres, coussins=type_coussins,
+                      meridienne_side=meridienne_side if a_meridienne else None,
+                      meridienne_len=meridienne_len if a_meridienne else 0)
+        if dimension != "epaisseur":
+            config[dimension] = valeur
+        layout = _disposition_brute(tuple(sorted(config.items())), couts)
+        if layout is None:
+            points.append({"valeur": valeur, "total_ttc": None, "marge_ht": None,
+                           "taux_marge": None, "nb_banquettes": None, "banquettes": (),
+                           "nb_coussins": None, "resume_coussins": None,
+                           "grand_tissu": None, "paliers": []})
+            continue
+
+        prix = moteur.calculer_devis_complet(dict(parametres, **{dimension: valeur}, layout=layout))
+        ep = moteur.configuration["epaisseur"]
+        point = {
+            "valeur": valeur,
+            "total_ttc": prix["total_ttc"],
+            "marge_ht": prix["marge_ht"],
+            "taux_marge": prix["taux_marge"],
+            "nb_banquettes": prix["nb_banquettes"],
+            "banquettes": tuple(b["longueur"] for b in layout["banquettes"]),
+            "nb_coussins": prix["nb_coussins"],
+            "resume_coussins": layout["coussins"]["resume"],
+            "grand_tissu": config["profondeur"] + 2 * ep > 140,  # seuil de calculer_prix_mousse_tissu_ttc
+            "paliers": [],
+        }
+        if avant is not None:
+            point["paliers"] = _paliers(avant, point)
+        points.append(point)
+        avant = point
+    return points
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Rechiffrage en masse des devis enregistrés (impact d'un changement de tarif)
+
+Entrée : fichier JSON Lines, un devis par ligne :
+  - soit la config construite par app_moderne.py
+    (type_canape, dimensions, options, client),
+  - soit {"id": ..., "date_devis": "AAAA-MM-JJ", "config": {...}}.
+
+Chaque devis est chiffré deux fois par calculer_prix_batch (mode estimation,
+par lots vectorisés, répartis sur un pool de processus) :
+  avant : version du catalogue courant en vigueur à la date du devis
+          (date_devis de la ligne, sinon --date-avant, sinon aujourd'hui) ;
+  après : version d'un catalogue candidat (--catalogue, par défaut le
+          catalogue courant) en vigueur à --date-apres, sinon sa dernière
+          version.
+Le rapport CSV donne prix TTC, coût de revient HT et marge avant / après et
+leurs écarts ; une ligne illisible y figure avec son erreur.
+
+Reprise : après chaque lot, <rapport>.reprise note la position dans l'entrée,
+la taille du rapport et les cumuls. Relancer la même commande reprend après
+le dernier lot écrit ; le point de reprise est supprimé en fin de job.
+
+    python reprix_devis.py devis.jsonl rapport.csv --catalogue catalogue_2025.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+import catalogue_prix
+from pricing import calculer_prix_batch
+
+TAILLE_LOT = 20000
+
+COLONNES_RAPPORT = (
+    "id", "type_canape", "version_avant", "version_apres",
+    "total_ttc_avant", "total_ttc_apres", "ecart_ttc",
+    "cout_revient_ht_avant", "cout_revient_ht_apres",
+    "marge_ht_avant", "marge_ht_apres", "ecart_marge_ht",
+    "taux_marge_avant", "taux_marge_apres", "erreur",
+)
+
+# Paramètres de calculer_prix_batch : (nom, conversion, défaut ; None = obligatoire)
+_PARAMETRES = (
+    ("type_canape", str, None), ("tx", float, None), ("ty", float, float("nan")),
+    ("tz", float, float("nan")), ("profondeur", float, None),
+    ("type_coussins", str, "auto"), ("type_mousse", str, None), ("epaisseur", float, None),
+    ("acc_left", bool, False), ("acc_right", bool, False), ("acc_bas", bool, False),
+    ("dossier_left", bool, False), ("dossier_bas", bool, False), ("dossier_right", bool, False),
+    ("nb_coussins_deco", int, 0), ("nb_traversins_supp", int, 0),
+    ("has_surmatelas", bool, False), ("has_meridienne", bool, False),
+)
+
+_CUMULS = ("nb_devis", "nb_erreurs", "total_ttc_avant", "total_ttc_apres",
+           "marge_ht_avant", "marge_ht_apres")
+
+
+# ============================================================================
+# LECTURE DES DEVIS
+# ============================================================================
+
+def _parametres_devis(config):
+    """Paramètres de chiffrage à partir d'une config de devis (ValueError si incomplète)"""
+    plat = {k: v for k, v in config.items() if k not in ("dimensions", "options", "client")}
+    plat.update(config.get("dimensions") or {})
+    plat.update(config.get("options") or {})
+    if "type_coussins" not in plat and "coussins" in plat:
+        plat["type_coussins"] = plat["coussins"]
+    if "has_meridienne" not in plat:
+        plat["has_meridienne"] = bool(plat.get("meridienne_side")) and bool(plat.get("meridienne_len"))
+
+    parametres = {}
+    for nom, conversion, defaut in _PARAMETRES:
+        valeur = plat.get(nom)
+        if valeur is None:
+            if defaut is None:
+                raise ValueError(f"champ manquant : {nom}")
+            valeur = defaut
+        try:
+            parametres[nom] = conversion(valeur)
+        except (TypeError, ValueError):
+            raise ValueError(f"valeur invalide pour {nom} : {valeur!r}") from None
+    return parametres
+
+
+def _lire_devis(ligne, numero):
+    """(id, date_devis, paramètres) d'une ligne JSON ; paramètres = message si illisible"""
+    try:
+        devis = json.loads(ligne)
+        if not isinstance(devis, dict):
+            raise ValueError("objet JSON attendu")
+    except ValueError as e:
+        return numero, None, f"JSON invalide : {e}"
+    config = devis.get("config", devis)
+    identifiant = devis.get("id", numero)
+    try:
+        if not isinstance(config, dict):
+            raise ValueError("config invalide")
+        return identifiant, devis.get("date_devis") or config.get("date_devis"), _parametres_devis(config)
+    except ValueError as e:
+        return identifiant, None, str(e)
+
+
+# ============================================================================
+# CHIFFRAGE D'UN LOT
+# ============================================================================
+
+_VERSIONS_AVANT = {}  # date_devis -> version compilée (par processus)
+
+
+def _chiffrer(parametres, versions):
+    """calculer_prix_batch par version de tarif ; dict de tableaux dans l'ordre des lignes"""
+    resultats = {}
+    groupes = {}
+    for i, version in enumerate(versions):
+        groupes.setdefault(id(version), (version, []))[1].append(i)
+    for version, lignes in groupes.values():
+        colonnes = {nom: [parametres[i][nom] for i in lignes] for nom, _, _ in _PARAMETRES}
+        prix = calculer_prix_batch(**colonnes, catalogue=version)
+        for cle, valeurs in prix.items():
+            resultats.setdefault(cle, np.empty(len(parametres)))[lignes] = valeurs
+    return resultats
+
+
+def _traiter_lot(lot, version_apres, date_avant):
+    """
+    Lignes CSV et cumuls d'un lot de (numéro, ligne JSON brute).
+    Fonction de module : exécutable dans un processus du pool.
+    """
+    devis = [_lire_devis(ligne, numero) for numero, ligne in lot]
+    cumuls = dict.fromkeys(_CUMULS, 0)
+    valides, avant, erreurs = [], [], {}
+    for k, (identifiant, date_devis, parametres) in enumerate(devis):
+        if isinstance(parametres, str):
+            erreurs[k] = parametres
+            continue
+        date_devis = date_devis or date_avant
+        try:
+            if date_devis not in _VERSIONS_AVANT:
+                _VERSIONS_AVANT[date_devis] = catalogue_prix.en_vigueur(date_devis)
+        except (AttributeError, TypeError, ValueError) as e:  # TypeError : liste / objet JSON
+            erreurs[k] = f"date_devis invalide : {e}"
+            continue
+        valides.append(k)
+        avant.append(_VERSIONS_AVANT[date_devis])
+
+    parametres = [devis[k][2] for k in valides]
+    a = _chiffrer(parametres, avant)
+    b = _chiffrer(parametres, [version_apres] * len(valides))
+    if valides:
+        cumuls["nb_devis"] = len(valides)
+        for cle in ("total_ttc", "marge_ht"):
+            cumuls[cle + "_avant"] = float(a[cle].sum())
+            cumuls[cle + "_apres"] = float(b[cle].sum())
+        colonnes = zip(
+            [v["version"] for v in avant],
+            a["total_ttc"].tolist(), b["total_ttc"].tolist(),
+            np.round(b["total_ttc"] - a["total_ttc"], 2).tolist(),
+            a["cout_revient_ht"].tolist(), b["cout_revient_ht"].tolist(),
+            a["marge_ht"].tolist(), b["marge_ht"].tolist(),
+            np.round(b["marge_ht"] - a["marge_ht"], 2).tolist(),
+            a["taux_marge"].tolist(), b["taux_marge"].tolist())
+    chiffres = dict(zip(valides, colonnes)) if valides else {}
+
+    lignes = []
+    for k, (identifiant, _, parametres) in enumerate(devis):
+        if k in erreurs:
+            lignes.append([identifiant, parametres.get("type_canape", "") if isinstance(parametres, dict) else ""]
+                          + [""] * (len(COLONNES_RAPPORT) - 3) + [erreurs[k]])
+            continue
+        version, *valeurs = chiffres[k]
+        lignes.append([identifiant, parametres["type_canape"], version, version_apres["version"],
+                       *valeurs, ""])
+    cumuls["nb_erreurs"] = len(erreurs)
+    return lignes, cumuls
+
+
+# ============================================================================
+# POINT DE REPRISE
+# ============================================================================
+
+def _lire_reprise(chemin, cle):
+    """Point de reprise de ce job (même entrée, mêmes tarifs), sinon None"""
+    try:
+        with open(chemin, encoding="utf-8") as f:
+            reprise = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return reprise if reprise.get("cle") == cle else None
+
+
+def _ecrire_reprise(chemin, reprise):
+    """Écriture atomique (fichier temporaire puis remplacement)"""
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(reprise, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+
+
+# ============================================================================
+# JOB
+# ============================================================================
+
+def rechiffrer_devis(entree, rapport, catalogue=None, date_avant=None, date_apres=None,
+                     taille_lot=TAILLE_LOT, processus=None, progression=None):
+    """
+    Rechiffre les devis de entree (JSON Lines) et écrit le rapport CSV.
+
+    catalogue : chemin d'un catalogue candidat (défaut : catalogue courant).
+    processus : lots chiffrés en parallèle (défaut : nombre de CPU ; 1 : sans pool).
+    progression(devis_lus, octets_lus, octets_total) : appelée après chaque lot.
+    Reprend automatiquement depuis <rapport>.reprise s'il correspond au même
+    job ; sinon repart du début.
+
+    Returns:
+        dict : nb_devis, nb_erreurs, versions_apres, cumuls avant / après
+        (total_ttc, marge_ht) et écart de marge total et moyen.
+    """
+    candidat = catalogue_prix.charger(catalogue or catalogue_prix.CATALOGUE_PATH)
+    version_apres = (catalogue_prix.en_vigueur(date_apres, candidat) if date_apres
+                     else candidat.versions[-1])
+    chemin_reprise = rapport + ".reprise"
+    stat = os.stat(entree)
+    cle = [os.path.abspath(entree), [stat.st_mtime_ns, stat.st_size],
+           os.path.abspath(candidat.chemin), list(candidat.signature),
+           str(date_avant or ""), str(date_apres or "")]
+    octets_total = stat.st_size
+
+    reprise = _lire_reprise(chemin_reprise, cle)
+    if reprise is None or not os.path.exists(rapport):
+        reprise = {"cle": cle, "octets_lus": 0, "lignes_lues": 0, "octets_rapport": 0,
+                   "cumuls": dict.fromkeys(_CUMULS, 0)}
+    cumuls = reprise["cumuls"]
+
+    with open(entree, "rb") as f_entree, open(rapport, "a+", encoding="utf-8", newline="") as f_rapport:
+        # Rapport ramené au dernier lot validé (un lot interrompu est refait)
+        f_rapport.truncate(reprise["octets_rapport"])
+        ecrivain = csv.writer(f_rapport)
+        if reprise["octets_rapport"] == 0:
+            ecrivain.writerow(COLONNES_RAPPORT)
+        f_entree.seek(reprise["octets_lus"])
+
+        def _ecrire_lot(termine):
+            resultat, octets_lus, numero = termine
+            lignes, cumuls_lot = resultat.result() if isinstance(resultat, Future) else resultat
+            ecrivain.writerows(lignes)
+            f_rapport.flush()
+            os.fsync(f_rapport.fileno())
+            for cle, valeur in cumuls_lot.items():
+                cumuls[cle] += valeur
+            reprise.update(octets_lus=octets_lus, lignes_lues=numero,
+                           octets_rapport=os.fstat(f_rapport.fileno()).st_size)
+            _ecrire_reprise(chemin_reprise, reprise)
+            if progression:
+                progression(cumuls["nb_devis"] + cumuls["nb_erreurs"], octets_lus, octets_total)
+
+        def lots():
+            numero = reprise["lignes_lues"]
+            while True:
+                lot = []
+                for ligne in f_entree:
+                    numero += 1
+                    if ligne.strip():
+                        lot.append((numero, ligne))
+                        if len(lot) >= taille_lot:
+                            break
+                if not lot:
+                    return
+                yield lot, f_entree.tell(), numero
+
+        processus = processus or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(processus) if processus > 1 else None
+        try:
+            # Lots chiffrés en parallèle, écrits (et validés) dans l'ordre de l'entrée
+            en_cours = deque()
+            for lot, octets_lus, numero in lots():
+                if pool is None:
+                    en_cours.append((_traiter_lot(lot, version_apres, date_avant), octets_lus, numero))
+                else:
+                    en_cours.append((pool.submit(_traiter_lot, lot, version_apres, date_avant),
+                                     octets_lus, numero))
+                while en_cours and (pool is None or len(en_cours) > 2 * processus):
+                    _ecrire_lot(en_cours.popleft())
+            while en_cours:
+                _ecrire_lot(en_cours.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    if os.path.exists(chemin_reprise):
+        os.remove(chemin_reprise)
+    n = cumuls["nb_devis"]
+    ecart = cumuls["marge_ht_apres"] - cumuls["marge_ht_avant"]
+    return dict(cumuls,
+                version_apres=version_apres["version"],
+                ecart_marge_ht=round(ecart, 2),
+                ecart_marge_ht_moyen=round(ecart / n, 2) if n else 0.0)
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def _afficher_progression(devis, octets_lus, octets_total):
+    pourcentage = 100 * octets_lus / octets_total if octets_total else 100
+    print(f"\r{devis} devis rechiffrés ({pourcentage:.0f} %)", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rechiffre des devis enregistrés et écrit l'impact tarif en CSV")
+    parser.add_argument("entree", help="devis en JSON Lines")
+    parser.add_argument("rapport", help="rapport CSV à écrire")
+    parser.add_argument("--catalogue", help="catalogue de prix candidat (défaut : catalogue courant)")
+    parser.add_argument("--date-avant", help="date des devis sans date_devis (défaut : aujourd'hui)")
+    parser.add_argument("--date-apres", help="date du nouveau tarif (défaut : dernière version)")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help="devis par lot (et par point de reprise)")
+    parser.add_argument("--processus", type=int, help="processus de chiffrage (défaut : nombre de CPU)")
+    args = parser.parse_args(argv)
+
+    synthese = rechiffrer_devis(args.entree, args.rapport, catalogue=args.catalogue,
+                                date_avant=args.date_avant, date_apres=args.date_apres,
+                                taille_lot=args.lot, processus=args.processus,
+                                progression=_afficher_progression)
+    print(file=sys.stderr)
+    print(f"{synthese['nb_devis']} devis rechiffrés au tarif {synthese['version_apres']}, "
+          f"{synthese['nb_erreurs']} en erreur")
+    print(f"Marge HT : {synthese['marge_ht_avant']:.2f} € → {synthese['marge_ht_apres']:.2f} € "
+          f"(écart {synthese['ecart_marge_ht']:+.2f} €, {synthese['ecart_marge_ht_moyen']:+.2f} € par devis)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Cohérence des chemins de chiffrage avec calculer_prix_total
+
+calculer_prix_batch (NumPy) reprend à la main les règles des sections du
+devis ; calculer_prix_grille (mousse + tissu lus dans grille_prix.npy) et
+CanapePricing (sections en cache) les réutilisent. Leurs totaux doivent
+rester identiques (bit à bit) à ceux de calculer_prix_total, sur un
+échantillon aléatoire reproductible qui couvre les valeurs hors grille et
+les côtés absents (None, 0 ou NaN).
+
+    python -m pytest -q test_pricing.py
+"""
+
+import math
+import random
+
+import pytest
+
+import catalogue_prix
+import grille_prix
+from pricing import calculer_prix_total, calculer_prix_batch, calculer_prix_grille, CanapePricing
+
+GRAINE = 20240601
+TAILLE_ECHANTILLON = 400
+
+TYPES = ("Simple (S)", "L - Sans Angle", "L - Avec Angle (LF)",
+         "U - Sans Angle", "U - 1 Angle (U1F)", "U - 2 Angles (U2F)")
+COUSSINS = ("auto", "65", "80", "90", "valise", "p", "g", "s")
+MOUSSES = ("D25", "D30", "HR35", "HR45", "inconnue")
+TOTAUX = ("total_ttc", "prix_ht", "cout_revient_ht", "marge_ht", "taux_marge")
+
+
+# ============================================================================
+# ÉCHANTILLON
+# ============================================================================
+
+def _longueur(rng, hors_grille=True):
+    """Longueur sur la grille (pas de 10), hors pas / hors bornes, ou décimale"""
+    tirage = rng.random()
+    if tirage < 0.5 or not hors_grille:
+        return rng.randrange(100, 601, 10)
+    if tirage < 0.8:
+        return rng.randint(60, 700)
+    return round(rng.uniform(100, 600), 1)
+
+
+def _cote(rng, hors_grille=True):
+    """ty / tz : longueur, ou côté absent (None ou 0)"""
+    tirage = rng.random()
+    if tirage < 0.15:
+        return None
+    if tirage < 0.25:
+        return 0
+    return _longueur(rng, hors_grille)
+
+
+def configurations(n=TAILLE_ECHANTILLON, graine=GRAINE, hors_grille=True):
+    """
+    Paramètres de calculer_prix_total (estimation, sans layout), tirés au hasard.
+    hors_grille=False : dimensions, épaisseur et mousse toutes sur la grille.
+    """
+    rng = random.Random(graine)
+    for _ in range(n):
+        yield dict(
+            type_canape=rng.choice(TYPES),
+            tx=_longueur(rng, hors_grille), ty=_cote(rng, hors_grille), tz=_cote(rng, hors_grille),
+            profondeur=(rng.choice((rng.randrange(50, 121, 5), rng.randint(45, 125), 67.5))
+                        if hors_grille else rng.randrange(50, 121, 5)),
+            type_coussins=rng.choice(COUSSINS),
+            type_mousse=rng.choice(MOUSSES if hors_grille else grille_prix.MOUSSES),
+            epaisseur=(rng.choice((rng.randrange(15, 36, 5), rng.randint(10, 40)))
+                       if hors_grille else rng.randrange(15, 36, 5)),
+            acc_left=rng.random() < 0.5, acc_right=rng.random() < 0.5, acc_bas=rng.random() < 0.5,
+            dossier_left=rng.random() < 0.5, dossier_bas=rng.random() < 0.5,
+            dossier_right=rng.random() < 0.5,
+            nb_coussins_deco=rng.randint(0, 3), nb_traversins_supp=rng.randint(0, 2),
+            has_surmatelas=rng.random() < 0.5, has_meridienne=rng.random() < 0.3,
+        )
+
+
+# ============================================================================
+# CALCUL PAR LOTS
+# ============================================================================
+
+def test_batch_identique_a_calculer_prix_total():
+    echantillon = list(configurations())
+    rng = random.Random(GRAINE + 1)
+    colonnes = {cle: [config[cle] for config in echantillon] for cle in echantillon[0]}
+    # Côté absent : None ou NaN dans les colonnes du lot
+    for cle in ("ty", "tz"):
+        colonnes[cle] = [math.nan if v is None and rng.random() < 0.5 else v for v in colonnes[cle]]
+
+    lot = calculer_prix_batch(**colonnes)
+
+    for i, config in enumerate(echantillon):
+        attendu = calculer_prix_total(**config)
+        for cle in TOTAUX:
+            assert lot[cle][i] == attendu[cle], (cle, config)
+
+
+@pytest.mark.parametrize("cote_absent", [None, 0, math.nan])
+def test_batch_scalaires_et_cote_absent(cote_absent):
+    config = next(configurations(1))
+    config.update(type_canape="U - 2 Angles (U2F)", tz=None)
+    attendu = calculer_prix_total(**config)
+    lot = calculer_prix_batch(**dict(config, tz=cote_absent))
+    for cle in TOTAUX:
+        assert lot[cle][0] == attendu[cle], cle
+
+
+# ============================================================================
+# GRILLE PRÉCALCULÉE
+# ============================================================================
+
+def test_grille_a_jour():
+    lire = grille_prix.lecture(catalogue_prix.en_vigueur(), 70, 25, "HR35")
+    assert lire is not None, "grille_prix.npy périmée : python grille_prix.py"
+
+
+@pytest.mark.parametrize("hors_grille", [False, True])
+def test_grille_identique_a_calculer_prix_total(hors_grille):
+    for config in configurations(hors_grille=hors_grille):
+        attendu = calculer_prix_total(**config)
+        resultat = calculer_prix_grille(**config)
+        assert resultat == {cle: attendu[cle] for cle in resultat}, config
+        assert set(TOTAUX) <= set(resultat)
+
+
+# ============================================================================
+# MOTEUR INCRÉMENTAL
+# ============================================================================
+
+def test_canape_pricing_identique_a_calculer_prix_total():
+    rng = random.Random(GRAINE + 2)
+    echantillon = list(configurations())
+    moteur = CanapePricing()
+    configuration = dict(echantillon[0])
+    assert moteur.calculer_devis_complet(configuration) == calculer_prix_total(**configuration)
+
+    # Marche aléatoire : 1 à 3 paramètres changent à chaque devis
+    for autre in echantillon[1:]:
+        modifications = {cle: autre[cle] for cle in rng.sample(sorted(autre), rng.randint(1, 3))}
+        configuration.update(modifications)
+        assert moteur.calculer_devis_complet(modifications) == calculer_prix_total(**configuration), configuration
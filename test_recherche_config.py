@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Prix de la recherche de configurations = prix du devis
+
+Chaque candidat de rechercher_configurations doit coûter exactement ce que
+calculer_prix_total donne sur la disposition que le devis recalcule
+(compute_layout, même scission des banquettes).
+
+    python -m pytest -q test_recherche_config.py
+"""
+
+import contextlib
+import io
+
+import pytest
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import canapematplot as cm
+from pricing import calculer_prix_total, couts_scission
+from recherche_config import rechercher_configurations
+
+# Banquettes scindées (> 250 cm) : scission au milieu ≠ scission au moindre coût
+RECHERCHE = dict(type_canape="U - Sans Angle", tx=520, ty=420, tz=420, profondeur=70,
+                 acc_left=True, acc_right=True, acc_bas=True,
+                 dossier_left=True, dossier_bas=True, dossier_right=True)
+
+
+@pytest.mark.parametrize("optimisee", [False, True])
+def test_prix_recherche_identique_au_devis(optimisee):
+    split_costs = couts_scission() if optimisee else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        front = rechercher_configurations(**RECHERCHE, split_costs=split_costs)
+    assert front
+
+    for candidat in front:
+        config = dict(RECHERCHE, coussins=candidat["coussins"], variant=candidat["variant"],
+                      meridienne_side=candidat["meridienne_side"], meridienne_len=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            layout = cm.compute_layout(config, split_costs=split_costs)
+        attendu = calculer_prix_total(
+            type_coussins=candidat["coussins"], type_mousse=candidat["type_mousse"],
+            epaisseur=candidat["epaisseur"], nb_coussins_deco=0, nb_traversins_supp=0,
+            has_surmatelas=False, has_meridienne=False, layout=layout,
+            **{k: v for k, v in RECHERCHE.items()})
+        assert candidat["total_ttc"] == attendu["total_ttc"], candidat["resume_coussins"]
+        assert candidat["marge_ht"] == attendu["marge_ht"]